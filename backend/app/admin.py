@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import AppSetting, Agent, RunLog, SystemLog
+from .models import AppSetting, Agent, CrawlCacheEntry, RunJob, RunLog, SystemLog
 
 
 @admin.register(AppSetting)
@@ -21,8 +21,20 @@ class RunLogAdmin(admin.ModelAdmin):
     search_fields = ("message",)
 
 
+@admin.register(RunJob)
+class RunJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "agent", "trigger", "status", "attempts", "created_at", "finished_at")
+    list_filter = ("status", "trigger")
+
+
 @admin.register(SystemLog)
 class SystemLogAdmin(admin.ModelAdmin):
     list_display = ("id", "source", "level", "created_at")
     list_filter = ("source", "level")
     search_fields = ("message",)
+
+
+@admin.register(CrawlCacheEntry)
+class CrawlCacheEntryAdmin(admin.ModelAdmin):
+    list_display = ("id", "url", "length", "size", "hits", "checked_at", "last_access")
+    search_fields = ("url",)
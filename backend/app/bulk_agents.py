@@ -0,0 +1,143 @@
+"""
+Bulk agent operations behind /api/agents/bulk/*.
+
+Each operation handles the whole request in one transaction with a fixed
+number of queries (bulk_create, bulk_update or one filtered UPDATE) however
+many agents are involved, and returns one result per requested item:
+{"id"/"index", "ok", ...} with "error(s)" on the items that were rejected.
+
+bulk_update() and update() bypass auto_now, so updated_at is set explicitly.
+The scheduler's incremental resync depends on it.
+"""
+from __future__ import annotations
+from typing import Any
+
+from django.db import transaction
+from django.db.models import Case, Value, When
+from django.utils import timezone
+
+from .models import Agent
+from .run_queue import queue as run_queue
+from .serializers import AgentSerializer
+
+TOGGLE_FIELDS = ("active", "sandbox")
+
+
+def _unique_ids(ids: list[Any]) -> tuple[list[int], list[dict[str, Any]]]:
+    """Split raw ids into unique ints (in request order) and per-item errors."""
+    seen: set[int] = set()
+    valid: list[int] = []
+    errors: list[dict[str, Any]] = []
+    for raw in ids:
+        try:
+            agent_id = int(raw)
+        except (TypeError, ValueError):
+            errors.append({"id": raw, "ok": False, "error": "Invalid id"})
+            continue
+        if agent_id not in seen:
+            seen.add(agent_id)
+            valid.append(agent_id)
+    return valid, errors
+
+
+def bulk_create_agents(items: list[Any], *, atomic: bool = False) -> list[dict[str, Any]]:
+    """Validate every item, then INSERT the valid ones together.
+
+    With `atomic`, nothing is created unless every item is valid.
+    """
+    results: list[dict[str, Any]] = []
+    pending: list[tuple[int, Agent]] = []
+    for index, item in enumerate(items):
+        serializer = AgentSerializer(data=item if isinstance(item, dict) else {})
+        if serializer.is_valid():
+            pending.append((index, Agent(**serializer.validated_data)))
+            results.append({"index": index, "ok": True})
+        else:
+            results.append({"index": index, "ok": False, "errors": serializer.errors})
+
+    if atomic and len(pending) != len(items):
+        for r in results:
+            if r["ok"]:
+                r.update(ok=False, error="Not created: another item in the batch is invalid")
+        return results
+
+    with transaction.atomic():
+        created = Agent.objects.bulk_create([agent for _, agent in pending], batch_size=500)
+    for (index, _), agent in zip(pending, created):
+        results[index]["item"] = AgentSerializer(agent).data
+    return results
+
+
+def bulk_update_agents(items: list[Any]) -> list[dict[str, Any]]:
+    """Apply partial updates [{"id": ..., <fields>}] with one bulk_update."""
+    ids, results = _unique_ids([i.get("id") if isinstance(i, dict) else None for i in items])
+    now = timezone.now()
+    changed: list[Agent] = []
+    fields: set[str] = set()
+    with transaction.atomic():
+        agents = Agent.objects.select_for_update().in_bulk(ids)
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            try:
+                agent = agents.get(int(item.get("id")))
+            except (TypeError, ValueError):
+                continue  # already reported by _unique_ids
+            if agent is None:
+                results.append({"id": item.get("id"), "ok": False, "error": "Agent not found"})
+                continue
+            data = {k: v for k, v in item.items() if k != "id"}
+            serializer = AgentSerializer(agent, data=data, partial=True)
+            if not serializer.is_valid():
+                results.append({"id": agent.id, "ok": False, "errors": serializer.errors})
+                continue
+            for name, value in serializer.validated_data.items():
+                setattr(agent, name, value)
+                fields.add(name)
+            agent.updated_at = now
+            if agent not in changed:
+                changed.append(agent)
+            results.append({"id": agent.id, "ok": True})
+        if changed:
+            Agent.objects.bulk_update(changed, sorted(fields | {"updated_at"}), batch_size=500)
+
+    by_id = {a.id: a for a in changed}
+    for r in results:
+        if r["ok"]:
+            r["item"] = AgentSerializer(by_id[r["id"]]).data
+    return results
+
+
+def bulk_toggle_agents(ids: list[Any], field: str, value: bool | None = None) -> list[dict[str, Any]]:
+    """Set `field` to `value` on every agent, or flip it per row when value is None."""
+    if field not in TOGGLE_FIELDS:
+        raise ValueError(f"field must be one of {', '.join(TOGGLE_FIELDS)}")
+    ids, results = _unique_ids(ids)
+    new_value: Any = value if value is not None else Case(
+        When(**{field: True}, then=Value(False)), default=Value(True)
+    )
+    with transaction.atomic():
+        qs = Agent.objects.filter(id__in=ids)
+        qs.update(**{field: new_value, "updated_at": timezone.now()})
+        current = dict(qs.values_list("id", field))
+    for agent_id in ids:
+        if agent_id in current:
+            results.append({"id": agent_id, "ok": True, field: current[agent_id]})
+        else:
+            results.append({"id": agent_id, "ok": False, "error": "Agent not found"})
+    return results
+
+
+def bulk_enqueue_runs(ids: list[Any]) -> list[dict[str, Any]]:
+    """Queue one RunJob per existing agent with a single INSERT (committed before workers wake)."""
+    ids, results = _unique_ids(ids)
+    agents = Agent.objects.in_bulk(ids)
+    jobs = run_queue.enqueue_many([agents[i] for i in ids if i in agents])
+    job_by_agent = {job.agent_id: job for job in jobs}
+    for agent_id in ids:
+        job = job_by_agent.get(agent_id)
+        if job is not None:
+            results.append({"id": agent_id, "ok": True, "job": job.id})
+        else:
+            results.append({"id": agent_id, "ok": False, "error": "Agent not found"})
+    return results
@@ -0,0 +1,110 @@
+"""
+Conditional GET for read-mostly JSON endpoints.
+
+    @conditional_json(lambda request: f"agents:{max_updated_at}:{count}")
+    @api_view(["GET", "POST"])
+    def agents(request): ...
+
+Before a GET or HEAD reaches the view, the validator is computed. It is a
+cheap string such as a version counter, or max(updated_at) plus a count. It
+must change whenever the payload would, and must not serialize the payload.
+Its hash becomes a weak ETag. A matching If-None-Match gets an empty 304
+without running the view. Otherwise the view runs and its 200 response
+carries the ETag plus "Cache-Control: no-cache", so browsers store the body
+and revalidate on every poll.
+
+The validator is computed before the view runs. The body can therefore only
+be newer than its ETag claims, and that costs at most one extra download.
+It never produces a stale 304.
+
+Bodies of at least JSON_GZIP_MIN_BYTES are gzip-compressed for clients that
+accept it. Other methods pass straight through.
+"""
+from __future__ import annotations
+from functools import wraps
+from typing import Any, Callable
+import hashlib
+import re
+import threading
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+
+_stats_lock = threading.Lock()
+_stats = {"checked": 0, "not_modified": 0, "full": 0, "gzipped": 0, "bytes_saved": 0}
+_ETAG_RE = re.compile(r'(?:W/)?"([^"]*)"')
+
+
+def _bump(name: str, n: int = 1) -> None:
+    with _stats_lock:
+        _stats[name] += n
+
+
+def conditional_stats() -> dict[str, Any]:
+    with _stats_lock:
+        out: dict[str, Any] = dict(_stats)
+    out["not_modified_ratio"] = round(out["not_modified"] / out["checked"], 4) if out["checked"] else 0.0
+    return out
+
+
+def _matches(if_none_match: str, tag: str) -> bool:
+    # weak comparison (RFC 9110 13.1.2): W/ prefixes are ignored
+    if if_none_match.strip() == "*":
+        return True
+    return tag in _ETAG_RE.findall(if_none_match)
+
+
+def _maybe_gzip(request, response: HttpResponse) -> None:
+    minimum = int(getattr(settings, "JSON_GZIP_MIN_BYTES", 1024))
+    if response.streaming or response.status_code != 200 or response.has_header("Content-Encoding"):
+        return
+    patch_vary_headers(response, ("Accept-Encoding",))
+    if len(response.content) < minimum or "gzip" not in request.META.get("HTTP_ACCEPT_ENCODING", "").lower():
+        return
+    compressed = compress_string(response.content)
+    if len(compressed) >= len(response.content):
+        return
+    _bump("gzipped")
+    _bump("bytes_saved", len(response.content) - len(compressed))
+    response.content = compressed
+    response["Content-Length"] = str(len(compressed))
+    response["Content-Encoding"] = "gzip"
+
+
+def conditional_json(validator: Callable[[Any], str | None]):
+    """Wrap a Django/DRF view (outside @api_view) with ETag/304 handling and gzip."""
+
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+
+            raw = validator(request)
+            tag = hashlib.blake2b(raw.encode("utf-8"), digest_size=12).hexdigest() if raw is not None else None
+            if tag is not None:
+                _bump("checked")
+                if _matches(request.META.get("HTTP_IF_NONE_MATCH", ""), tag):
+                    _bump("not_modified")
+                    response = HttpResponseNotModified()
+                    response["ETag"] = f'W/"{tag}"'
+                    response["Cache-Control"] = "no-cache"
+                    patch_vary_headers(response, ("Accept-Encoding",))
+                    return response
+
+            response = view(request, *args, **kwargs)
+            if hasattr(response, "render") and not getattr(response, "is_rendered", True):
+                response.render()
+            if tag is not None and response.status_code == 200:
+                _bump("full")
+                response["ETag"] = f'W/"{tag}"'
+                response["Cache-Control"] = "no-cache"
+            _maybe_gzip(request, response)
+            return response
+
+        return wrapped
+
+    return decorator
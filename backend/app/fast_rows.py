@@ -0,0 +1,112 @@
+"""
+Serializer-free read path for the hot list endpoints (agents, runs, system-logs).
+
+Rows come straight from .values() with only the columns the serializer would
+emit. They are reshaped into the same dicts AgentSerializer, RunLogSerializer
+and SystemLogSerializer produce, then encoded with orjson (a requirement; the
+stdlib json is used if it is missing). The bytes match DRF's JSONRenderer
+output: compact separators, raw UTF-8, U+2028/U+2029 escaped, datetimes in
+DRF's ISO-8601 form in the current time zone with "+00:00" written as "Z".
+
+Set LIST_FAST_PATH=0 to go back to the serializers.
+"""
+from __future__ import annotations
+from datetime import datetime, tzinfo
+from typing import Any, Iterable
+import json
+
+from django.http import HttpResponse
+from django.utils import timezone
+
+try:  # optional, faster encoder
+    import orjson as _orjson
+except ImportError:  # pragma: no cover - depends on environment
+    _orjson = None
+
+
+AGENT_COLUMNS = (
+    "id", "name", "role", "goal", "action_type", "schedule_cron",
+    "active", "sandbox", "created_at", "updated_at",
+)
+RUN_COLUMNS = ("id", "agent_id", "agent__name", "status", "message", "started_at", "ended_at")
+SYSTEM_LOG_COLUMNS = ("id", "source", "level", "message", "created_at")
+
+
+def iso_datetime(value: datetime | None, tz: tzinfo | None = None) -> str | None:
+    """Same output as rest_framework.fields.DateTimeField.to_representation.
+
+    Pass `tz` (the current time zone) when formatting many values; looking it
+    up costs more than the formatting itself.
+    """
+    if not value:
+        return None
+    if value.tzinfo is not None:
+        tz = tz or timezone.get_current_timezone()
+        if value.tzinfo is not tz:
+            value = value.astimezone(tz)
+    text = value.isoformat()
+    return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+
+def agent_rows(rows: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    tz = timezone.get_current_timezone()
+    return [
+        {
+            "id": r["id"],
+            "name": r["name"],
+            "role": r["role"],
+            "goal": r["goal"],
+            "action_type": r["action_type"],
+            "schedule_cron": r["schedule_cron"],
+            "active": r["active"],
+            "sandbox": r["sandbox"],
+            "created_at": iso_datetime(r["created_at"], tz),
+            "updated_at": iso_datetime(r["updated_at"], tz),
+        }
+        for r in rows
+    ]
+
+
+def run_rows(rows: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    tz = timezone.get_current_timezone()
+    return [
+        {
+            "id": r["id"],
+            "agent": r["agent_id"],
+            "agent_name": r["agent__name"],
+            "status": r["status"],
+            "message": r["message"],
+            "started_at": iso_datetime(r["started_at"], tz),
+            "ended_at": iso_datetime(r["ended_at"], tz),
+        }
+        for r in rows
+    ]
+
+
+def system_log_rows(rows: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    tz = timezone.get_current_timezone()
+    return [
+        {
+            "id": r["id"],
+            "source": r["source"],
+            "level": r["level"],
+            "message": r["message"],
+            "created_at": iso_datetime(r["created_at"], tz),
+        }
+        for r in rows
+    ]
+
+
+def json_bytes(data: Any) -> bytes:
+    """Encode like DRF's JSONRenderer with default settings."""
+    if _orjson is not None:
+        out = _orjson.dumps(data)
+        if b"\xe2\x80\xa8" in out or b"\xe2\x80\xa9" in out:
+            out = out.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return out
+    text = json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+    return text.replace("\u2028", "\\u2028").replace("\u2029", "\\u2029").encode()
+
+
+def json_response(data: Any, status: int = 200) -> HttpResponse:
+    return HttpResponse(json_bytes(data), status=status, content_type="application/json")
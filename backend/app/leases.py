@@ -0,0 +1,48 @@
+"""
+DB-backed leases: one holder per name across every process and worker.
+
+Taking a lease is a single conditional UPDATE (the row is free, expired or
+already ours), the same way app.run_queue claims jobs, so two processes can
+never both win. The shared file cache is not used here because its
+add/get/set are not atomic across processes.
+"""
+from __future__ import annotations
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Lease
+
+
+def acquire(name: str, holder: str, seconds: float) -> bool:
+    """Take or renew `name` for `seconds`; False while someone else holds it."""
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=seconds)
+    taken = Lease.objects.filter(Q(holder=holder) | Q(holder="") | Q(expires_at__lte=now), name=name).update(
+        holder=holder, expires_at=expires_at,
+    )
+    if taken:
+        return True
+    try:
+        with transaction.atomic():
+            Lease.objects.create(name=name, holder=holder, expires_at=expires_at)
+        return True
+    except IntegrityError:
+        return False  # the row exists and is held by someone else
+
+
+def release(name: str, holder: str) -> None:
+    """Give `name` up if `holder` still has it."""
+    Lease.objects.filter(name=name, holder=holder).update(holder="", expires_at=timezone.now())
+
+
+def holder(name: str) -> str | None:
+    """Current unexpired holder of `name`, if any."""
+    return (
+        Lease.objects.filter(name=name, expires_at__gt=timezone.now())
+        .exclude(holder="")
+        .values_list("holder", flat=True)
+        .first()
+    )
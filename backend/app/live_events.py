@@ -0,0 +1,353 @@
+"""
+Live RunLog / SystemLog events for GET /api/events (Server-Sent Events).
+
+Each process has one LiveEventHub. While at least one client is subscribed, a
+tail thread polls both tables for rows with an id above the last one it
+published. That is one primary-key range query per table every
+LIVE_EVENTS_POLL_SECONDS, which returns nothing on an idle system. Writes
+made in this process call nudge(), so their events go out immediately.
+Writes from other processes show up on the next poll. With no subscribers
+the thread sleeps and runs no queries.
+
+Published events go into a ring buffer of LIVE_EVENTS_BUFFER entries. An
+event id is the pair "<last run id>.<last log id>" as of that event. A client
+reconnecting with Last-Event-ID is replayed everything after that position.
+The replay comes from the buffer when the buffer still covers it. Otherwise
+the gap is read from the database, up to LIVE_EVENTS_BACKFILL_MAX rows per table.
+Beyond that the client gets a "reset" event and should reload through the
+list endpoints.
+
+Payloads are the exact row dicts /api/runs and /api/system-logs return (see
+fast_rows).
+"""
+from __future__ import annotations
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable
+import asyncio
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Max
+
+from . import fast_rows
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("run", "log")
+
+
+@dataclass(frozen=True)
+class LiveEvent:
+    kind: str  # "run" | "log"
+    pk: int
+    position: tuple[int, int]  # (run id, log id) after this event
+    data: dict[str, Any]
+
+    @property
+    def event_id(self) -> str:
+        return format_position(self.position)
+
+
+def format_position(position: tuple[int, int]) -> str:
+    return f"{position[0]}.{position[1]}"
+
+
+def parse_position(value: str | None) -> tuple[int, int] | None:
+    if not value:
+        return None
+    try:
+        run_id, log_id = value.strip().split(".", 1)
+        return int(run_id), int(log_id)
+    except ValueError:
+        return None
+
+
+def _fetch(kind: str, after: int, limit: int) -> list[dict[str, Any]]:
+    from .models import RunLog, SystemLog
+
+    if kind == "run":
+        rows = RunLog.objects.filter(id__gt=after).order_by("id").values(*fast_rows.RUN_COLUMNS)[:limit]
+        return fast_rows.run_rows(rows)
+    rows = SystemLog.objects.filter(id__gt=after).order_by("id").values(*fast_rows.SYSTEM_LOG_COLUMNS)[:limit]
+    return fast_rows.system_log_rows(rows)
+
+
+class LiveEventHub:
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._buffer: deque[LiveEvent] = deque(maxlen=int(getattr(settings, "LIVE_EVENTS_BUFFER", 2000)))
+        self._position: tuple[int, int] | None = None
+        self._seq = 0  # bumped on every publish; consumers wait for it to change
+        # highest pk per kind that has fallen out of the buffer
+        self._evicted = {"run": 0, "log": 0}
+        self._subscribers = 0
+        self._async_waiters: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._pid: int | None = None
+        self.polls = 0
+        self.published = 0
+        self.backfills = 0
+        self.resets = 0
+
+    # -- lifecycle -------------------------------------------------------------
+    def _ensure_started(self) -> None:
+        pid = os.getpid()
+        if self._pid == pid and self._thread and self._thread.is_alive():
+            return
+        with self._cond:
+            if self._pid == pid and self._thread and self._thread.is_alive():
+                return
+            self._pid = pid
+            self._thread = threading.Thread(target=self._run, name="live-events", daemon=True)
+            self._thread.start()
+
+    def subscribe(self) -> tuple[int, int]:
+        """Register a client; returns the current position (initialising it if needed)."""
+        self._ensure_started()
+        with self._cond:
+            self._subscribers += 1
+            position = self._position
+        if position is None:
+            position = self._init_position()
+        self._wake.set()
+        return position
+
+    def unsubscribe(self) -> None:
+        with self._cond:
+            self._subscribers = max(0, self._subscribers - 1)
+
+    def nudge(self) -> None:
+        """Called after this process writes a RunLog/SystemLog row."""
+        if self._subscribers:
+            self._wake.set()
+
+    def _init_position(self) -> tuple[int, int]:
+        from .models import RunLog, SystemLog
+
+        run_max = RunLog.objects.aggregate(m=Max("id"))["m"] or 0
+        log_max = SystemLog.objects.aggregate(m=Max("id"))["m"] or 0
+        with self._cond:
+            if self._position is None:
+                self._position = (run_max, log_max)
+                self._evicted = {"run": run_max, "log": log_max}
+            return self._position
+
+    # -- tail poller -----------------------------------------------------------
+    def _run(self) -> None:
+        while True:
+            if not self._subscribers:
+                self._wake.wait()  # idle: no queries at all
+            self._wake.clear()
+            try:
+                if self._position is not None:
+                    self._poll()
+            except Exception:
+                logger.exception("live event poll failed")
+            finally:
+                close_old_connections()
+            self._wake.wait(float(getattr(settings, "LIVE_EVENTS_POLL_SECONDS", 1.0)))
+
+    def _poll(self) -> None:
+        self.polls += 1
+        limit = self._buffer.maxlen or 2000
+        run_id, log_id = self._position
+        runs = _fetch("run", run_id, limit)
+        logs = _fetch("log", log_id, limit)
+        if runs or logs:
+            self._publish([("run", r) for r in runs] + [("log", r) for r in logs])
+
+    def _publish(self, rows: list[tuple[str, dict[str, Any]]]) -> None:
+        with self._cond:
+            run_id, log_id = self._position
+            for kind, data in rows:
+                if kind == "run":
+                    run_id = data["id"]
+                else:
+                    log_id = data["id"]
+                if len(self._buffer) == self._buffer.maxlen:
+                    old = self._buffer[0]
+                    self._evicted[old.kind] = max(self._evicted[old.kind], old.pk)
+                self._buffer.append(LiveEvent(kind, data["id"], (run_id, log_id), data))
+            self._position = (run_id, log_id)
+            self._seq += 1
+            self.published += len(rows)
+            self._cond.notify_all()
+            waiters = list(self._async_waiters)
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+
+    # -- consumer side ---------------------------------------------------------
+    @property
+    def position(self) -> tuple[int, int]:
+        return self._position or (0, 0)
+
+    def buffered_since(self, position: tuple[int, int]) -> list[LiveEvent] | None:
+        """Events after `position` from memory, or None when the buffer no longer reaches back."""
+        with self._cond:
+            if any(position[i] < self._evicted[k] for i, k in enumerate(KINDS)):
+                return None
+            return [e for e in self._buffer if e.pk > position[KINDS.index(e.kind)]]
+
+    def since(self, position: tuple[int, int]) -> tuple[list[LiveEvent], bool]:
+        """Events after `position` and whether they are complete (False = client must reset).
+
+        Falls back to the database when the buffer has moved on; may query.
+        """
+        events = self.buffered_since(position)
+        if events is not None:
+            return events, True
+        self.backfills += 1
+        current = self.position
+        limit = int(getattr(settings, "LIVE_EVENTS_BACKFILL_MAX", 5000))
+        backfill: list[LiveEvent] = []
+        run_id, log_id = position
+        for i, kind in enumerate(KINDS):
+            rows = [r for r in _fetch(kind, position[i], limit) if r["id"] <= current[i]]
+            if len(rows) >= limit:
+                self.resets += 1
+                return [], False
+            for data in rows:
+                if kind == "run":
+                    run_id = data["id"]
+                else:
+                    log_id = data["id"]
+                backfill.append(LiveEvent(kind, data["id"], (run_id, log_id), data))
+        # everything published after `current` is still buffered (or a later call backfills it)
+        return backfill + (self.buffered_since(current) or []), True
+
+    @property
+    def seq(self) -> int:
+        """Read before since(); then wait(seq) cannot miss a publish in between."""
+        return self._seq
+
+    def wait(self, seq: int, timeout: float) -> None:
+        with self._cond:
+            if self._seq == seq:
+                self._cond.wait(timeout)
+
+    async def await_change(self, seq: int, timeout: float) -> None:
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        waiter = (loop, event)
+        with self._cond:
+            if self._seq != seq:
+                return
+            self._async_waiters.add(waiter)
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._cond:
+                self._async_waiters.discard(waiter)
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            return {
+                "subscribers": self._subscribers,
+                "buffered": len(self._buffer),
+                "position": format_position(self._position) if self._position else None,
+                "polls": self.polls,
+                "published": self.published,
+                "backfills": self.backfills,
+                "resets": self.resets,
+            }
+
+
+hub = LiveEventHub()
+
+
+def event_filter(params) -> Callable[[LiveEvent], bool]:
+    """Build a predicate from ?kinds=run,log&agent=&status=&source=&level= query params."""
+    kinds = {k.strip() for k in (params.get("kinds") or "run,log").split(",") if k.strip()}
+    agent = params.get("agent")
+    agent_id = int(agent) if agent not in (None, "") else None  # ValueError -> 400 in the view
+    run_status = params.get("status") or None
+    source = params.get("source") or None
+    level = params.get("level") or None
+
+    def accept(event: LiveEvent) -> bool:
+        if event.kind not in kinds:
+            return False
+        if event.kind == "run":
+            return (agent_id is None or event.data["agent"] == agent_id) and (
+                run_status is None or event.data["status"] == run_status
+            )
+        return (source is None or event.data["source"] == source) and (level is None or event.data["level"] == level)
+
+    return accept
+
+
+def sse_frame(event: LiveEvent) -> str:
+    body = fast_rows.json_bytes(event.data).decode("utf-8")
+    return f"id: {event.event_id}\nevent: {event.kind}\ndata: {body}\n\n"
+
+
+def reset_frame(position: tuple[int, int]) -> str:
+    # the new id moves the client's Last-Event-ID past the gap it must reload
+    return f"id: {format_position(position)}\nevent: reset\ndata: {{\"reason\":\"resume point no longer available\"}}\n\n"
+
+
+def stream(accept: Callable[[LiveEvent], bool], resume: tuple[int, int] | None):
+    """SSE frames for one client (sync generator, for WSGI)."""
+    heartbeat = float(getattr(settings, "LIVE_EVENTS_HEARTBEAT", 15))
+    deadline = time.monotonic() + float(getattr(settings, "LIVE_EVENTS_MAX_SECONDS", 3600))
+    position = hub.subscribe()
+    try:
+        position = resume or position
+        yield "retry: 3000\n\n"
+        while time.monotonic() < deadline:
+            seq = hub.seq
+            events, complete = hub.since(position)
+            if not complete:
+                position = hub.position
+                yield reset_frame(position)
+                continue
+            for event in events:
+                if accept(event):
+                    yield sse_frame(event)
+            if events:
+                position = events[-1].position
+            else:
+                yield ": keepalive\n\n"
+            hub.wait(seq, heartbeat)
+    finally:
+        hub.unsubscribe()
+
+
+async def astream(accept: Callable[[LiveEvent], bool], resume: tuple[int, int] | None):
+    """Async twin of stream(): idle clients hold no thread, only an asyncio.Event."""
+    from asgiref.sync import sync_to_async
+
+    heartbeat = float(getattr(settings, "LIVE_EVENTS_HEARTBEAT", 15))
+    deadline = time.monotonic() + float(getattr(settings, "LIVE_EVENTS_MAX_SECONDS", 3600))
+    position = await sync_to_async(hub.subscribe)()
+    try:
+        position = resume or position
+        yield "retry: 3000\n\n"
+        while time.monotonic() < deadline:
+            seq = hub.seq
+            events = hub.buffered_since(position)
+            complete = True
+            if events is None:
+                events, complete = await sync_to_async(hub.since)(position)
+            if not complete:
+                position = hub.position
+                yield reset_frame(position)
+                continue
+            for event in events:
+                if accept(event):
+                    yield sse_frame(event)
+            if events:
+                position = events[-1].position
+            else:
+                yield ": keepalive\n\n"
+            await hub.await_change(seq, heartbeat)
+    finally:
+        hub.unsubscribe()
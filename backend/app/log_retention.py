@@ -0,0 +1,344 @@
+"""
+SystemLog retention: age and row budgets per source/level, chunked deletes,
+and gzip JSONL archives partitioned by day.
+
+Each row falls into the first rule in SYSTEM_LOG_RETENTION_RULES that matches
+it. A rule with no source and no level matches every row left, so the rules
+after it (the default included) get none. Rows matching no rule use the
+default rule: SYSTEM_LOG_RETENTION_DAYS and SYSTEM_LOG_MAX_ROWS. Within its
+rule, a row expires when it is older than `days`, or when it falls outside
+the newest `max_rows` rows of that rule.
+
+prune() moves expired rows out in id-ordered chunks of
+SYSTEM_LOG_RETENTION_CHUNK. It appends each chunk to its day's archive file,
+fsyncs, deletes the chunk in its own short transaction, then sleeps
+SYSTEM_LOG_RETENTION_PAUSE seconds. The buffered log writer and request
+threads therefore never wait long for SQLite's write lock. Archiving is
+at-least-once: a crash between the archive write and the DELETE re-archives
+that chunk next time. Readers drop those duplicate ids.
+
+Archives live under SYSTEM_LOG_ARCHIVE_DIR/YYYY/MM/system_logs-YYYY-MM-DD.jsonl.gz.
+Every prune appends a new gzip member, and gzip readers concatenate the
+members transparently. `python manage.py system_logs query|reimport` reads
+them back.
+
+Pruning is off by default. Run `python manage.py system_logs prune` from cron,
+or opt in with SYSTEM_LOG_RETENTION_AUTOSTART=1. Either way, the
+"system-log-retention" lease (app.leases) keeps it to one process at a time.
+The lease is renewed after every chunk; a prune that fails to renew it
+stops, since another process may have taken over.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import leases
+from .models import SystemLog
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ("id", "source", "level", "message", "created_at")
+_LEASE_NAME = "system-log-retention"
+_LEASE_SECONDS = 300  # renewed after every chunk
+
+
+@dataclass
+class Rule:
+    source: str | None = None
+    level: str | None = None
+    days: float | None = None
+    max_rows: int | None = None
+
+    def q(self) -> Q:
+        q = Q()
+        if self.source:
+            q &= Q(source=self.source)
+        if self.level:
+            q &= Q(level=self.level)
+        return q
+
+    @property
+    def label(self) -> str:
+        return f"{self.source or '*'}:{self.level or '*'}"
+
+
+def load_rules() -> list[Rule]:
+    """Configured rules in priority order, followed by the catch-all default."""
+    rules = []
+    for raw in getattr(settings, "SYSTEM_LOG_RETENTION_RULES", []) or []:
+        rules.append(Rule(
+            source=raw.get("source") if raw.get("source") not in (None, "*") else None,
+            level=raw.get("level") if raw.get("level") not in (None, "*") else None,
+            days=float(raw["days"]) if raw.get("days") else None,
+            max_rows=int(raw["max_rows"]) if raw.get("max_rows") else None,
+        ))
+    default_days = float(getattr(settings, "SYSTEM_LOG_RETENTION_DAYS", 30))
+    default_rows = int(getattr(settings, "SYSTEM_LOG_MAX_ROWS", 200000))
+    rules.append(Rule(days=default_days or None, max_rows=default_rows or None))
+    return rules
+
+
+def _buckets(rules: list[Rule]) -> list[tuple[Rule, Q]]:
+    """Pair each rule with a filter for the rows it owns (earlier rules win)."""
+    out = []
+    taken: Q | None = Q(pk__in=[])  # None once a catch-all rule has claimed the rest
+    for rule in rules:
+        match = rule.q()
+        if taken is None:
+            out.append((rule, Q(pk__in=[])))
+        elif not match:
+            # Q() matches everything, and `taken |= Q()` would leave `taken` unchanged
+            out.append((rule, ~taken))
+            taken = None
+        else:
+            out.append((rule, match & ~taken))
+            taken |= match
+    return out
+
+
+def _expired(rule: Rule, bucket: Q, now: datetime) -> Q | None:
+    conds: list[Q] = []
+    if rule.days:
+        conds.append(Q(created_at__lt=now - timedelta(days=rule.days)))
+    if rule.max_rows:
+        edge = list(
+            SystemLog.objects.filter(bucket)
+            .order_by("-created_at", "-id")
+            .values_list("created_at", "id")[rule.max_rows:rule.max_rows + 1]
+        )
+        if edge:
+            ts, pk = edge[0]
+            conds.append(Q(created_at__lt=ts) | Q(created_at=ts, id__lte=pk))
+    if not conds:
+        return None
+    expired = conds[0]
+    for cond in conds[1:]:
+        expired |= cond
+    return bucket & expired
+
+
+# -- archive files --------------------------------------------------------------
+def archive_dir() -> Path:
+    return Path(getattr(settings, "SYSTEM_LOG_ARCHIVE_DIR", Path(settings.BASE_DIR) / "archive" / "system_logs"))
+
+
+def partition_path(day: date) -> Path:
+    return archive_dir() / f"{day:%Y}" / f"{day:%m}" / f"system_logs-{day.isoformat()}.jsonl.gz"
+
+
+def _record(row: dict[str, Any]) -> dict[str, Any]:
+    return {**row, "created_at": row["created_at"].isoformat()}
+
+
+def archive_rows(rows: Iterable[dict[str, Any]]) -> int:
+    """Append rows to their day's archive file; returns the number written."""
+    by_day: dict[date, list[dict[str, Any]]] = {}
+    for row in rows:
+        by_day.setdefault(timezone.localdate(row["created_at"]), []).append(row)
+
+    written = 0
+    for day, group in sorted(by_day.items()):
+        path = partition_path(day)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = "".join(json.dumps(_record(r), ensure_ascii=False) + "\n" for r in group).encode("utf-8")
+        with open(path, "ab") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="ab", mtime=0) as gz:
+                gz.write(payload)
+            raw.flush()
+            os.fsync(raw.fileno())
+        written += len(group)
+    return written
+
+
+def archive_days(since: date | None = None, until: date | None = None) -> list[tuple[date, Path]]:
+    out = []
+    for path in archive_dir().glob("*/*/system_logs-*.jsonl.gz"):
+        try:
+            day = date.fromisoformat(path.name[len("system_logs-"):-len(".jsonl.gz")])
+        except ValueError:
+            continue
+        if (since is None or day >= since) and (until is None or day <= until):
+            out.append((day, path))
+    return sorted(out)
+
+
+def iter_archive(
+    *,
+    since: date | None = None,
+    until: date | None = None,
+    source: str | None = None,
+    level: str | None = None,
+    contains: str | None = None,
+) -> Iterator[dict[str, Any]]:
+    """Archived records (created_at as ISO strings) oldest day first, de-duplicated by id."""
+    for _day, path in archive_days(since, until):
+        seen: set[int] = set()
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            for line in fh:
+                if not line.strip():
+                    continue
+                rec = json.loads(line)
+                if rec["id"] in seen:
+                    continue
+                seen.add(rec["id"])
+                if source and rec["source"] != source:
+                    continue
+                if level and rec["level"] != level:
+                    continue
+                if contains and contains.lower() not in rec["message"].lower():
+                    continue
+                yield rec
+
+
+def reimport(records: Iterable[dict[str, Any]], *, batch_size: int = 500) -> tuple[int, int]:
+    """Insert archived records back with their original ids; returns (inserted, skipped)."""
+    inserted = skipped = 0
+    batch: list[dict[str, Any]] = []
+
+    def flush() -> None:
+        nonlocal inserted, skipped
+        existing = set(SystemLog.objects.filter(id__in=[r["id"] for r in batch]).values_list("id", flat=True))
+        fresh = [
+            SystemLog(id=r["id"], source=r["source"], level=r["level"], message=r["message"],
+                      created_at=parse_datetime(r["created_at"]))
+            for r in batch if r["id"] not in existing
+        ]
+        with transaction.atomic():
+            SystemLog.objects.bulk_create(fresh, ignore_conflicts=True)
+        inserted += len(fresh)
+        skipped += len(batch) - len(fresh)
+        batch.clear()
+
+    for rec in records:
+        batch.append(rec)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return inserted, skipped
+
+
+# -- pruning --------------------------------------------------------------------
+_stats_lock = threading.Lock()
+_stats: dict[str, Any] = {
+    "runs": 0, "deleted": 0, "archived": 0, "skipped_locked": 0, "lease_lost": 0, "errors": 0, "last_run": None,
+}
+
+
+def _bump(name: str, n: int = 1) -> None:
+    with _stats_lock:
+        _stats[name] += n
+
+
+class _LeaseLost(Exception):
+    pass
+
+
+def prune(*, archive: bool = True, dry_run: bool = False, now: datetime | None = None) -> dict[str, Any]:
+    """Expire rows per the retention rules. Only one process prunes at a time."""
+    now = now or timezone.now()
+    chunk = max(1, int(getattr(settings, "SYSTEM_LOG_RETENTION_CHUNK", 500)))
+    pause = float(getattr(settings, "SYSTEM_LOG_RETENTION_PAUSE", 0.05))
+    token = uuid.uuid4().hex
+    if not dry_run and not leases.acquire(_LEASE_NAME, token, _LEASE_SECONDS):
+        _bump("skipped_locked")
+        return {"skipped": "another prune is running", "rules": []}
+
+    report: list[dict[str, Any]] = []
+    started = time.monotonic()
+    lost = False
+    try:
+        for rule, bucket in _buckets(load_rules()):
+            expired = _expired(rule, bucket, now)
+            entry = {"rule": rule.label, "days": rule.days, "max_rows": rule.max_rows, "expired": 0, "deleted": 0, "archived": 0}
+            report.append(entry)
+            if expired is None:
+                continue
+            qs = SystemLog.objects.filter(expired)
+            if dry_run:
+                entry["expired"] = qs.count()
+                continue
+            while True:
+                rows = list(qs.order_by("id").values(*COLUMNS)[:chunk])
+                if not rows:
+                    break
+                if archive:
+                    entry["archived"] += archive_rows(rows)
+                with transaction.atomic():
+                    deleted, _ = SystemLog.objects.filter(id__in=[r["id"] for r in rows]).delete()
+                entry["deleted"] += deleted
+                entry["expired"] += len(rows)
+                if not leases.acquire(_LEASE_NAME, token, _LEASE_SECONDS):
+                    raise _LeaseLost
+                if pause:
+                    time.sleep(pause)
+    except _LeaseLost:
+        lost = True
+        _bump("lease_lost")
+        logger.warning("SystemLog prune stopped: its lease expired and another process holds it")
+    finally:
+        if not dry_run:
+            leases.release(_LEASE_NAME, token)
+
+    if not dry_run:
+        with _stats_lock:
+            _stats["runs"] += 1
+            _stats["deleted"] += sum(e["deleted"] for e in report)
+            _stats["archived"] += sum(e["archived"] for e in report)
+            _stats["last_run"] = now.isoformat()
+    out = {"rules": report, "elapsed_s": round(time.monotonic() - started, 3), "dry_run": dry_run}
+    if lost:
+        out["stopped"] = "lease lost to another process"
+    return out
+
+
+def retention_stats() -> dict[str, Any]:
+    with _stats_lock:
+        out = dict(_stats)
+    out["autostart"] = bool(getattr(settings, "SYSTEM_LOG_RETENTION_AUTOSTART", False))
+    out["interval"] = float(getattr(settings, "SYSTEM_LOG_RETENTION_INTERVAL", 3600))
+    return out
+
+
+_thread: threading.Thread | None = None
+_thread_pid: int | None = None
+
+
+def start_retention() -> None:
+    """Prune every SYSTEM_LOG_RETENTION_INTERVAL seconds in a daemon thread (once per process)."""
+    global _thread, _thread_pid
+    if _thread is not None and _thread_pid == os.getpid() and _thread.is_alive():
+        return
+
+    def loop() -> None:
+        interval = float(getattr(settings, "SYSTEM_LOG_RETENTION_INTERVAL", 3600))
+        delay = min(60.0, interval)  # keep startup cheap
+        while True:
+            time.sleep(delay)
+            delay = interval
+            try:
+                prune(archive=bool(getattr(settings, "SYSTEM_LOG_ARCHIVE", True)))
+            except Exception:
+                _bump("errors")
+                logger.exception("SystemLog retention run failed")
+            finally:
+                close_old_connections()
+
+    _thread_pid = os.getpid()
+    _thread = threading.Thread(target=loop, name="system-log-retention", daemon=True)
+    _thread.start()
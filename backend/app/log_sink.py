@@ -0,0 +1,167 @@
+"""
+Buffered SystemLog writer.
+
+`log_system()` enqueues records here instead of INSERTing inline. One
+background thread per process drains the queue with `bulk_create`, either
+when SYSTEM_LOG_BATCH_SIZE records are waiting or SYSTEM_LOG_FLUSH_INTERVAL
+seconds after the first queued record, whichever comes first. When the
+queue is full, callers wait up to SYSTEM_LOG_BLOCK_TIMEOUT seconds. After
+that the record is dropped and counted.
+"""
+from __future__ import annotations
+from typing import Any
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .live_events import hub as live_hub
+
+
+logger = logging.getLogger(__name__)
+
+
+class _Flush:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+
+
+class SystemLogSink:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._queue: queue.Queue | None = None
+        self._thread: threading.Thread | None = None
+        self._pid: int | None = None
+        # bumped from request threads and the writer thread alike
+        self._stats_lock = threading.Lock()
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.errors = 0
+
+    def _bump(self, name: str, n: int = 1) -> None:
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    # -- producer side ---------------------------------------------------------
+    def emit(self, source: str, level: str, message: str) -> None:
+        if not getattr(settings, "SYSTEM_LOG_BUFFERED", True):
+            self._write([(source, level, message, timezone.now())])
+            return
+
+        q = self._ensure_started()
+        try:
+            q.put((source, level, message, timezone.now()), timeout=float(getattr(settings, "SYSTEM_LOG_BLOCK_TIMEOUT", 0.05)))
+            self._bump("enqueued")
+        except queue.Full:
+            self._bump("dropped")
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until everything queued before this call is written."""
+        q = self._queue
+        if q is None or self._pid != os.getpid() or not (self._thread and self._thread.is_alive()):
+            return True
+        marker = _Flush()
+        try:
+            q.put(marker, timeout=timeout)
+        except queue.Full:
+            return False
+        return marker.done.wait(timeout)
+
+    def stats(self) -> dict[str, Any]:
+        with self._stats_lock:
+            counts = {
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "dropped": self.dropped,
+                "flushes": self.flushes,
+                "errors": self.errors,
+            }
+        return {
+            "buffered": bool(getattr(settings, "SYSTEM_LOG_BUFFERED", True)),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            **counts,
+        }
+
+    # -- consumer side ---------------------------------------------------------
+    def _ensure_started(self) -> queue.Queue:
+        pid = os.getpid()
+        if self._queue is not None and self._pid == pid:
+            return self._queue
+        with self._lock:
+            # (re)start after fork so each gunicorn worker owns its own writer
+            if self._queue is None or self._pid != pid:
+                self._queue = queue.Queue(maxsize=int(getattr(settings, "SYSTEM_LOG_QUEUE_SIZE", 10000)))
+                self._pid = pid
+                self._thread = threading.Thread(target=self._run, name="system-log-sink", daemon=True)
+                self._thread.start()
+        return self._queue
+
+    def _run(self) -> None:
+        q = self._queue
+        batch_size = int(getattr(settings, "SYSTEM_LOG_BATCH_SIZE", 100))
+        interval = float(getattr(settings, "SYSTEM_LOG_FLUSH_INTERVAL", 1.0))
+        while True:
+            batch: list[tuple] = []
+            markers: list[_Flush] = []
+            item = q.get()
+            deadline = time.monotonic() + interval
+            while True:
+                if isinstance(item, _Flush):
+                    markers.append(item)
+                    # drain whatever is already queued, then flush right away
+                    while True:
+                        try:
+                            nxt = q.get_nowait()
+                        except queue.Empty:
+                            break
+                        if isinstance(nxt, _Flush):
+                            markers.append(nxt)
+                        else:
+                            batch.append(nxt)
+                    break
+                batch.append(item)
+                if len(batch) >= batch_size:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = q.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            if batch:
+                for start in range(0, len(batch), batch_size):
+                    self._write(batch[start:start + batch_size])
+            for m in markers:
+                m.done.set()
+
+    def _write(self, records: list[tuple]) -> None:
+        from .models import SystemLog
+
+        try:
+            SystemLog.objects.bulk_create([
+                SystemLog(source=source, level=level, message=message, created_at=created_at)
+                for source, level, message, created_at in records
+            ])
+            with self._stats_lock:
+                self.written += len(records)
+                self.flushes += 1
+            live_hub.nudge()
+        except Exception:
+            self._bump("errors")
+            logger.exception("SystemLog flush failed; dropped %d records", len(records))
+            if threading.current_thread() is self._thread:
+                connection.close()
+
+
+sink = SystemLogSink()
+atexit.register(sink.flush)
@@ -0,0 +1,27 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild RunRollup rows from RunLog history."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--since",
+            help="Only rebuild days on or after this date (YYYY-MM-DD). Default: all history.",
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options.get("since"):
+            try:
+                since = date.fromisoformat(options["since"])
+            except ValueError as exc:
+                raise CommandError(f"Invalid --since date: {exc}") from exc
+
+        buckets = rebuild_rollups(since)
+        scope = f"since {since.isoformat()}" if since else "for all history"
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {buckets} rollup buckets {scope}."))
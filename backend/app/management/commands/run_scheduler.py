@@ -0,0 +1,28 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from app.log_sink import sink as log_sink
+from app.services.scheduler_service import scheduler
+
+
+class Command(BaseCommand):
+    help = "Run the agent cron scheduler in the foreground until interrupted."
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: stop.set())
+
+        scheduler.start()
+        self.stdout.write(self.style.SUCCESS("Agent scheduler started."))
+        while not stop.wait(60):
+            st = scheduler.stats()
+            self.stdout.write(
+                f"jobs={st['jobs']} leader={st['leader']} dispatched={st['dispatched']} "
+                f"misfired={st['misfired']} coalesced={st['coalesced']} failed={st['failed']}"
+            )
+        scheduler.stop()
+        log_sink.flush()
+        self.stdout.write("Agent scheduler stopped.")
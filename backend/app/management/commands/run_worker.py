@@ -0,0 +1,37 @@
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from app.log_sink import sink as log_sink
+from app.run_queue import queue
+
+
+class Command(BaseCommand):
+    help = "Execute queued agent runs (RunJob rows) until interrupted."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=None,
+            help=f"Worker threads. Default: RUN_QUEUE_CONCURRENCY ({settings.RUN_QUEUE_CONCURRENCY}).",
+        )
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: stop.set())
+
+        queue.start(options.get("concurrency"))
+        self.stdout.write(self.style.SUCCESS(f"Run queue worker started ({queue.stats()['workers']} threads)."))
+        while not stop.wait(60):
+            st = queue.stats()
+            self.stdout.write(
+                f"queued={st['queued']} running={st['running']} processed={st['processed']} "
+                f"retried={st['retried']} failed={st['failed']}"
+            )
+        queue.stop(timeout=30)
+        log_sink.flush()
+        self.stdout.write("Run queue worker stopped.")
@@ -0,0 +1,85 @@
+from datetime import date
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.log_retention import archive_days, iter_archive, prune, reimport
+
+
+def _date(value: str | None, flag: str) -> date | None:
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError as exc:
+        raise CommandError(f"Invalid {flag} date: {exc}") from exc
+
+
+class Command(BaseCommand):
+    help = "SystemLog retention: prune expired rows into archives, list/query archives, re-import them."
+
+    def add_arguments(self, parser):
+        sub = parser.add_subparsers(dest="action", required=True)
+
+        p = sub.add_parser("prune", help="Archive and delete rows expired under the retention rules.")
+        p.add_argument("--dry-run", action="store_true", help="Only count what would be removed.")
+        p.add_argument("--no-archive", action="store_true", help="Delete without writing archive files.")
+
+        sub.add_parser("list", help="List archive partitions.")
+
+        for name, text in (("query", "Print archived records as JSON lines."),
+                           ("reimport", "Insert archived records back into SystemLog (original ids).")):
+            p = sub.add_parser(name, help=text)
+            p.add_argument("--since", help="First day (YYYY-MM-DD), inclusive.")
+            p.add_argument("--until", help="Last day (YYYY-MM-DD), inclusive.")
+            p.add_argument("--source")
+            p.add_argument("--level")
+            p.add_argument("--contains", help="Case-insensitive substring of the message.")
+            if name == "query":
+                p.add_argument("--limit", type=int, default=0, help="Stop after N records (0 = all).")
+
+    def handle(self, *args, **options):
+        action = options["action"]
+        if action == "prune":
+            self._prune(options)
+        elif action == "list":
+            for day, path in archive_days():
+                self.stdout.write(f"{day.isoformat()}  {path.stat().st_size:>10} B  {path}")
+        else:
+            records = iter_archive(
+                since=_date(options.get("since"), "--since"),
+                until=_date(options.get("until"), "--until"),
+                source=options.get("source"),
+                level=options.get("level"),
+                contains=options.get("contains"),
+            )
+            if action == "query":
+                limit = options.get("limit") or 0
+                for n, rec in enumerate(records, 1):
+                    self.stdout.write(json.dumps(rec, ensure_ascii=False))
+                    if limit and n >= limit:
+                        break
+            else:
+                inserted, skipped = reimport(records)
+                self.stdout.write(self.style.SUCCESS(
+                    f"Re-imported {inserted} records ({skipped} already present). "
+                    "Rows still past retention are removed again by the next prune."
+                ))
+
+    def _prune(self, options) -> None:
+        dry_run = options["dry_run"]
+        report = prune(archive=not options["no_archive"], dry_run=dry_run)
+        if report.get("skipped"):
+            raise CommandError(f"Not pruned: {report['skipped']}.")
+        for entry in report["rules"]:
+            limits = f"days={entry['days'] or '-'} max_rows={entry['max_rows'] or '-'}"
+            if dry_run:
+                self.stdout.write(f"{entry['rule']:<24} {limits:<30} would remove {entry['expired']}")
+            else:
+                self.stdout.write(
+                    f"{entry['rule']:<24} {limits:<30} deleted {entry['deleted']}, archived {entry['archived']}"
+                )
+        if report.get("stopped"):
+            self.stderr.write(f"Stopped early: {report['stopped']}.")
+        verb = "Dry run finished" if dry_run else "Pruned"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {len(report['rules'])} rules in {report['elapsed_s']}s."))
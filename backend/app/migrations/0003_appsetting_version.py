@@ -0,0 +1,18 @@
+# Generated by Django 5.0.8 on 2026-10-17 00:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0002_systemlog_created_at_default'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appsetting',
+            name='version',
+            field=models.PositiveBigIntegerField(default=1, editable=False),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.8 on 2026-10-17 00:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0003_appsetting_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RunRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(choices=[('success', 'success'), ('failed', 'failed'), ('sandboxed', 'sandboxed')], max_length=20)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('agent', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='rollups', to='app.agent')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='runrollup',
+            constraint=models.UniqueConstraint(fields=('day', 'agent', 'status'), name='uniq_run_rollup_day_agent_status'),
+        ),
+    ]
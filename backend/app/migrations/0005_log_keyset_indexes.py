@@ -0,0 +1,37 @@
+# Generated by Django 5.0.8 on 2026-10-17 00:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0004_runrollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='runlog',
+            index=models.Index(fields=['started_at', 'id'], name='runlog_started_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='runlog',
+            index=models.Index(fields=['agent', 'started_at', 'id'], name='runlog_agent_started_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='runlog',
+            index=models.Index(fields=['status', 'started_at', 'id'], name='runlog_status_started_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='systemlog',
+            index=models.Index(fields=['created_at', 'id'], name='syslog_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='systemlog',
+            index=models.Index(fields=['source', 'created_at', 'id'], name='syslog_source_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='systemlog',
+            index=models.Index(fields=['level', 'created_at', 'id'], name='syslog_level_created_id_idx'),
+        ),
+    ]
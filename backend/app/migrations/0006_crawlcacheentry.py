@@ -0,0 +1,33 @@
+# Generated by Django 5.0.8 on 2026-10-17 00:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0005_log_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CrawlCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url_key', models.CharField(max_length=64, unique=True)),
+                ('url', models.TextField()),
+                ('etag', models.CharField(blank=True, default='', max_length=255)),
+                ('last_modified', models.CharField(blank=True, default='', max_length=64)),
+                ('content_hash', models.CharField(max_length=64)),
+                ('title', models.TextField(blank=True, default='')),
+                ('text', models.TextField(blank=True, default='')),
+                ('length', models.PositiveIntegerField(default=0)),
+                ('truncated', models.BooleanField(default=False)),
+                ('size', models.PositiveIntegerField(default=0)),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('fetched_at', models.DateTimeField()),
+                ('checked_at', models.DateTimeField()),
+                ('last_access', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
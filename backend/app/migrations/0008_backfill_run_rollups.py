@@ -0,0 +1,33 @@
+from django.db import migrations
+from django.db.models import Count
+
+
+def backfill(apps, schema_editor):
+    """Seed RunRollup from existing RunLog history so upgraded installs keep their analytics."""
+    RunLog = apps.get_model("app", "RunLog")
+    RunRollup = apps.get_model("app", "RunRollup")
+    if RunRollup.objects.exists():
+        return  # already populated (record_run or backfill_run_rollups ran)
+    rows = (
+        RunLog.objects.values("started_at__date", "agent_id", "status")
+        .annotate(c=Count("id"))
+        .order_by()
+    )
+    RunRollup.objects.bulk_create(
+        [
+            RunRollup(day=r["started_at__date"], agent_id=r["agent_id"], status=r["status"], count=r["c"])
+            for r in rows.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0007_runjob'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
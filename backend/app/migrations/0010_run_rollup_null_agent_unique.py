@@ -0,0 +1,40 @@
+# Generated by Django 5.0.8 on 2026-10-17 01:18
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_null_buckets(apps, schema_editor):
+    """Fold duplicate (day, NULL, status) rollups into one row before the constraint is added."""
+    RunRollup = apps.get_model("app", "RunRollup")
+    dupes = (
+        RunRollup.objects.filter(agent__isnull=True)
+        .values("day", "status")
+        .annotate(n=Count("id"), keep=Min("id"), total=Sum("count"))
+        .filter(n__gt=1)
+        .order_by()
+    )
+    for d in list(dupes):
+        bucket = RunRollup.objects.filter(agent__isnull=True, day=d["day"], status=d["status"])
+        bucket.exclude(id=d["keep"]).delete()
+        bucket.filter(id=d["keep"]).update(count=d["total"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_lease'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='runrollup',
+            name='uniq_run_rollup_day_agent_status',
+        ),
+        migrations.RunPython(merge_null_buckets, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='runrollup',
+            constraint=models.UniqueConstraint(models.F('day'), django.db.models.functions.comparison.Coalesce('agent', models.Value(0)), models.F('status'), name='uniq_run_rollup_day_agent_status'),
+        ),
+    ]
@@ -1,10 +1,25 @@
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
 
 class AppSetting(models.Model):
     groq_api_key = models.TextField(blank=True, default="")
     groq_model = models.CharField(max_length=120, default="llama-3.3-70b-versatile")
     sandbox_default = models.BooleanField(default=True)
+    # bumped on every save so per-process settings caches notice changes
+    version = models.PositiveBigIntegerField(default=1, editable=False)
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            self.version = models.F("version") + 1
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "version"}
+        super().save(*args, **kwargs)
+        if isinstance(self.version, models.expressions.Combinable):
+            self.refresh_from_db(fields=["version"])
 
     def __str__(self) -> str:
         return f"AppSetting<{self.id}> model={self.groq_model}"
@@ -37,15 +52,117 @@ class RunLog(models.Model):
     started_at = models.DateTimeField()
     ended_at = models.DateTimeField()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["started_at", "id"], name="runlog_started_id_idx"),
+            models.Index(fields=["agent", "started_at", "id"], name="runlog_agent_started_id_idx"),
+            models.Index(fields=["status", "started_at", "id"], name="runlog_status_started_id_idx"),
+        ]
+
     def __str__(self) -> str:
         return f"RunLog<{self.id}> {self.status}"
 
 
+class RunRollup(models.Model):
+    """Per-day, per-agent, per-status RunLog counts kept in step by app.rollups."""
+
+    day = models.DateField()
+    agent = models.ForeignKey(Agent, null=True, blank=True, on_delete=models.SET_NULL, related_name="rollups")
+    status = models.CharField(max_length=20, choices=RunLog.STATUS_CHOICES)
+    count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            # agent_id is coalesced so agent-less buckets are unique too; a plain
+            # (day, agent, status) constraint treats each NULL as distinct
+            models.UniqueConstraint(
+                F("day"), Coalesce("agent", Value(0)), F("status"), name="uniq_run_rollup_day_agent_status",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"RunRollup<{self.day}> agent={self.agent_id} {self.status}={self.count}"
+
+
+class RunJob(models.Model):
+    """Queued agent run, executed by app.run_queue workers."""
+
+    STATUS_CHOICES = [
+        ("queued", "queued"),
+        ("running", "running"),
+        ("done", "done"),
+        ("failed", "failed"),
+    ]
+    agent = models.ForeignKey(Agent, null=True, blank=True, on_delete=models.SET_NULL, related_name="jobs")
+    trigger = models.CharField(max_length=20, default="manual")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="queued")
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    available_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=64, blank=True, default="")
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default="")
+    run = models.ForeignKey(RunLog, null=True, blank=True, on_delete=models.SET_NULL, related_name="+")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "available_at", "id"], name="runjob_status_available_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"RunJob<{self.id}> agent={self.agent_id} {self.status}"
+
+
 class SystemLog(models.Model):
     source = models.CharField(max_length=80)
     level = models.CharField(max_length=20, default="info")
     message = models.TextField()
-    created_at = models.DateTimeField(auto_now_add=True)
+    # set at log_system() time, not at (buffered) INSERT time
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="syslog_created_id_idx"),
+            models.Index(fields=["source", "created_at", "id"], name="syslog_source_created_id_idx"),
+            models.Index(fields=["level", "created_at", "id"], name="syslog_level_created_id_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"SystemLog<{self.id}> {self.source}:{self.level}"
+
+
+class CrawlCacheEntry(models.Model):
+    """Last extraction of a crawled URL, kept by app.services.crawl_cache."""
+
+    url_key = models.CharField(max_length=64, unique=True)  # sha256 of the normalized URL
+    url = models.TextField()
+    etag = models.CharField(max_length=255, blank=True, default="")
+    last_modified = models.CharField(max_length=64, blank=True, default="")
+    content_hash = models.CharField(max_length=64)  # sha256 of the bytes that were parsed
+    title = models.TextField(blank=True, default="")
+    text = models.TextField(blank=True, default="")
+    length = models.PositiveIntegerField(default=0)
+    truncated = models.BooleanField(default=False)
+    size = models.PositiveIntegerField(default=0)  # stored bytes, for eviction
+    hits = models.PositiveIntegerField(default=0)
+    fetched_at = models.DateTimeField()
+    checked_at = models.DateTimeField()
+    last_access = models.DateTimeField(db_index=True)
+
+    def __str__(self) -> str:
+        return f"CrawlCacheEntry<{self.id}> {self.url}"
+
+
+class Lease(models.Model):
+    """Named, time-limited lock shared by every process; see app.leases."""
+
+    name = models.CharField(max_length=100, unique=True)
+    holder = models.CharField(max_length=64, blank=True, default="")
+    expires_at = models.DateTimeField()
+
+    def __str__(self) -> str:
+        return f"Lease<{self.name}> {self.holder or '-'}"
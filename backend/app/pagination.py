@@ -0,0 +1,84 @@
+"""
+Keyset (cursor) pagination over (timestamp, id).
+
+Cursors are opaque url-safe strings encoding the (timestamp, id) of a row.
+`cursor=` walks backwards into older rows; `since=` returns only rows
+written after the cursor's row, for cheap incremental polling.
+
+Works on model querysets and on .values() querysets (rows as dicts, which
+must include "id" and the timestamp column).
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+import base64
+
+from django.db.models import Q, QuerySet
+
+
+@dataclass
+class Page:
+    rows: list[Any]
+    next_cursor: str | None
+    latest_cursor: str | None
+    has_more: bool
+
+
+def encode_cursor(ts: datetime, pk: int) -> str:
+    raw = f"{ts.isoformat()}|{pk}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(value: str) -> tuple[datetime, int]:
+    try:
+        padded = value + "=" * (-len(value) % 4)
+        ts_raw, pk_raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8").split("|", 1)
+        return datetime.fromisoformat(ts_raw), int(pk_raw)
+    except Exception as exc:
+        raise ValueError(f"Invalid cursor: {value!r}") from exc
+
+
+def keyset_page(
+    qs: QuerySet,
+    *,
+    ts_field: str,
+    limit: int,
+    cursor: str | None = None,
+    since: str | None = None,
+) -> Page:
+    """Newest-first page of `qs`; raises ValueError for a malformed cursor."""
+    def pk_of(row) -> int:
+        return row["id"] if isinstance(row, dict) else row.pk
+
+    def cursor_of(row) -> str:
+        if isinstance(row, dict):
+            return encode_cursor(row[ts_field], row["id"])
+        return encode_cursor(getattr(row, ts_field), row.pk)
+
+    if since:
+        since_ts, since_pk = decode_cursor(since)
+        # Rows can commit out of timestamp order (buffered SystemLog writer,
+        # RunLog.started_at taken before the webhook returns), so "newer than
+        # what I have" is decided by id, which is assigned at INSERT time.
+        rows = list(qs.filter(pk__gt=since_pk).order_by("pk")[: limit + 1])
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        rows.reverse()
+        latest = cursor_of(rows[0]) if rows else since
+        return Page(rows=rows, next_cursor=None, latest_cursor=latest, has_more=has_more)
+
+    if cursor:
+        ts, pk = decode_cursor(cursor)
+        qs = qs.filter(Q(**{f"{ts_field}__lt": ts}) | Q(**{ts_field: ts, "pk__lt": pk}))
+
+    rows = list(qs.order_by(f"-{ts_field}", "-pk")[: limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return Page(
+        rows=rows,
+        next_cursor=cursor_of(rows[-1]) if has_more and rows else None,
+        # highest id, not newest timestamp, so a later `since=` poll skips nothing
+        latest_cursor=cursor_of(max(rows, key=pk_of)) if rows and not cursor else None,
+        has_more=has_more,
+    )
@@ -0,0 +1,66 @@
+from __future__ import annotations
+from datetime import date
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Agent, RunLog, RunRollup
+
+
+def _add(day: date, agent_id: int | None, status: str, n: int) -> None:
+    bucket = RunRollup.objects.filter(day=day, agent_id=agent_id, status=status)
+    with transaction.atomic():
+        if bucket.update(count=F("count") + n, updated_at=timezone.now()):
+            return
+        try:
+            with transaction.atomic():
+                RunRollup.objects.create(day=day, agent_id=agent_id, status=status, count=n)
+        except IntegrityError:
+            # another writer created the bucket between our UPDATE and INSERT
+            bucket.update(count=F("count") + n, updated_at=timezone.now())
+
+
+def record_run(run: RunLog) -> None:
+    """Add one run to its (day, agent, status) rollup bucket."""
+    _add(timezone.localdate(run.started_at), run.agent_id, run.status, 1)
+
+
+@receiver(pre_delete, sender=Agent, dispatch_uid="rollups-fold-deleted-agent")
+def fold_deleted_agent(sender, instance: Agent, **kwargs) -> None:
+    """
+    Move a deleted agent's buckets into the agent-less ones. Left to SET_NULL,
+    they would collide with an existing (day, NULL, status) bucket.
+    """
+    with transaction.atomic():
+        rows = list(RunRollup.objects.filter(agent_id=instance.pk).values_list("id", "day", "status", "count"))
+        RunRollup.objects.filter(id__in=[r[0] for r in rows]).delete()
+        for _id, day, status, n in rows:
+            _add(day, None, status, n)
+
+
+def rebuild_rollups(since: date | None = None) -> int:
+    """Recompute rollups from RunLog (from `since` onwards, or all history)."""
+    runs = RunLog.objects.all()
+    existing = RunRollup.objects.all()
+    if since is not None:
+        runs = runs.filter(started_at__date__gte=since)
+        existing = existing.filter(day__gte=since)
+
+    rows = (
+        runs.values("started_at__date", "agent_id", "status")
+        .annotate(c=Count("id"))
+        .order_by()
+    )
+    with transaction.atomic():
+        existing.delete()
+        created = RunRollup.objects.bulk_create(
+            [
+                RunRollup(day=r["started_at__date"], agent_id=r["agent_id"], status=r["status"], count=r["c"])
+                for r in rows.iterator()
+            ],
+            batch_size=1000,
+        )
+    return len(created)
@@ -0,0 +1,227 @@
+"""
+Database-backed queue for agent runs (RunJob rows).
+
+enqueue() inserts a job and returns at once. Worker threads claim the
+oldest available job with a conditional UPDATE (queued -> running), so
+any number of threads and processes can share the table. A failed
+webhook is retried up to the job's max_attempts, with exponential backoff
+(RUN_QUEUE_RETRY_BACKOFF * 2**(attempt - 1) seconds), unless the
+dispatcher marked the failure non-retryable (anything but a connection
+error, 429 or 503): that job fails at once. Each attempt is a single
+POST, because the dispatcher's own retries are turned off for queued
+runs. Only the final outcome writes a RunLog.
+
+Workers run in `python manage.py run_worker`. RUN_QUEUE_AUTOSTART=1 also
+starts them inside every web process. A job whose worker disappeared
+(locked longer than RUN_QUEUE_LEASE_SECONDS) goes back to the queue.
+"""
+from __future__ import annotations
+from datetime import timedelta
+from typing import Any
+import logging
+import os
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .models import Agent, RunJob
+from .runs import perform_agent_action, record_agent_run
+
+
+logger = logging.getLogger(__name__)
+
+
+class RunQueue:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._pid: int | None = None
+        self._token = ""
+        self._last_reclaim = 0.0
+        self._stats_lock = threading.Lock()
+        self.processed = 0
+        self.retried = 0
+        self.failed = 0
+        self.reclaimed = 0
+
+    def _bump(self, name: str, n: int = 1) -> None:
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    # -- producer side ---------------------------------------------------------
+    def enqueue(self, agent: Agent, *, trigger: str = "manual") -> RunJob:
+        job = RunJob.objects.create(
+            agent=agent,
+            trigger=trigger,
+            max_attempts=max(1, int(getattr(settings, "RUN_QUEUE_MAX_ATTEMPTS", 3))),
+        )
+        if getattr(settings, "RUN_QUEUE_AUTOSTART", False):
+            self.start()
+        self._wake.set()
+        return job
+
+    def enqueue_many(self, agents: list[Agent], *, trigger: str = "manual") -> list[RunJob]:
+        """Queue one job per agent with a single multi-row INSERT."""
+        max_attempts = max(1, int(getattr(settings, "RUN_QUEUE_MAX_ATTEMPTS", 3)))
+        jobs = RunJob.objects.bulk_create(
+            [RunJob(agent=agent, trigger=trigger, max_attempts=max_attempts) for agent in agents],
+            batch_size=500,
+        )
+        if jobs:
+            if getattr(settings, "RUN_QUEUE_AUTOSTART", False):
+                self.start()
+            self._wake.set()
+        return jobs
+
+    # -- lifecycle -------------------------------------------------------------
+    def start(self, concurrency: int | None = None) -> None:
+        pid = os.getpid()
+        if self._pid == pid and any(t.is_alive() for t in self._threads):
+            return
+        with self._lock:
+            # (re)start after fork so each worker process owns its own threads
+            if self._pid == pid and any(t.is_alive() for t in self._threads):
+                return
+            self._pid = pid
+            self._token = f"{os.uname().nodename}:{pid}:{uuid.uuid4().hex[:8]}"[:64]
+            self._stop.clear()
+            n = concurrency or int(getattr(settings, "RUN_QUEUE_CONCURRENCY", 4))
+            self._threads = [
+                threading.Thread(target=self._work, name=f"run-queue-{i}", daemon=True)
+                for i in range(max(1, n))
+            ]
+            for t in self._threads:
+                t.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        self._wake.set()
+        for t in self._threads:
+            t.join(timeout)
+
+    @property
+    def started(self) -> bool:
+        return self._pid == os.getpid() and any(t.is_alive() for t in self._threads)
+
+    # -- consumer side ---------------------------------------------------------
+    def _work(self) -> None:
+        poll = float(getattr(settings, "RUN_QUEUE_POLL_SECONDS", 2))
+        while not self._stop.is_set():
+            job = None
+            try:
+                job = self._claim()
+                if job is not None:
+                    self._process(job)
+            except Exception:
+                logger.exception("run queue worker iteration failed")
+            finally:
+                close_old_connections()
+            if job is None:
+                self._wake.wait(poll)
+                self._wake.clear()
+
+    def _claim(self) -> RunJob | None:
+        now = timezone.now()
+        self._reclaim_stale(now)
+        candidates = list(
+            RunJob.objects.filter(status="queued", available_at__lte=now)
+            .order_by("id")
+            .values_list("id", flat=True)[:8]
+        )
+        for pk in candidates:
+            claimed = RunJob.objects.filter(pk=pk, status="queued").update(
+                status="running",
+                locked_by=self._token,
+                locked_at=now,
+                attempts=F("attempts") + 1,
+            )
+            if claimed:
+                return RunJob.objects.select_related("agent").get(pk=pk)
+        return None
+
+    def _reclaim_stale(self, now) -> None:
+        lease = float(getattr(settings, "RUN_QUEUE_LEASE_SECONDS", 300))
+        if time.monotonic() - self._last_reclaim < min(lease / 2, 60):
+            return
+        self._last_reclaim = time.monotonic()
+        n = RunJob.objects.filter(status="running", locked_at__lt=now - timedelta(seconds=lease)).update(
+            status="queued", locked_by="", locked_at=None,
+        )
+        if n:
+            self._bump("reclaimed", n)
+            logger.warning("re-queued %d run jobs whose worker stopped responding", n)
+
+    def _process(self, job: RunJob) -> None:
+        now = timezone.now()
+        mine = RunJob.objects.filter(pk=job.pk, locked_by=self._token)
+        if job.started_at is None:
+            job.started_at = now
+            mine.update(started_at=now)
+
+        agent = job.agent
+        if agent is None or job.attempts > job.max_attempts:
+            reason = "Agent was deleted" if agent is None else "Worker lost while running; attempts exhausted"
+            mine.update(status="failed", last_error=reason, finished_at=now, locked_by="", locked_at=None)
+            self._bump("failed")
+            return
+
+        # the queue owns retries for its jobs: one POST per attempt
+        run_status, msg, result = perform_agent_action(agent, retries=0)
+
+        if run_status == "failed" and result.get("retryable") and job.attempts < job.max_attempts:
+            backoff = float(getattr(settings, "RUN_QUEUE_RETRY_BACKOFF", 5)) * 2 ** (job.attempts - 1)
+            mine.update(
+                status="queued",
+                available_at=timezone.now() + timedelta(seconds=backoff),
+                last_error=msg[:5000],
+                locked_by="",
+                locked_at=None,
+            )
+            self._bump("retried")
+            return
+
+        run = record_agent_run(agent, run_status, msg, started_at=job.started_at, trigger=job.trigger)
+        mine.update(
+            status="failed" if run_status == "failed" else "done",
+            run=run,
+            last_error=msg[:5000] if run_status == "failed" else "",
+            finished_at=timezone.now(),
+            locked_by="",
+            locked_at=None,
+        )
+        self._bump("processed")
+        if run_status == "failed":
+            self._bump("failed")
+
+    # -- introspection ---------------------------------------------------------
+    def stats(self) -> dict[str, Any]:
+        counts = dict(
+            RunJob.objects.filter(status__in=("queued", "running"))
+            .values_list("status")
+            .annotate(n=Count("id"))
+            .values_list("status", "n")
+        )
+        with self._stats_lock:
+            totals = {
+                "processed": self.processed,
+                "retried": self.retried,
+                "failed": self.failed,
+                "reclaimed": self.reclaimed,
+            }
+        return {
+            "started": self.started,
+            "workers": sum(t.is_alive() for t in self._threads) if self.started else 0,
+            "queued": counts.get("queued", 0),
+            "running": counts.get("running", 0),
+            **totals,
+        }
+
+
+queue = RunQueue()
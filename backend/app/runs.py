@@ -0,0 +1,68 @@
+from __future__ import annotations
+from datetime import datetime
+from typing import Any
+
+from django.conf import settings
+from django.utils import timezone
+
+from .live_events import hub as live_hub
+from .log_sink import sink as log_sink
+from .models import Agent, RunLog
+from .rollups import record_run
+from .services.make_service import trigger_make_webhook
+
+
+def perform_agent_action(agent: Agent, *, retries: int | None = None) -> tuple[str, str, dict[str, Any]]:
+    """Call the Make webhook for `agent` (or sandbox it). Returns (status, message, webhook result)."""
+    if agent.sandbox:
+        return "sandboxed", "Sandbox run (no external action).", {}
+
+    payload = {
+        "agent_id": agent.id,
+        "name": agent.name,
+        "role": agent.role,
+        "goal": agent.goal,
+        "action_type": agent.action_type,
+        "schedule_cron": agent.schedule_cron,
+    }
+    result_payload = trigger_make_webhook(
+        webhook_url=settings.MAKE_WEBHOOK_URL,
+        payload=payload,
+        retries=retries,
+    )
+    if not result_payload.get("ok"):
+        return "failed", result_payload.get("error") or "Webhook failed", result_payload
+    return "success", f"Webhook status {result_payload.get('status_code')}", result_payload
+
+
+def record_agent_run(
+    agent: Agent,
+    run_status: str,
+    msg: str,
+    *,
+    started_at: datetime,
+    trigger: str = "manual",
+) -> RunLog:
+    """Write the RunLog row and its rollup, and log the outcome."""
+    run = RunLog.objects.create(
+        agent=agent,
+        status=run_status,
+        message=msg,
+        started_at=started_at,
+        ended_at=timezone.now(),
+    )
+    record_run(run)
+    live_hub.nudge()
+
+    level = "info" if run_status in ("success", "sandboxed") else "error"
+    source = "run_now" if trigger == "manual" else f"run_{trigger}"
+    log_sink.emit(source, level, f"Agent {agent.id} run -> {run_status}: {msg}"[:5000])
+    return run
+
+
+def execute_agent_run(agent: Agent, *, trigger: str = "manual") -> tuple[RunLog, dict[str, Any]]:
+    """Run one agent once and record it. Used by the scheduler and ?wait=1 run-now."""
+    start = timezone.now()
+    run_status, msg, result_payload = perform_agent_action(agent)
+    run = record_agent_run(agent, run_status, msg, started_at=start, trigger=trigger)
+    return run, result_payload
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import AppSetting, Agent, RunLog, SystemLog
+from .models import AppSetting, Agent, RunJob, RunLog, SystemLog
 
 
 class AppSettingSerializer(serializers.ModelSerializer):
@@ -30,6 +30,17 @@ class RunLogSerializer(serializers.ModelSerializer):
         return obj.agent.name if obj.agent else None
 
 
+class RunJobSerializer(serializers.ModelSerializer):
+    run = RunLogSerializer(read_only=True)
+
+    class Meta:
+        model = RunJob
+        fields = (
+            "id", "agent", "trigger", "status", "attempts", "max_attempts", "last_error",
+            "run", "created_at", "started_at", "finished_at",
+        )
+
+
 class SystemLogSerializer(serializers.ModelSerializer):
     class Meta:
         model = SystemLog
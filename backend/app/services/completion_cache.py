@@ -0,0 +1,216 @@
+"""
+Opt-in cache for deterministic chat completions.
+
+Keyed on a canonical hash of (model, messages, temperature, top_p,
+max_tokens). Tier one is a bounded in-process LRU with TTL; tier two
+(CHAT_CACHE_SHARED) is the on-disk "shared" cache so gunicorn workers
+reuse each other's replies.
+"""
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Any, Iterable
+import hashlib
+import json
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+
+from .groq_client import ChatMessage, achat_completion, chat_completion
+
+
+class _LRU:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._items: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self.evictions = 0
+
+    def get(self, key: str, ttl: float) -> str | None:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            stored_at, value = item
+            if time.monotonic() - stored_at > ttl:
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: str, max_entries: int) -> None:
+        with self._lock:
+            self._items[key] = (time.monotonic(), value)
+            self._items.move_to_end(key)
+            while len(self._items) > max_entries:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+_lru = _LRU()
+_stats_lock = threading.Lock()
+_stats = {"hits_memory": 0, "hits_shared": 0, "misses": 0, "bypassed": 0, "stores": 0}
+
+
+def _bump(name: str) -> None:
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def cache_enabled() -> bool:
+    return bool(getattr(settings, "CHAT_CACHE_ENABLED", False))
+
+
+def _ttl() -> float:
+    return float(getattr(settings, "CHAT_CACHE_TTL", 300))
+
+
+def make_key(
+    *,
+    model: str,
+    messages: Iterable[ChatMessage],
+    temperature: float = 1.0,
+    max_tokens: int = 2048,
+    top_p: float = 1.0,
+) -> str:
+    canonical = json.dumps(
+        {
+            "model": model,
+            "messages": [[m.role, m.content] for m in messages],
+            "temperature": float(temperature),
+            "top_p": float(top_p),
+            "max_tokens": int(max_tokens),
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return "chat:" + hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def lookup(key: str, *, bypass: bool = False) -> str | None:
+    """Return a cached reply for `key`, checking memory first, then the shared tier."""
+    if bypass:
+        _bump("bypassed")
+        return None
+    value = _lru.get(key, _ttl())
+    if value is not None:
+        _bump("hits_memory")
+        return value
+    if getattr(settings, "CHAT_CACHE_SHARED", False):
+        try:
+            value = caches["shared"].get(key)
+        except Exception:
+            value = None
+        if value is not None:
+            _lru.put(key, value, int(getattr(settings, "CHAT_CACHE_MAX_ENTRIES", 512)))
+            _bump("hits_shared")
+            return value
+    _bump("misses")
+    return None
+
+
+def store(key: str, reply: str) -> None:
+    if not reply:
+        return
+    _lru.put(key, reply, int(getattr(settings, "CHAT_CACHE_MAX_ENTRIES", 512)))
+    if getattr(settings, "CHAT_CACHE_SHARED", False):
+        try:
+            caches["shared"].set(key, reply, timeout=_ttl())
+        except Exception:
+            pass
+    _bump("stores")
+
+
+async def alookup(key: str, *, bypass: bool = False) -> str | None:
+    """`lookup` for async callers: the on-disk shared tier is read off the event loop."""
+    if not getattr(settings, "CHAT_CACHE_SHARED", False):
+        return lookup(key, bypass=bypass)  # memory only
+    return await sync_to_async(lookup, thread_sensitive=False)(key, bypass=bypass)
+
+
+async def astore(key: str, reply: str) -> None:
+    if not getattr(settings, "CHAT_CACHE_SHARED", False):
+        store(key, reply)
+        return
+    await sync_to_async(store, thread_sensitive=False)(key, reply)
+
+
+def cached_chat_completion(
+    *,
+    api_key: str,
+    model: str,
+    messages: Iterable[ChatMessage],
+    temperature: float = 1.0,
+    max_tokens: int = 2048,
+    top_p: float = 1.0,
+    bypass: bool = False,
+) -> tuple[str, bool]:
+    """`chat_completion` behind the cache. Returns (reply, served_from_cache)."""
+    messages = list(messages)
+    if not cache_enabled():
+        return chat_completion(
+            api_key=api_key, model=model, messages=messages,
+            temperature=temperature, max_tokens=max_tokens, top_p=top_p,
+        ), False
+
+    key = make_key(model=model, messages=messages, temperature=temperature, max_tokens=max_tokens, top_p=top_p)
+    hit = lookup(key, bypass=bypass)
+    if hit is not None:
+        return hit, True
+
+    reply = chat_completion(
+        api_key=api_key, model=model, messages=messages,
+        temperature=temperature, max_tokens=max_tokens, top_p=top_p,
+    )
+    store(key, reply)
+    return reply, False
+
+
+async def acached_chat_completion(
+    *,
+    api_key: str,
+    model: str,
+    messages: Iterable[ChatMessage],
+    temperature: float = 1.0,
+    max_tokens: int = 2048,
+    top_p: float = 1.0,
+    bypass: bool = False,
+) -> tuple[str, bool]:
+    """Async twin of `cached_chat_completion`."""
+    messages = list(messages)
+    if not cache_enabled():
+        return await achat_completion(
+            api_key=api_key, model=model, messages=messages,
+            temperature=temperature, max_tokens=max_tokens, top_p=top_p,
+        ), False
+
+    key = make_key(model=model, messages=messages, temperature=temperature, max_tokens=max_tokens, top_p=top_p)
+    hit = await alookup(key, bypass=bypass)
+    if hit is not None:
+        return hit, True
+
+    reply = await achat_completion(
+        api_key=api_key, model=model, messages=messages,
+        temperature=temperature, max_tokens=max_tokens, top_p=top_p,
+    )
+    await astore(key, reply)
+    return reply, False
+
+
+def cache_stats() -> dict[str, Any]:
+    with _stats_lock:
+        out: dict[str, Any] = dict(_stats)
+    hits = out["hits_memory"] + out["hits_shared"]
+    lookups = hits + out["misses"]
+    out.update({
+        "enabled": cache_enabled(),
+        "entries": len(_lru),
+        "evictions": _lru.evictions,
+        "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+    })
+    return out
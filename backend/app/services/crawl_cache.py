@@ -0,0 +1,254 @@
+"""
+Persistent, content-addressed cache for crawl_extract results.
+
+Entries (CrawlCacheEntry rows) are keyed by normalized URL. For
+CRAWL_CACHE_FRESHNESS seconds, the stored extraction is served with no
+network traffic. After that, the page is revalidated with If-None-Match /
+If-Modified-Since. A 304, or a 200 whose body hashes to the stored
+content_hash, keeps the stored extraction. When revalidating, the body
+(at most CRAWL_MAX_BYTES) is hashed as it arrives and parsed only if the
+hash changed. Unchanged pages are never re-parsed. On a plain miss there is
+nothing to compare with, so the body is hashed and parsed in the same pass
+and is never buffered.
+
+The total stored size is capped by CRAWL_CACHE_MAX_BYTES, and the least
+recently accessed entries are evicted first. Each process keeps a running
+size from its own writes. It re-reads the table total only when that size
+passes the cap, or after every CRAWL_CACHE_RESYNC_WRITES writes to pick up
+other workers' writes.
+"""
+from __future__ import annotations
+from typing import Any, Callable, Iterable, Iterator
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import hashlib
+import re
+import threading
+
+from django.conf import settings
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from ..models import CrawlCacheEntry
+from .html_extract import declared_charset
+from .http_transport import timeouts, upstream_session
+
+
+Extractor = Callable[[Iterable[bytes], "str | None"], dict[str, Any]]
+
+_TRACKING_PARAM_RE = re.compile(r"^(utm_\w+|fbclid|gclid|mc_cid|mc_eid)$")
+_DEFAULT_PORTS = {("http", 80), ("https", 443)}
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "revalidated": 0, "unchanged": 0, "misses": 0, "bypassed": 0, "stale_served": 0, "errors": 0, "evictions": 0}
+
+
+def _bump(name: str, n: int = 1) -> None:
+    with _stats_lock:
+        _stats[name] += n
+
+
+def cache_enabled() -> bool:
+    return bool(getattr(settings, "CRAWL_CACHE_ENABLED", True))
+
+
+def normalize_url(url: str) -> str:
+    """Lower-case scheme/host, drop default port, fragment and tracking params, sort the query."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = (parts.hostname or "").lower()
+    if parts.port is not None and (scheme, parts.port) not in _DEFAULT_PORTS:
+        netloc = f"{netloc}:{parts.port}"
+    if parts.username:
+        userinfo = parts.username + (f":{parts.password}" if parts.password else "")
+        netloc = f"{userinfo}@{netloc}"
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not _TRACKING_PARAM_RE.match(k.lower())
+    ))
+    return urlunsplit((scheme, netloc, parts.path or "/", query, ""))
+
+
+def _key(normalized: str) -> str:
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _result(url: str, entry: CrawlCacheEntry, cache: str, bytes_read: int) -> dict[str, Any]:
+    return {
+        "url": url,
+        "title": entry.title,
+        "text": entry.text,
+        "length": entry.length,
+        "truncated": entry.truncated,
+        "bytes_read": bytes_read,
+        "cache": cache,
+    }
+
+
+class _HashedBody:
+    """Yield at most max_bytes + 1 bytes (so the extractor can tell it was cut), hashing as they pass."""
+
+    def __init__(self, resp, max_bytes: int) -> None:
+        self._resp = resp
+        self._max_bytes = max_bytes
+        self._digest = hashlib.sha256()
+        self.total = 0
+        self._chunks = self._read()
+
+    def _read(self) -> Iterator[bytes]:
+        for chunk in self._resp.iter_content(chunk_size=16384):
+            if not chunk:
+                continue
+            chunk = chunk[: self._max_bytes + 1 - self.total]
+            self._digest.update(chunk)
+            self.total += len(chunk)
+            yield chunk
+            if self.total > self._max_bytes:
+                break
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self._chunks
+
+    def hexdigest(self) -> str:
+        for _ in self._chunks:  # hash whatever the extractor left unread
+            pass
+        return self._digest.hexdigest()
+
+
+def get_extraction(url: str, *, timeout: float, extract: Extractor, bypass: bool = False) -> dict[str, Any]:
+    """
+    Return crawl_extract's dict for `url` plus "cache": one of hit, revalidated,
+    unchanged, miss or stale. `extract(chunks, encoding)` does the actual parse.
+    """
+    normalized = normalize_url(url)
+    key = _key(normalized)
+    now = timezone.now()
+    entry = CrawlCacheEntry.objects.filter(url_key=key).first()
+    freshness = float(getattr(settings, "CRAWL_CACHE_FRESHNESS", 900))
+
+    if bypass:
+        _bump("bypassed")
+    elif entry is not None and (now - entry.checked_at).total_seconds() < freshness:
+        CrawlCacheEntry.objects.filter(pk=entry.pk).update(hits=F("hits") + 1, last_access=now)
+        _bump("hits")
+        return _result(url, entry, "hit", 0)
+
+    headers = {"User-Agent": "Mozilla/5.0"}
+    if entry is not None and not bypass:
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+
+    max_bytes = int(getattr(settings, "CRAWL_MAX_BYTES", 2_000_000))
+    try:
+        resp = upstream_session().get(url, timeout=timeouts(timeout), headers=headers, stream=True)
+        with resp:
+            if resp.status_code == 304 and entry is not None:
+                CrawlCacheEntry.objects.filter(pk=entry.pk).update(
+                    hits=F("hits") + 1, checked_at=now, last_access=now,
+                )
+                _bump("revalidated")
+                return _result(url, entry, "revalidated", 0)
+            resp.raise_for_status()
+            validators = {
+                "etag": resp.headers.get("ETag", "")[:255],
+                "last_modified": resp.headers.get("Last-Modified", "")[:64],
+            }
+            body = _HashedBody(resp, max_bytes)
+            data = None
+            if entry is not None and not bypass:
+                # hash first; only a changed page is worth parsing
+                chunks = list(body)
+                content_hash = body.hexdigest()
+                if content_hash != entry.content_hash:
+                    data = extract(chunks, declared_charset(resp.headers))
+            else:
+                data = extract(body, declared_charset(resp.headers))
+                content_hash = body.hexdigest()
+    except Exception:
+        _bump("errors")
+        if entry is not None and not bypass:
+            _bump("stale_served")
+            return _result(url, entry, "stale", 0)
+        raise
+
+    bytes_read = min(body.total, max_bytes)
+    if entry is not None and not bypass and entry.content_hash == content_hash:
+        CrawlCacheEntry.objects.filter(pk=entry.pk).update(
+            hits=F("hits") + 1, checked_at=now, last_access=now, **validators,
+        )
+        _bump("unchanged")
+        return _result(url, entry, "unchanged", bytes_read)
+
+    size = len(data["title"].encode("utf-8")) + len(data["text"].encode("utf-8"))
+    CrawlCacheEntry.objects.update_or_create(
+        url_key=key,
+        defaults={
+            "url": normalized,
+            "content_hash": content_hash,
+            "title": data["title"],
+            "text": data["text"],
+            "length": data["length"],
+            "truncated": data["truncated"],
+            "size": size,
+            "fetched_at": now,
+            "checked_at": now,
+            "last_access": now,
+            **validators,
+        },
+    )
+    _bump("misses")
+    _note_write(size - (entry.size if entry is not None else 0))
+    return {"url": url, **data, "cache": "miss"}
+
+
+# running total of CrawlCacheEntry.size as this process sees it; None = not read yet
+_size_lock = threading.Lock()
+_size: dict[str, Any] = {"bytes": None, "writes": 0}
+
+
+def _note_write(delta: int) -> None:
+    limit = int(getattr(settings, "CRAWL_CACHE_MAX_BYTES", 50_000_000))
+    resync_every = int(getattr(settings, "CRAWL_CACHE_RESYNC_WRITES", 100))
+    with _size_lock:
+        _size["writes"] += 1
+        if _size["bytes"] is not None:
+            _size["bytes"] += delta
+        check = _size["bytes"] is None or _size["bytes"] > limit or _size["writes"] >= resync_every
+    if check:
+        _evict()
+
+
+def _evict() -> None:
+    """Re-read the table total, evict least recently accessed entries past the cap, reset the running size."""
+    limit = int(getattr(settings, "CRAWL_CACHE_MAX_BYTES", 50_000_000))
+    total = CrawlCacheEntry.objects.aggregate(total=Sum("size"))["total"] or 0
+    excess = total - limit
+    if excess > 0:
+        doomed: list[int] = []
+        for pk, size in CrawlCacheEntry.objects.order_by("last_access").values_list("pk", "size").iterator():
+            doomed.append(pk)
+            total -= size
+            excess -= size
+            if excess <= 0:
+                break
+        CrawlCacheEntry.objects.filter(pk__in=doomed).delete()
+        _bump("evictions", len(doomed))
+    with _size_lock:
+        _size["bytes"] = total
+        _size["writes"] = 0
+
+
+def crawl_cache_stats() -> dict[str, Any]:
+    with _stats_lock:
+        out: dict[str, Any] = dict(_stats)
+    hits = out["hits"] + out["revalidated"] + out["unchanged"]
+    lookups = hits + out["misses"]
+    agg = CrawlCacheEntry.objects.aggregate(total=Sum("size"))
+    out.update({
+        "enabled": cache_enabled(),
+        "entries": CrawlCacheEntry.objects.count(),
+        "bytes": agg["total"] or 0,
+        "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+    })
+    return out
@@ -0,0 +1,162 @@
+"""
+Shared, conditionally revalidated cache for query-independent RSS feeds.
+
+Parsed entries live in the on-disk "shared" cache (visible to every
+worker), plus a per-process copy. An entry is served without any network
+traffic for NEWS_FEED_FRESHNESS seconds. After that, a single
+revalidation per feed uses If-None-Match / If-Modified-Since: one thread
+per process (per-URL lock) and one process per host (cache lease). Every
+other caller keeps getting the stale copy in the meantime.
+"""
+from __future__ import annotations
+from typing import Any, Callable
+import hashlib
+import threading
+import time
+
+import feedparser
+from django.conf import settings
+from django.core.cache import caches
+
+from .http_transport import timeouts, upstream_session
+
+
+_local: dict[str, dict[str, Any]] = {}
+_locks: dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+_stats_lock = threading.Lock()
+_stats = {"hits_local": 0, "hits_shared": 0, "not_modified": 0, "downloads": 0, "stale_served": 0, "errors": 0}
+
+# Called with (url, entries) whenever this process loads a newer copy of a feed.
+_listeners: list[Callable[[str, list[dict[str, Any]]], None]] = []
+
+
+def _bump(name: str) -> None:
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def _freshness() -> float:
+    return float(getattr(settings, "NEWS_FEED_FRESHNESS", 120))
+
+
+def _key(url: str) -> str:
+    return "feed:" + hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+
+def _is_fresh(entry: dict[str, Any] | None) -> bool:
+    return bool(entry) and time.time() - entry["checked_at"] < _freshness()
+
+
+def _lock_for(url: str) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(url, threading.Lock())
+
+
+def on_entries_loaded(callback: Callable[[str, list[dict[str, Any]]], None]) -> None:
+    _listeners.append(callback)
+
+
+def _remember(url: str, entry: dict[str, Any]) -> None:
+    previous = _local.get(url)
+    _local[url] = entry
+    if previous is None or previous["checked_at"] != entry["checked_at"]:
+        for callback in _listeners:
+            callback(url, entry["entries"])
+
+
+def get_feed_entries(
+    url: str,
+    *,
+    timeout: float,
+    to_item: Callable[[Any], dict[str, Any]],
+) -> list[dict[str, Any]]:
+    """Return parsed entries for `url`, revalidating upstream only when stale."""
+    entry = _local.get(url)
+    if _is_fresh(entry):
+        _bump("hits_local")
+        return entry["entries"]
+
+    store = caches["shared"]
+    key = _key(url)
+    shared = store.get(key)
+    if _is_fresh(shared):
+        _remember(url, shared)
+        _bump("hits_shared")
+        return shared["entries"]
+
+    with _lock_for(url):
+        # another thread in this process may have refreshed while we waited
+        entry = _local.get(url)
+        if _is_fresh(entry):
+            _bump("hits_local")
+            return entry["entries"]
+        current = store.get(key) or shared or entry
+        if _is_fresh(current):
+            _remember(url, current)
+            _bump("hits_shared")
+            return current["entries"]
+
+        lease_key = f"{key}:lease"
+        if current and not store.add(lease_key, 1, timeout=max(timeout * 2, 5)):
+            # another worker is revalidating; serve what we have
+            _remember(url, current)
+            _bump("stale_served")
+            return current["entries"]
+
+        try:
+            return _revalidate(url, key, current, timeout=timeout, to_item=to_item)
+        finally:
+            if current:
+                store.delete(lease_key)
+
+
+def _revalidate(
+    url: str,
+    key: str,
+    current: dict[str, Any] | None,
+    *,
+    timeout: float,
+    to_item: Callable[[Any], dict[str, Any]],
+) -> list[dict[str, Any]]:
+    headers = {"User-Agent": "Mozilla/5.0"}
+    if current:
+        if current.get("etag"):
+            headers["If-None-Match"] = current["etag"]
+        if current.get("last_modified"):
+            headers["If-Modified-Since"] = current["last_modified"]
+
+    try:
+        resp = upstream_session().get(url, timeout=timeouts(timeout), headers=headers)
+        if resp.status_code == 304 and current:
+            refreshed = {**current, "checked_at": time.time()}
+            _bump("not_modified")
+        else:
+            resp.raise_for_status()
+            feed = feedparser.parse(resp.content)
+            refreshed = {
+                "etag": resp.headers.get("ETag", ""),
+                "last_modified": resp.headers.get("Last-Modified", ""),
+                "entries": [to_item(e) for e in feed.entries],
+                "checked_at": time.time(),
+                "version": hashlib.sha1(resp.content).hexdigest(),
+            }
+            _bump("downloads")
+    except Exception:
+        _bump("errors")
+        if current:
+            _remember(url, current)
+            _bump("stale_served")
+            return current["entries"]
+        raise
+
+    caches["shared"].set(key, refreshed, timeout=None)
+    _remember(url, refreshed)
+    return refreshed["entries"]
+
+
+def feed_cache_stats() -> dict[str, Any]:
+    with _stats_lock:
+        out: dict[str, Any] = dict(_stats)
+    out["feeds"] = len(_local)
+    return out
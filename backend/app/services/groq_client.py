@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Generator, Iterable
+from typing import AsyncGenerator, Generator, Iterable
 import json
-import requests
 
+from django.conf import settings
+
+from . import llm_telemetry, model_capabilities
+from .http_transport import async_timeouts, timeouts, upstream_async_client, upstream_session
 
-GROQ_API_BASE = "https://api.groq.com/openai/v1"
 
 MODEL_CATALOG: dict[str, list[str]] = {
     "recommended": [
@@ -24,6 +26,10 @@ MODEL_CATALOG: dict[str, list[str]] = {
 }
 
 
+def api_base() -> str:
+    return str(getattr(settings, "GROQ_API_BASE", "https://api.groq.com/openai/v1")).rstrip("/")
+
+
 def all_models() -> list[str]:
     out: list[str] = []
     for _, items in MODEL_CATALOG.items():
@@ -50,6 +56,35 @@ def _headers(api_key: str) -> dict[str, str]:
     }
 
 
+def _error_message(r) -> str:
+    try:
+        err = r.json()
+    except Exception:
+        err = {"error": {"message": r.text}}
+    return str(err.get("error", {}).get("message", r.text))
+
+
+def _parse_sse_line(line: str, meter=None) -> str | None:
+    """Return the delta text of one SSE line, "" to skip it, None at [DONE].
+
+    Usage (Groq puts it in `x_groq.usage` on the last chunk) is handed to `meter`.
+    """
+    if not line or not line.startswith("data:"):
+        return ""
+    raw = line[len("data:"):].strip()
+    if raw == "[DONE]":
+        return None
+    try:
+        obj = json.loads(raw)
+    except Exception:
+        return ""
+    if meter is not None:
+        usage = obj.get("usage") or (obj.get("x_groq") or {}).get("usage")
+        if usage:
+            meter.observe_usage(usage)
+    return (obj.get("choices") or [{}])[0].get("delta", {}).get("content", "") or ""
+
+
 def chat_completion(
     *,
     api_key: str,
@@ -70,33 +105,35 @@ def chat_completion(
     }
 
     # keep optional for compatible models
-    payload["reasoning_effort"] = reasoning_effort
+    if model_capabilities.should_send(model, "reasoning_effort"):
+        payload["reasoning_effort"] = reasoning_effort
 
-    r = requests.post(
-        f"{GROQ_API_BASE}/chat/completions",
-        headers=_headers(api_key),
-        json=payload,
-        timeout=60,
-    )
+    session = upstream_session()
+    with llm_telemetry.track(model, "chat") as meter:
+        r = session.post(
+            f"{api_base()}/chat/completions",
+            headers=_headers(api_key),
+            json=payload,
+            timeout=timeouts(60),
+        )
 
-    # retry once without reasoning_effort if model rejects it
-    if r.status_code >= 400:
-        try:
-            err = r.json()
-        except Exception:
-            err = {"error": {"message": r.text}}
-        msg = str(err.get("error", {}).get("message", ""))
-        if "reasoning_effort" in msg:
-            payload.pop("reasoning_effort", None)
-            r = requests.post(
-                f"{GROQ_API_BASE}/chat/completions",
-                headers=_headers(api_key),
-                json=payload,
-                timeout=60,
-            )
+        # retry once without reasoning_effort if model rejects it
+        if r.status_code >= 400 and "reasoning_effort" in payload:
+            if "reasoning_effort" in _error_message(r):
+                model_capabilities.record(model, "reasoning_effort", False)
+                payload.pop("reasoning_effort", None)
+                r = session.post(
+                    f"{api_base()}/chat/completions",
+                    headers=_headers(api_key),
+                    json=payload,
+                    timeout=timeouts(60),
+                )
 
-    r.raise_for_status()
-    data = r.json()
+        r.raise_for_status()
+        if "reasoning_effort" in payload:
+            model_capabilities.record(model, "reasoning_effort", True)
+        data = r.json()
+        meter.observe_usage(data.get("usage"))
     return (data.get("choices", [{}])[0].get("message", {}).get("content") or "").strip()
 
 
@@ -117,50 +154,142 @@ def stream_completion(
         "max_tokens": max_tokens,
         "top_p": top_p,
         "stream": True,
-        "reasoning_effort": reasoning_effort,
     }
+    if model_capabilities.should_send(model, "reasoning_effort"):
+        payload["reasoning_effort"] = reasoning_effort
 
-    def _do_stream(p: dict):
-        with requests.post(
-            f"{GROQ_API_BASE}/chat/completions",
+    def _do_stream(p: dict, meter):
+        with upstream_session().post(
+            f"{api_base()}/chat/completions",
             headers=_headers(api_key),
             json=p,
-            timeout=120,
+            timeout=timeouts(120),
             stream=True,
         ) as r:
             if r.status_code >= 400:
                 # if reasoning_effort not supported, caller can retry
-                try:
-                    err = r.json()
-                except Exception:
-                    err = {"error": {"message": r.text}}
-                raise RuntimeError(str(err.get("error", {}).get("message", r.text)))
+                raise RuntimeError(_error_message(r))
+            if "reasoning_effort" in p:
+                model_capabilities.record(model, "reasoning_effort", True)
 
             for line in r.iter_lines(decode_unicode=True):
-                if not line:
-                    continue
-                if not line.startswith("data:"):
-                    continue
-                raw = line[len("data:"):].strip()
-                if raw == "[DONE]":
+                delta = _parse_sse_line(line, meter)
+                if delta is None:
                     break
-                try:
-                    obj = json.loads(raw)
-                except Exception:
-                    continue
-                delta = (
-                    obj.get("choices", [{}])[0]
-                    .get("delta", {})
-                    .get("content", "")
-                )
                 if delta:
+                    meter.chunk()
                     yield delta
 
-    try:
-        yield from _do_stream(payload)
-    except RuntimeError as e:
-        if "reasoning_effort" in str(e):
+    with llm_telemetry.track(model, "chat_stream") as meter:
+        try:
+            yield from _do_stream(payload, meter)
+        except RuntimeError as e:
+            if "reasoning_effort" in payload and "reasoning_effort" in str(e):
+                model_capabilities.record(model, "reasoning_effort", False)
+                payload.pop("reasoning_effort", None)
+                yield from _do_stream(payload, meter)
+            else:
+                raise
+
+
+async def achat_completion(
+    *,
+    api_key: str,
+    model: str,
+    messages: Iterable[ChatMessage],
+    temperature: float = 1.0,
+    max_tokens: int = 2048,
+    top_p: float = 1.0,
+    reasoning_effort: str = "medium",
+) -> str:
+    """Async twin of `chat_completion` for ASGI views."""
+    payload = {
+        "model": model,
+        "messages": [{"role": m.role, "content": m.content} for m in messages],
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "top_p": top_p,
+        "stream": False,
+    }
+    if model_capabilities.should_send(model, "reasoning_effort"):
+        payload["reasoning_effort"] = reasoning_effort
+
+    client = upstream_async_client()
+    with llm_telemetry.track(model, "chat") as meter:
+        r = await client.post(
+            f"{api_base()}/chat/completions",
+            headers=_headers(api_key),
+            json=payload,
+            timeout=async_timeouts(60),
+        )
+
+        # retry once without reasoning_effort if model rejects it
+        if r.status_code >= 400 and "reasoning_effort" in payload and "reasoning_effort" in _error_message(r):
+            model_capabilities.record(model, "reasoning_effort", False)
             payload.pop("reasoning_effort", None)
-            yield from _do_stream(payload)
-        else:
-            raise
+            r = await client.post(
+                f"{api_base()}/chat/completions",
+                headers=_headers(api_key),
+                json=payload,
+                timeout=async_timeouts(60),
+            )
+
+        r.raise_for_status()
+        if "reasoning_effort" in payload:
+            model_capabilities.record(model, "reasoning_effort", True)
+        data = r.json()
+        meter.observe_usage(data.get("usage"))
+    return (data.get("choices", [{}])[0].get("message", {}).get("content") or "").strip()
+
+
+async def astream_completion(
+    *,
+    api_key: str,
+    model: str,
+    messages: Iterable[ChatMessage],
+    temperature: float = 1.0,
+    max_tokens: int = 2048,
+    top_p: float = 1.0,
+    reasoning_effort: str = "medium",
+) -> AsyncGenerator[str, None]:
+    """Async twin of `stream_completion` for ASGI views."""
+    payload = {
+        "model": model,
+        "messages": [{"role": m.role, "content": m.content} for m in messages],
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "top_p": top_p,
+        "stream": True,
+    }
+    if model_capabilities.should_send(model, "reasoning_effort"):
+        payload["reasoning_effort"] = reasoning_effort
+    client = upstream_async_client()
+
+    with llm_telemetry.track(model, "chat_stream") as meter:
+        for attempt in range(2):
+            async with client.stream(
+                "POST",
+                f"{api_base()}/chat/completions",
+                headers=_headers(api_key),
+                json=payload,
+                timeout=async_timeouts(120),
+            ) as r:
+                if r.status_code >= 400:
+                    await r.aread()
+                    msg = _error_message(r)
+                    if attempt == 0 and "reasoning_effort" in payload and "reasoning_effort" in msg:
+                        model_capabilities.record(model, "reasoning_effort", False)
+                        payload.pop("reasoning_effort", None)
+                        continue
+                    raise RuntimeError(msg)
+                if "reasoning_effort" in payload:
+                    model_capabilities.record(model, "reasoning_effort", True)
+
+                async for line in r.aiter_lines():
+                    delta = _parse_sse_line(line, meter)
+                    if delta is None:
+                        break
+                    if delta:
+                        meter.chunk()
+                        yield delta
+                return
@@ -0,0 +1,251 @@
+"""
+Streaming title/paragraph extraction for crawl_extract.
+
+The page is fed to an incremental parser one network chunk at a time.
+Only <title> and <p> text outside script/style/noscript/header/footer/svg
+is kept. Paragraphs past the text budget are only counted, so `length`
+is still the length of the full extracted text. Input stops at max_bytes. Two
+backends are available: lxml when installed ("auto" or "lxml"), and
+the stdlib html.parser otherwise.
+"""
+from __future__ import annotations
+from html.parser import HTMLParser
+from typing import Iterable
+import codecs
+import re
+
+import requests
+
+try:  # optional, faster backend
+    from lxml import etree as _lxml_etree
+except ImportError:  # pragma: no cover - depends on environment
+    _lxml_etree = None
+
+
+SKIP_TAGS = frozenset({"script", "style", "noscript", "header", "footer", "svg"})
+# Start tags that implicitly close an open <p> (HTML parsing rules). lxml
+# applies these itself; html.parser does not, so the collector does.
+_CLOSES_P = frozenset({
+    "p", "div", "ul", "ol", "dl", "table", "section", "article", "aside", "nav", "main",
+    "blockquote", "pre", "form", "hr", "h1", "h2", "h3", "h4", "h5", "h6", "figure",
+})
+_META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset=["']?([a-zA-Z0-9_-]+)""", re.IGNORECASE)
+
+
+class _Collector:
+    """Backend-neutral state machine fed with start/end/data events."""
+
+    def __init__(self, text_budget: int) -> None:
+        self.text_budget = text_budget
+        self.skip_depth = 0
+        self.in_p = False
+        self.in_title = False
+        self.title_parts: list[str] | None = None
+        self.title = ""
+        self.paragraph: list[str] = []
+        self.paragraphs: list[str] = []
+        self.text_len = 0  # kept paragraphs, with separators
+        self.total_len = 0  # every paragraph, kept or not
+        self._pending: list[str] = []
+
+    @property
+    def full(self) -> bool:
+        return self.text_len >= self.text_budget
+
+    def _flush_text(self) -> None:
+        if not self._pending:
+            return
+        piece = "".join(self._pending).strip()
+        self._pending = []
+        if not piece or self.skip_depth:
+            return
+        if self.in_title and self.title_parts is not None:
+            self.title_parts.append(piece)
+        elif self.in_p:
+            self.paragraph.append(piece)
+
+    def start(self, tag: str) -> None:
+        self._flush_text()
+        tag = tag.lower()
+        if self.in_p and not self.skip_depth and tag in _CLOSES_P:
+            self.in_p = False
+            self._end_paragraph()
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+        elif self.skip_depth:
+            return
+        elif tag == "title" and self.title_parts is None:
+            self.in_title = True
+            self.title_parts = []
+        elif tag == "p":
+            self.in_p = True
+
+    def end(self, tag: str) -> None:
+        self._flush_text()
+        tag = tag.lower()
+        if tag in SKIP_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif self.skip_depth:
+            return
+        elif tag == "title" and self.in_title:
+            self.in_title = False
+            self.title = " ".join(self.title_parts or [])
+        elif tag == "p" and self.in_p:
+            self.in_p = False
+            self._end_paragraph()
+
+    def data(self, text: str) -> None:
+        if not self.skip_depth and (self.in_p or self.in_title):
+            self._pending.append(text)
+
+    def close(self) -> None:
+        self._flush_text()
+        if self.in_title:
+            self.title = " ".join(self.title_parts or [])
+        if self.in_p:
+            self._end_paragraph()
+
+    def _end_paragraph(self) -> None:
+        text = " ".join(self.paragraph)
+        self.paragraph = []
+        if text:
+            self.total_len += len(text) + (1 if self.total_len else 0)
+            if not self.full:
+                self.paragraphs.append(text)
+                self.text_len += len(text) + 1
+
+
+class _StdlibParser(HTMLParser):
+    def __init__(self, collector: _Collector) -> None:
+        super().__init__(convert_charrefs=True)
+        self.c = collector
+
+    def handle_starttag(self, tag, attrs):
+        self.c.start(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        # <br/> etc.: still a word boundary
+        self.c.start(tag)
+        self.c.end(tag)
+
+    def handle_endtag(self, tag):
+        self.c.end(tag)
+
+    def handle_data(self, data):
+        self.c.data(data)
+
+
+class _LxmlTarget:
+    def __init__(self, collector: _Collector) -> None:
+        self.c = collector
+
+    def start(self, tag, attrib):
+        self.c.start(tag)
+
+    def end(self, tag):
+        self.c.end(tag)
+
+    def data(self, data):
+        self.c.data(data)
+
+    def comment(self, text):
+        pass
+
+    def close(self):
+        return None
+
+
+def available_backends() -> list[str]:
+    return (["lxml"] if _lxml_etree is not None else []) + ["html.parser"]
+
+
+def declared_charset(headers) -> str | None:
+    """Charset from Content-Type, if the server actually sent one."""
+    content_type = headers.get("Content-Type", "")
+    if "charset=" not in content_type.lower():
+        # requests assumes ISO-8859-1 for text/* without charset; sniff <meta charset> instead
+        return None
+    return requests.utils.get_encoding_from_headers(headers)
+
+
+def sniff_encoding(head: bytes, declared: str | None) -> str:
+    """Declared charset, else <meta charset> in the first chunk, else utf-8."""
+    if declared:
+        return declared
+    m = _META_CHARSET_RE.search(head[:4096])
+    if m:
+        try:
+            return codecs.lookup(m.group(1).decode("ascii")).name
+        except LookupError:
+            pass
+    return "utf-8"
+
+
+def extract_from_chunks(
+    chunks: Iterable[bytes],
+    *,
+    encoding: str | None = None,
+    text_budget: int = 50000,
+    max_bytes: int = 2_000_000,
+    backend: str = "auto",
+) -> dict[str, object]:
+    """
+    Extract {title, text, length, truncated, bytes_read} from HTML byte chunks.
+
+    `text` is cut at `text_budget` characters. `length` is the length of the
+    whole extracted text, as the BeautifulSoup path reported it. Reading stops
+    after `max_bytes` of input. `truncated` is set when either limit applied.
+    """
+    collector = _Collector(text_budget)
+    use_lxml = backend in ("auto", "lxml") and _lxml_etree is not None
+    if backend == "lxml" and _lxml_etree is None:
+        raise RuntimeError("lxml backend requested but lxml is not installed")
+
+    parser = None
+    decoder = None
+    bytes_read = 0
+    truncated = False
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if parser is None:
+            enc = sniff_encoding(chunk, encoding)
+            if use_lxml:
+                parser = _lxml_etree.HTMLParser(target=_LxmlTarget(collector), encoding=enc, recover=True)
+            else:
+                parser = _StdlibParser(collector)
+                decoder = codecs.getincrementaldecoder(enc)(errors="replace")
+
+        if bytes_read + len(chunk) > max_bytes:
+            chunk = chunk[: max_bytes - bytes_read]
+            truncated = True
+        bytes_read += len(chunk)
+
+        if decoder is not None:
+            parser.feed(decoder.decode(chunk))
+        else:
+            parser.feed(chunk)
+
+        if truncated:
+            break
+
+    if parser is not None:
+        try:
+            parser.close()
+        except Exception:
+            # lxml raises on documents cut off mid-stream; what we have is fine
+            pass
+    collector.close()
+
+    text = "\n".join(collector.paragraphs)
+    if collector.total_len > text_budget:
+        text = text[:text_budget]
+        truncated = True
+    return {
+        "title": collector.title.strip(),
+        "text": text,
+        "length": collector.total_len,
+        "truncated": truncated,
+        "bytes_read": bytes_read,
+    }
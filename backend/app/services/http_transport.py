@@ -0,0 +1,165 @@
+"""
+Process-wide upstream transport.
+
+All outbound calls to Groq and Make go through one pooled `requests.Session`
+so TCP+TLS connections are kept alive and reused between chat turns.
+Async views use a pooled `httpx.AsyncClient` (one per event loop) that
+reports into the same counters.
+"""
+from __future__ import annotations
+from typing import Any
+import asyncio
+import threading
+import weakref
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from django.conf import settings
+
+
+class _Counters:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.handshakes = 0
+        self.errors = 0
+
+    def incr(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def snapshot(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "handshakes": self.handshakes,
+                "pool_hits": max(self.requests - self.handshakes, 0),
+                "errors": self.errors,
+            }
+
+
+_counters = _Counters()
+
+
+class _CountingHTTPConnection(HTTPConnection):
+    def connect(self) -> None:
+        _counters.incr("handshakes")
+        super().connect()
+
+
+class _CountingHTTPSConnection(HTTPSConnection):
+    def connect(self) -> None:
+        _counters.incr("handshakes")
+        super().connect()
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _CountingHTTPConnection
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _CountingHTTPSConnection
+
+
+class _PooledAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+    def send(self, request, **kwargs):
+        _counters.incr("requests")
+        try:
+            return super().send(request, **kwargs)
+        except Exception:
+            _counters.incr("errors")
+            raise
+
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def upstream_session() -> requests.Session:
+    """Return the shared keep-alive session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                pool_size = int(getattr(settings, "UPSTREAM_POOL_SIZE", 10))
+                adapter = _PooledAdapter(
+                    pool_connections=pool_size,
+                    pool_maxsize=pool_size,
+                    pool_block=False,
+                )
+                s = requests.Session()
+                s.mount("https://", adapter)
+                s.mount("http://", adapter)
+                _session = s
+    return _session
+
+
+def timeouts(read: float | None = None) -> tuple[float, float]:
+    """(connect, read) timeout tuple; `read` overrides the configured default."""
+    connect_timeout = float(getattr(settings, "UPSTREAM_CONNECT_TIMEOUT", 5.0))
+    read_timeout = float(read if read is not None else getattr(settings, "UPSTREAM_READ_TIMEOUT", 60.0))
+    return (connect_timeout, read_timeout)
+
+
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+async def _trace(event_name: str, _info: dict[str, Any]) -> None:
+    if event_name == "connection.connect_tcp.complete":
+        _counters.incr("handshakes")
+
+
+async def _on_request(request: httpx.Request) -> None:
+    _counters.incr("requests")
+    request.extensions["trace"] = _trace
+
+
+class _CountingAsyncTransport(httpx.AsyncHTTPTransport):
+    # event hooks never see transport failures, so errors are counted here (as _PooledAdapter.send does)
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        try:
+            return await super().handle_async_request(request)
+        except Exception:
+            _counters.incr("errors")
+            raise
+
+
+def upstream_async_client() -> httpx.AsyncClient:
+    """Return the pooled async client bound to the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        pool_size = int(getattr(settings, "UPSTREAM_POOL_SIZE", 10))
+        max_connections = int(getattr(settings, "UPSTREAM_ASYNC_MAX_CONNECTIONS", 200))
+        client = httpx.AsyncClient(
+            transport=_CountingAsyncTransport(
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=pool_size,
+                ),
+            ),
+            event_hooks={"request": [_on_request]},
+        )
+        _async_clients[loop] = client
+    return client
+
+
+def async_timeouts(read: float | None = None) -> httpx.Timeout:
+    connect_timeout, read_timeout = timeouts(read)
+    return httpx.Timeout(read_timeout, connect=connect_timeout)
+
+
+def transport_stats() -> dict[str, Any]:
+    stats: dict[str, Any] = _counters.snapshot()
+    stats["pool_size"] = int(getattr(settings, "UPSTREAM_POOL_SIZE", 10))
+    return stats
@@ -0,0 +1,345 @@
+"""
+In-process telemetry for upstream Groq chat calls, per (model, endpoint).
+
+groq_client wraps every upstream call in `track(model, endpoint)`. The
+endpoint is "chat" or "chat_stream", and async calls share the sync labels.
+Cache hits never reach groq_client, so they are not counted here. Recorded
+values:
+
+- latency: seconds from the first request to the end of the reply. This
+  includes the retry without reasoning_effort when a model rejects it.
+- ttft (streams only): seconds until the first non-empty delta.
+- chunks/sec (streams only): deltas after the first one, divided by the time
+  from the first delta to the end of the stream.
+- completion tokens/sec: usage.completion_tokens / usage.completion_time as
+  reported by Groq. Groq sends usage in the body, or in `x_groq.usage` on the
+  last stream chunk. Without a completion_time, the client-side generation
+  window is used instead.
+- prompt and completion token totals, and request counts per outcome
+  (ok, error, cancelled).
+
+Histograms have fixed Prometheus-style buckets. Recording a value costs one
+bisect plus a few additions under a single lock, and memory does not grow
+with traffic. `render_prometheus()` produces the text exposition format
+served at /api/metrics/prometheus. `summary()` estimates p50/p95 from the
+buckets for /api/analytics/summary. The numbers are per worker process.
+"""
+from __future__ import annotations
+from bisect import bisect_left
+from typing import Any
+import threading
+import time
+
+from django.conf import settings
+
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0, 120.0)
+TTFT_BUCKETS = (0.05, 0.1, 0.2, 0.35, 0.5, 0.75, 1.0, 2.0, 4.0, 8.0, 15.0)
+RATE_BUCKETS = (5.0, 10.0, 25.0, 50.0, 100.0, 200.0, 400.0, 800.0, 1600.0)
+
+# name -> (buckets, help text); the exported metric is llm_<name>
+HISTOGRAMS: dict[str, tuple[tuple[float, ...], str]] = {
+    "request_duration_seconds": (LATENCY_BUCKETS, "Upstream chat call latency, first request to last byte."),
+    "time_to_first_token_seconds": (TTFT_BUCKETS, "Streaming: time until the first content delta."),
+    "stream_chunks_per_second": (RATE_BUCKETS, "Streaming: content deltas per second after the first one."),
+    "completion_tokens_per_second": (RATE_BUCKETS, "Completion tokens per second of generation time."),
+}
+COUNTERS: dict[str, str] = {
+    "requests_total": "Upstream chat calls by outcome.",
+    "prompt_tokens_total": "Prompt tokens reported by upstream usage.",
+    "completion_tokens_total": "Completion tokens reported by upstream usage.",
+    "stream_chunks_total": "Streaming content deltas received.",
+}
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float | None:
+        """Linear interpolation inside the bucket holding rank q (as histogram_quantile does)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                if i == len(self.bounds):
+                    return self.bounds[-1]
+                lower = self.bounds[i - 1] if i else 0.0
+                return lower + (self.bounds[i] - lower) * (rank - seen) / n
+            seen += n
+        return self.bounds[-1]
+
+
+_lock = threading.Lock()
+# (model, endpoint) -> {"h": {name: Histogram}, "c": {name or requests_total:<outcome>: int}}
+_series: dict[tuple[str, str], dict[str, Any]] = {}
+_version = 0
+_changed_at = 0.0  # wall time of the last record()/reset()
+
+
+def enabled() -> bool:
+    return bool(getattr(settings, "LLM_TELEMETRY", True))
+
+
+def _entry(model: str, endpoint: str) -> dict[str, Any]:
+    key = (model, endpoint)
+    entry = _series.get(key)
+    if entry is None:
+        max_series = int(getattr(settings, "LLM_TELEMETRY_MAX_SERIES", 64))
+        if len(_series) >= max_series:
+            key = ("other", endpoint)  # bound label cardinality for unexpected model ids
+            entry = _series.get(key)
+        if entry is None:
+            entry = {"h": {name: Histogram(b) for name, (b, _) in HISTOGRAMS.items()}, "c": {}}
+            _series[key] = entry
+    return entry
+
+
+def record(
+    model: str,
+    endpoint: str,
+    *,
+    outcome: str,
+    latency: float,
+    ttft: float | None = None,
+    chunks: int = 0,
+    chunk_rate: float | None = None,
+    prompt_tokens: int = 0,
+    completion_tokens: int = 0,
+    token_rate: float | None = None,
+) -> None:
+    global _version, _changed_at
+    with _lock:
+        entry = _entry(model or "unknown", endpoint)
+        h, c = entry["h"], entry["c"]
+        h["request_duration_seconds"].observe(latency)
+        if ttft is not None:
+            h["time_to_first_token_seconds"].observe(ttft)
+        if chunk_rate is not None:
+            h["stream_chunks_per_second"].observe(chunk_rate)
+        if token_rate is not None:
+            h["completion_tokens_per_second"].observe(token_rate)
+        key = f"requests_total:{outcome}"
+        c[key] = c.get(key, 0) + 1
+        c["prompt_tokens_total"] = c.get("prompt_tokens_total", 0) + prompt_tokens
+        c["completion_tokens_total"] = c.get("completion_tokens_total", 0) + completion_tokens
+        c["stream_chunks_total"] = c.get("stream_chunks_total", 0) + chunks
+        _version += 1
+        _changed_at = time.time()
+
+
+def version() -> int:
+    """Bumped on every record()."""
+    return _version
+
+
+def changed_slot(seconds: float) -> str:
+    """
+    Coarse change marker for the analytics_summary ETag validator.
+
+    Time is cut into `seconds`-long slots. While telemetry keeps changing,
+    the marker moves once per slot, so steady chat traffic still allows
+    304s and the llm numbers are at most one slot stale. Once it stops
+    changing, the marker settles on the slot of the last change.
+    """
+    width = max(1.0, seconds)
+    now_slot = int(time.time() // width)
+    last_slot = int(_changed_at // width)
+    return f"live-{now_slot}" if last_slot >= now_slot else str(last_slot)
+
+
+def reset() -> None:
+    global _version, _changed_at
+    with _lock:
+        _series.clear()
+        _version += 1
+        _changed_at = time.time()
+
+
+class Meter:
+    """Times one upstream call; use via `with track(model, endpoint) as meter:`."""
+
+    __slots__ = ("model", "endpoint", "started", "first", "last", "chunks", "usage")
+
+    def __init__(self, model: str, endpoint: str) -> None:
+        self.model = model
+        self.endpoint = endpoint
+        self.started = time.perf_counter()
+        self.first: float | None = None
+        self.last: float | None = None
+        self.chunks = 0
+        self.usage: dict[str, Any] | None = None
+
+    def chunk(self) -> None:
+        now = time.perf_counter()
+        if self.first is None:
+            self.first = now
+        self.last = now
+        self.chunks += 1
+
+    def observe_usage(self, usage: Any) -> None:
+        if isinstance(usage, dict):
+            self.usage = usage
+
+    def __enter__(self) -> "Meter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            outcome = "ok"
+        elif issubclass(exc_type, GeneratorExit) or exc_type.__name__ == "CancelledError":
+            outcome = "cancelled"  # client went away mid-stream
+        else:
+            outcome = "error"
+        self._finish(outcome)
+
+    def _finish(self, outcome: str) -> None:
+        end = time.perf_counter()
+        usage = self.usage or {}
+        completion_tokens = int(usage.get("completion_tokens") or 0)
+        ttft = chunk_rate = token_rate = None
+        if self.first is not None:
+            ttft = self.first - self.started
+            window = (self.last or self.first) - self.first
+            if self.chunks > 1 and window > 0:
+                chunk_rate = (self.chunks - 1) / window
+        if completion_tokens:
+            gen_time = usage.get("completion_time")
+            if not gen_time and self.first is not None:
+                gen_time = end - self.first
+            if gen_time:
+                token_rate = completion_tokens / float(gen_time)
+        record(
+            self.model,
+            self.endpoint,
+            outcome=outcome,
+            latency=end - self.started,
+            ttft=ttft,
+            chunks=self.chunks,
+            chunk_rate=chunk_rate if outcome == "ok" else None,
+            prompt_tokens=int(usage.get("prompt_tokens") or 0),
+            completion_tokens=completion_tokens,
+            token_rate=token_rate if outcome == "ok" else None,
+        )
+
+
+class _NullMeter:
+    def chunk(self) -> None:
+        pass
+
+    def observe_usage(self, usage: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NullMeter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+_null = _NullMeter()
+
+
+def track(model: str, endpoint: str) -> Meter | _NullMeter:
+    return Meter(model, endpoint) if enabled() else _null
+
+
+# -- read side ----------------------------------------------------------------------
+def _snapshot() -> list[tuple[tuple[str, str], dict[str, Any]]]:
+    with _lock:
+        return [
+            (key, {
+                "h": {n: (list(x.counts), x.sum, x.count, x.bounds) for n, x in e["h"].items()},
+                "c": dict(e["c"]),
+            })
+            for key, e in sorted(_series.items())
+        ]
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _num(value: float) -> str:
+    return repr(float(value)) if value != int(value) else f"{int(value)}"
+
+
+def render_prometheus() -> str:
+    """Text exposition format 0.0.4."""
+    snap = _snapshot()
+    lines: list[str] = []
+    for name, (_, help_text) in HISTOGRAMS.items():
+        metric = f"llm_{name}"
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+        for (model, endpoint), e in snap:
+            counts, total, count, bounds = e["h"][name]
+            labels = f'model="{_label(model)}",endpoint="{_label(endpoint)}"'
+            cumulative = 0
+            for bound, n in zip(bounds + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else _num(bound)
+                lines.append(f'{metric}_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"{metric}_sum{{{labels}}} {_num(round(total, 6))}")
+            lines.append(f"{metric}_count{{{labels}}} {count}")
+    for name, help_text in COUNTERS.items():
+        metric = f"llm_{name}"
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+        for (model, endpoint), e in snap:
+            labels = f'model="{_label(model)}",endpoint="{_label(endpoint)}"'
+            if name == "requests_total":
+                for key, value in sorted(e["c"].items()):
+                    if key.startswith("requests_total:"):
+                        outcome = key.split(":", 1)[1]
+                        lines.append(f'{metric}{{{labels},outcome="{_label(outcome)}"}} {value}')
+            else:
+                lines.append(f"{metric}{{{labels}}} {e['c'].get(name, 0)}")
+    return "\n".join(lines) + "\n"
+
+
+def _rounded(value: float | None, digits: int = 3) -> float | None:
+    return round(value, digits) if value is not None else None
+
+
+def summary() -> list[dict[str, Any]]:
+    """One row per (model, endpoint): counts, token totals, estimated p50/p95 and mean rates."""
+    out = []
+    with _lock:
+        for (model, endpoint), e in sorted(_series.items()):
+            h, c = e["h"], e["c"]
+            requests = sum(v for k, v in c.items() if k.startswith("requests_total:"))
+            latency, ttft = h["request_duration_seconds"], h["time_to_first_token_seconds"]
+            chunks, tokens = h["stream_chunks_per_second"], h["completion_tokens_per_second"]
+            out.append({
+                "model": model,
+                "endpoint": endpoint,
+                "requests": requests,
+                "errors": c.get("requests_total:error", 0),
+                "cancelled": c.get("requests_total:cancelled", 0),
+                "latency_p50_s": _rounded(latency.quantile(0.5)),
+                "latency_p95_s": _rounded(latency.quantile(0.95)),
+                "ttft_p50_s": _rounded(ttft.quantile(0.5)),
+                "ttft_p95_s": _rounded(ttft.quantile(0.95)),
+                "chunks_per_s": _rounded(chunks.sum / chunks.count if chunks.count else None, 1),
+                "completion_tokens_per_s": _rounded(tokens.sum / tokens.count if tokens.count else None, 1),
+                "prompt_tokens": c.get("prompt_tokens_total", 0),
+                "completion_tokens": c.get("completion_tokens_total", 0),
+            })
+    return out
+
+
+def telemetry_stats() -> dict[str, Any]:
+    with _lock:
+        series = len(_series)
+    return {"enabled": enabled(), "series": series, "version": _version}
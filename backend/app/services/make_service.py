@@ -1,18 +1,264 @@
+"""
+Make webhook dispatcher.
+
+Every POST goes over the pooled upstream session. Only failures where
+Make cannot have run the scenario are retried: connection errors, 429 and
+503. A read timeout or another 5xx may come after the webhook accepted
+the POST, so those are never sent again. Retries happen up to
+MAKE_WEBHOOK_RETRIES times with full-jitter exponential backoff, unless
+the caller owns retries itself and passes retries=0 (app.run_queue does).
+
+Each webhook URL has its own circuit breaker. After
+MAKE_BREAKER_FAILURES consecutive failures (errors, 5xx, 429) the circuit opens
+and calls fail immediately for MAKE_BREAKER_COOLDOWN seconds. Then a
+single probe is let through: success closes the circuit, failure
+re-opens it.
+
+With MAKE_WEBHOOK_BATCH_WINDOW > 0, payloads for the same URL that
+arrive within the window are sent as one {"runs": [...]} call, and every
+caller gets that call's result. The Make scenario must then iterate over
+"runs".
+
+Every result carries "retryable", set only for the failures above that
+are safe to send again. app.run_queue fails every other job at once.
+"""
 from __future__ import annotations
+from collections import deque
+from concurrent.futures import Future
 from typing import Any
+import hashlib
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
 import requests
+from urllib3.exceptions import NewConnectionError
 
+from .http_transport import upstream_session, timeouts
 
-def trigger_make_webhook(*, webhook_url: str, payload: dict[str, Any], timeout: int = 10) -> dict[str, Any]:
-    if not webhook_url:
-        return {"ok": False, "status_code": None, "error": "MAKE_WEBHOOK_URL is not configured"}
+_RETRY_STATUSES = frozenset({429, 503})
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, cooldown: float) -> None:
+        self._lock = threading.Lock()
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.opens = 0
+        self._probing = False
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open":
+                if time.monotonic() - self.opened_at < self.cooldown:
+                    return False
+                self.state = "half_open"
+                self._probing = False
+            # half-open: exactly one probe at a time
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record(self, ok: bool) -> None:
+        with self._lock:
+            self._probing = False
+            if ok:
+                self.state = "closed"
+                self.failures = 0
+                return
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.opens += 1
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            retry_in = self.cooldown - (time.monotonic() - self.opened_at) if self.state == "open" else 0.0
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "opens": self.opens,
+                "retry_in": round(max(0.0, retry_in), 3),
+            }
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats = {"calls": 0, "ok": 0, "failed": 0, "retries": 0, "short_circuited": 0, "batches": 0, "batched_payloads": 0}
+_latencies: deque[float] = deque(maxlen=512)
+
+
+def _bump(name: str, n: int = 1) -> None:
+    with _stats_lock:
+        _stats[name] += n
+
+
+def _label(url: str) -> str:
+    # Make webhook URLs embed their secret; expose only host + a short hash
+    return f"{urlsplit(url).hostname or '?'}#{hashlib.sha1(url.encode('utf-8')).hexdigest()[:8]}"
+
+
+def _breaker_for(url: str) -> CircuitBreaker:
+    with _breakers_lock:
+        breaker = _breakers.get(url)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                int(getattr(settings, "MAKE_BREAKER_FAILURES", 5)),
+                float(getattr(settings, "MAKE_BREAKER_COOLDOWN", 30)),
+            )
+            _breakers[url] = breaker
+        return breaker
+
+
+def _not_sent(exc: Exception) -> bool:
+    """True when the POST never reached the server (so sending it again is safe)."""
+    if isinstance(exc, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(exc, requests.exceptions.ConnectionError):
+        reason = getattr(exc.args[0] if exc.args else None, "reason", None)
+        return isinstance(reason, NewConnectionError)
+    return False
 
-    try:
-        resp = requests.post(webhook_url, json=payload, timeout=timeout)
+
+def _post(url: str, payload: Any, timeout: float, retries: int | None = None) -> dict[str, Any]:
+    """POST with retries and the breaker; never raises."""
+    breaker = _breaker_for(url)
+    if not breaker.allow():
+        _bump("short_circuited")
         return {
-            "ok": resp.ok,
-            "status_code": resp.status_code,
-            "body": resp.text[:5000],
+            "ok": False,
+            "status_code": None,
+            "error": "Make webhook circuit is open; not called",
+            "circuit": "open",
+            "retryable": False,
         }
-    except Exception as exc:
-        return {"ok": False, "status_code": None, "error": str(exc)}
+
+    if retries is None:
+        retries = int(getattr(settings, "MAKE_WEBHOOK_RETRIES", 2))
+    retries = max(0, retries)
+    base = float(getattr(settings, "MAKE_WEBHOOK_BACKOFF", 0.5))
+    started = time.monotonic()
+    result: dict[str, Any] = {}
+    healthy = retryable = False
+    for attempt in range(retries + 1):
+        try:
+            resp = upstream_session().post(url, json=payload, timeout=timeouts(timeout))
+            result = {"ok": resp.ok, "status_code": resp.status_code, "body": resp.text[:5000]}
+            healthy = resp.status_code < 500 and resp.status_code != 429
+            retryable = resp.status_code in _RETRY_STATUSES
+        except Exception as exc:
+            result = {"ok": False, "status_code": None, "error": str(exc)}
+            healthy = False
+            retryable = _not_sent(exc)
+        if not retryable or attempt == retries:
+            break
+        _bump("retries")
+        time.sleep(random.uniform(0, min(base * 2 ** attempt, 10.0)))
+
+    breaker.record(healthy)
+    elapsed = time.monotonic() - started
+    with _stats_lock:
+        _stats["calls"] += 1
+        _stats["ok" if result.get("ok") else "failed"] += 1
+        _latencies.append(elapsed)
+    result["retryable"] = retryable
+    result["attempts"] = attempt + 1
+    result["elapsed_ms"] = int(elapsed * 1000)
+    return result
+
+
+class _Batch:
+    def __init__(self) -> None:
+        self.items: list[tuple[Any, Future]] = []
+        self.timer: threading.Timer | None = None
+
+
+class _Batcher:
+    """Collects payloads per URL for MAKE_WEBHOOK_BATCH_WINDOW seconds, then sends them together."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # keyed by (url, retries) so a batch is only retried if all its callers allow it
+        self._pending: dict[tuple[str, int | None], _Batch] = {}
+
+    def submit(self, url: str, payload: Any, timeout: float, window: float, retries: int | None = None) -> Future:
+        fut: Future = Future()
+        key = (url, retries)
+        max_size = max(1, int(getattr(settings, "MAKE_WEBHOOK_BATCH_MAX", 25)))
+        with self._lock:
+            batch = self._pending.get(key)
+            if batch is None:
+                batch = self._pending[key] = _Batch()
+                # the timer flushes only this batch, and is cancelled if it fills up first
+                batch.timer = threading.Timer(window, self._flush, args=(key, batch, timeout))
+                batch.timer.daemon = True
+                batch.timer.start()
+            batch.items.append((payload, fut))
+            full = len(batch.items) >= max_size
+        if full:
+            self._flush(key, batch, timeout)
+        return fut
+
+    def _flush(self, key: tuple[str, int | None], batch: _Batch, timeout: float) -> None:
+        with self._lock:
+            if self._pending.get(key) is not batch:
+                return  # already flushed because the batch filled up
+            del self._pending[key]
+        if batch.timer is not None:
+            batch.timer.cancel()
+        items = batch.items
+        _bump("batches")
+        _bump("batched_payloads", len(items))
+        url, retries = key
+        result = _post(url, {"runs": [p for p, _ in items]}, timeout, retries)
+        for _, fut in items:
+            fut.set_result({**result, "batched": len(items)})
+
+
+_batcher = _Batcher()
+
+
+def trigger_make_webhook(
+    *,
+    webhook_url: str,
+    payload: dict[str, Any],
+    timeout: int = 10,
+    retries: int | None = None,
+) -> dict[str, Any]:
+    """POST `payload`; `retries` overrides MAKE_WEBHOOK_RETRIES (0 when the caller retries itself)."""
+    if not webhook_url:
+        return {"ok": False, "status_code": None, "error": "MAKE_WEBHOOK_URL is not configured", "retryable": False}
+
+    window = float(getattr(settings, "MAKE_WEBHOOK_BATCH_WINDOW", 0))
+    if window > 0:
+        return _batcher.submit(webhook_url, payload, timeout, window, retries).result()
+    return _post(webhook_url, payload, timeout, retries)
+
+
+def dispatcher_stats() -> dict[str, Any]:
+    with _stats_lock:
+        out: dict[str, Any] = dict(_stats)
+        lat = sorted(_latencies)
+    with _breakers_lock:
+        breakers = dict(_breakers)
+
+    def pct(p: float) -> float | None:
+        return round(lat[min(len(lat) - 1, int(p * len(lat)))] * 1000, 1) if lat else None
+
+    out.update({
+        "latency_ms": {"p50": pct(0.5), "p95": pct(0.95), "max": pct(1.0), "samples": len(lat)},
+        "batch_window": float(getattr(settings, "MAKE_WEBHOOK_BATCH_WINDOW", 0)),
+        "breakers": {_label(url): b.snapshot() for url, b in breakers.items()},
+    })
+    return out
@@ -0,0 +1,122 @@
+"""
+Per-model memory of which optional chat parameters Groq accepts.
+
+Seeded from MODEL_CATALOG, corrected by observed rejections, persisted in the
+"shared" cache so restarts and sibling workers start warm. Every entry is
+re-probed once after MODEL_CAPABILITY_TTL seconds.
+"""
+from __future__ import annotations
+from typing import Any
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+CACHE_KEY = "groq:model-capabilities:v1"
+
+# Catalog models known to accept each optional parameter; every other
+# catalog model is seeded as not supporting it.
+SEED_SUPPORT: dict[str, set[str]] = {
+    "reasoning_effort": {"openai/gpt-oss-20b"},
+}
+
+_lock = threading.Lock()
+_entries: dict[str, dict[str, dict[str, Any]]] = {}
+_loaded = False
+
+
+def _ttl() -> float:
+    return float(getattr(settings, "MODEL_CAPABILITY_TTL", 86400))
+
+
+def _store():
+    return caches["shared"]
+
+
+def _seed() -> dict[str, dict[str, dict[str, Any]]]:
+    from .groq_client import all_models
+
+    now = time.time()
+    out: dict[str, dict[str, dict[str, Any]]] = {}
+    for model in all_models():
+        out[model] = {
+            param: {"supported": model in models, "checked_at": now, "source": "catalog"}
+            for param, models in SEED_SUPPORT.items()
+        }
+    return out
+
+
+def _ensure_loaded() -> None:
+    global _loaded
+    if _loaded:
+        return
+    with _lock:
+        if _loaded:
+            return
+        _entries.update(_seed())
+        try:
+            persisted = _store().get(CACHE_KEY) or {}
+        except Exception:
+            persisted = {}
+        for model, params in persisted.items():
+            _entries.setdefault(model, {}).update(params)
+        _loaded = True
+
+
+def _refresh_from_store(model: str, param: str) -> dict[str, Any] | None:
+    try:
+        persisted = _store().get(CACHE_KEY) or {}
+    except Exception:
+        return None
+    entry = persisted.get(model, {}).get(param)
+    if entry and time.time() - entry["checked_at"] < _ttl():
+        with _lock:
+            _entries.setdefault(model, {})[param] = entry
+        return entry
+    return None
+
+
+def should_send(model: str, param: str) -> bool:
+    """True if `param` should be included for `model` (known-good, or due for a probe)."""
+    _ensure_loaded()
+    entry = _entries.get(model, {}).get(param)
+    if entry and time.time() - entry["checked_at"] < _ttl():
+        return bool(entry["supported"])
+    entry = _refresh_from_store(model, param)
+    if entry:
+        return bool(entry["supported"])
+    return True
+
+
+def record(model: str, param: str, supported: bool) -> None:
+    """Remember the observed outcome; no-op if it confirms a fresh entry."""
+    _ensure_loaded()
+    now = time.time()
+    with _lock:
+        current = _entries.get(model, {}).get(param)
+        if current and current["supported"] == supported and now - current["checked_at"] < _ttl():
+            return
+        _entries.setdefault(model, {})[param] = {
+            "supported": supported,
+            "checked_at": now,
+            "source": "observed",
+        }
+        learned = {
+            m: {p: e for p, e in params.items() if e.get("source") == "observed"}
+            for m, params in _entries.items()
+        }
+    try:
+        _store().set(CACHE_KEY, {m: p for m, p in learned.items() if p}, timeout=None)
+    except Exception:
+        pass
+
+
+def capability_snapshot() -> dict[str, dict[str, bool]]:
+    _ensure_loaded()
+    with _lock:
+        return {
+            model: {param: bool(e["supported"]) for param, e in params.items()}
+            for model, params in _entries.items()
+        }
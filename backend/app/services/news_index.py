@@ -0,0 +1,135 @@
+"""
+In-memory inverted index over recently fetched feed entries.
+
+Entries from cached feeds are added (or re-touched) whenever the feed
+cache loads a feed into this process. Queries are ranked with BM25,
+scoring title terms twice. Memory is bounded by NEWS_INDEX_MAX_DOCS, and
+entries not seen in any feed for NEWS_INDEX_MAX_AGE seconds are evicted.
+"""
+from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+import math
+import re
+import threading
+import time
+
+from django.conf import settings
+
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_TAG_RE = re.compile(r"<[^>]+>")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has in is it its of on or that the to was were will with".split()
+)
+
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in _TOKEN_RE.findall(_TAG_RE.sub(" ", text or "").lower()) if t not in _STOPWORDS]
+
+
+@dataclass
+class _Doc:
+    item: dict[str, Any]
+    feed: str
+    tf: dict[str, int]
+    length: int
+    seen_at: float
+
+
+class NewsIndex:
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._docs: OrderedDict[str, _Doc] = OrderedDict()
+        self._postings: dict[str, set[str]] = {}
+        self._total_len = 0
+        self.evictions = 0
+        self.searches = 0
+
+    def add(self, feed: str, items: list[dict[str, Any]]) -> None:
+        now = time.time()
+        with self._lock:
+            for item in items:
+                key = item.get("link") or item.get("title") or ""
+                if not key:
+                    continue
+                doc = self._docs.get(key)
+                if doc is not None and doc.item == item:
+                    doc.seen_at = now
+                    self._docs.move_to_end(key)
+                    continue
+                if doc is not None:
+                    self._remove(key)
+
+                tokens = tokenize(item.get("title", "")) * 2 + tokenize(item.get("summary", ""))
+                tf: dict[str, int] = {}
+                for t in tokens:
+                    tf[t] = tf.get(t, 0) + 1
+                self._docs[key] = _Doc(item=item, feed=feed, tf=tf, length=len(tokens), seen_at=now)
+                self._total_len += len(tokens)
+                for t in tf:
+                    self._postings.setdefault(t, set()).add(key)
+            self._evict(now)
+
+    def search(self, query: str, *, feed: str | None = None, limit: int = 10) -> list[dict[str, Any]]:
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        with self._lock:
+            self.searches += 1
+            self._evict(time.time())
+            n = len(self._docs)
+            if not n:
+                return []
+            avgdl = self._total_len / n
+            scores: dict[str, float] = {}
+            for term in terms:
+                keys = self._postings.get(term)
+                if not keys:
+                    continue
+                idf = math.log(1 + (n - len(keys) + 0.5) / (len(keys) + 0.5))
+                for key in keys:
+                    doc = self._docs[key]
+                    if feed is not None and doc.feed != feed:
+                        continue
+                    f = doc.tf[term]
+                    scores[key] = scores.get(key, 0.0) + idf * f * (K1 + 1) / (f + K1 * (1 - B + B * doc.length / avgdl))
+            ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:limit]
+            return [self._docs[key].item for key, _ in ranked]
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "docs": len(self._docs),
+                "terms": len(self._postings),
+                "evictions": self.evictions,
+                "searches": self.searches,
+            }
+
+    def _remove(self, key: str) -> None:
+        doc = self._docs.pop(key)
+        self._total_len -= doc.length
+        for t in doc.tf:
+            keys = self._postings.get(t)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[t]
+
+    def _evict(self, now: float) -> None:
+        max_docs = int(getattr(settings, "NEWS_INDEX_MAX_DOCS", 5000))
+        max_age = float(getattr(settings, "NEWS_INDEX_MAX_AGE", 172800))
+        # _docs is ordered by seen_at, oldest first
+        while self._docs:
+            key, doc = next(iter(self._docs.items()))
+            if len(self._docs) <= max_docs and now - doc.seen_at <= max_age:
+                break
+            self._remove(key)
+            self.evictions += 1
+
+
+index = NewsIndex()
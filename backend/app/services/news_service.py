@@ -1,55 +1,255 @@
 from __future__ import annotations
-from typing import Any
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Iterator
+from urllib.parse import urlsplit
+import time
+
 import feedparser
 import requests
-from bs4 import BeautifulSoup
+from django.conf import settings
+from django.db import close_old_connections
+
+from . import crawl_cache
+from .feed_cache import get_feed_entries, on_entries_loaded
+from .html_extract import declared_charset, extract_from_chunks
+from .http_transport import timeouts, upstream_session
+from .news_index import index as news_index
 
 
+# Listed in priority order: results are merged in this order.
 RSS_SOURCES = [
     "https://news.google.com/rss/search?q={q}",
     "https://feeds.bbci.co.uk/news/rss.xml",
     "https://rss.nytimes.com/services/xml/rss/nyt/HomePage.xml",
 ]
 
+on_entries_loaded(news_index.add)
 
-def fetch_news(query: str, limit: int = 8) -> list[dict[str, Any]]:
-    items: list[dict[str, Any]] = []
+_executor = ThreadPoolExecutor(
+    max_workers=int(getattr(settings, "NEWS_FETCH_WORKERS", 8)),
+    thread_name_prefix="news-fetch",
+)
+
+# Process-wide cap on concurrent page fetches for crawl_many().
+_crawl_executor = ThreadPoolExecutor(
+    max_workers=int(getattr(settings, "CRAWL_BATCH_WORKERS", 8)),
+    thread_name_prefix="crawl-fetch",
+)
+
+
+def _entry_dict(e: Any, src: str) -> dict[str, Any]:
+    return {
+        "title": getattr(e, "title", ""),
+        "link": getattr(e, "link", ""),
+        "published": getattr(e, "published", ""),
+        "summary": getattr(e, "summary", ""),
+        "source": getattr(getattr(e, "source", None), "title", "") or src,
+    }
+
+
+def _fetch_source(src: str, url: str, query: str, limit: int, timeout: float) -> list[dict[str, Any]]:
+    if "{q}" not in src:
+        # same document for every query: refresh it through the feed cache (which
+        # keeps news_index current), then rank its entries against the query
+        get_feed_entries(url, timeout=timeout, to_item=lambda e: _entry_dict(e, src))
+        return news_index.search(query, feed=url, limit=limit)
+    resp = upstream_session().get(url, timeout=timeouts(timeout), headers={"User-Agent": "Mozilla/5.0"})
+    resp.raise_for_status()
+    feed = feedparser.parse(resp.content)
+    return [_entry_dict(e, src) for e in feed.entries]
+
+
+def fetch_news_detailed(query: str, limit: int = 8) -> dict[str, Any]:
+    """
+    Fetch all RSS_SOURCES concurrently and merge them in priority order.
+
+    Each source has its own NEWS_SOURCE_TIMEOUT and the whole call is capped
+    by NEWS_FETCH_DEADLINE. Slow or failing sources are reported in `sources`
+    instead of failing the request. The call returns early once `limit`
+    items are available from the highest-priority finished sources.
+    """
     query = (query or "").strip()
     if not query:
-        return items
+        return {"items": [], "sources": []}
 
+    per_source = float(getattr(settings, "NEWS_SOURCE_TIMEOUT", 4.0))
+    started = time.monotonic()
+    deadline = started + float(getattr(settings, "NEWS_FETCH_DEADLINE", 6.0))
+
+    futures: list[Future] = []
+    statuses: list[dict[str, Any]] = []
+    results: dict[int, list[dict[str, Any]]] = {}
     for src in RSS_SOURCES:
         url = src.format(q=requests.utils.quote(query))
-        feed = feedparser.parse(url)
-        for e in feed.entries:
-            items.append({
-                "title": getattr(e, "title", ""),
-                "link": getattr(e, "link", ""),
-                "published": getattr(e, "published", ""),
-                "summary": getattr(e, "summary", ""),
-                "source": getattr(getattr(e, "source", None), "title", "") or src,
-            })
-            if len(items) >= limit:
-                return items
-    return items[:limit]
-
-
-def crawl_extract(url: str, timeout: int = 12) -> dict[str, Any]:
-    resp = requests.get(url, timeout=timeout, headers={"User-Agent": "Mozilla/5.0"})
-    resp.raise_for_status()
+        futures.append(_executor.submit(_fetch_source, src, url, query, limit, per_source))
+        statuses.append({"source": src, "status": "pending", "count": 0, "elapsed_ms": None})
 
-    soup = BeautifulSoup(resp.text, "html.parser")
+    def settle(idx: int, status: str, error: str | None = None) -> None:
+        statuses[idx]["status"] = status
+        statuses[idx]["elapsed_ms"] = int((time.monotonic() - started) * 1000)
+        if error:
+            statuses[idx]["error"] = error
+        results.setdefault(idx, [])
 
-    for tag in soup(["script", "style", "noscript", "header", "footer", "svg"]):
-        tag.decompose()
+    def ready_prefix() -> list[dict[str, Any]] | None:
+        merged: list[dict[str, Any]] = []
+        for idx in range(len(futures)):
+            if idx not in results:
+                return None
+            merged.extend(results[idx])
+            if len(merged) >= limit:
+                return merged
+        return merged
 
-    title = (soup.title.string.strip() if soup.title and soup.title.string else "")
-    paragraphs = [p.get_text(" ", strip=True) for p in soup.find_all("p")]
-    text = "\n".join([p for p in paragraphs if p])
+    while True:
+        merged = ready_prefix()
+        if merged is not None:
+            break
 
-    return {
-        "url": url,
-        "title": title,
-        "text": text[:50000],
-        "length": len(text),
-    }
+        now = time.monotonic()
+        pending = [i for i in range(len(futures)) if i not in results]
+        cutoff = min(deadline, started + per_source)
+        if now >= cutoff:
+            for i in pending:
+                futures[i].cancel()
+                settle(i, "timeout")
+            continue
+
+        wait([futures[i] for i in pending], timeout=cutoff - now, return_when=FIRST_COMPLETED)
+        for i in pending:
+            if not futures[i].done():
+                continue
+            try:
+                entries = futures[i].result()
+            except Exception as exc:
+                settle(i, "error", str(exc))
+                continue
+            settle(i, "ok")
+            results[i] = entries
+            statuses[i]["count"] = len(entries)
+
+    for i, st in enumerate(statuses):
+        if st["status"] == "pending":
+            # not needed: higher-priority sources already filled `limit`
+            futures[i].cancel()
+            st["status"] = "skipped"
+
+    return {"items": merged[:limit], "sources": statuses}
+
+
+def fetch_news(query: str, limit: int = 8) -> list[dict[str, Any]]:
+    return fetch_news_detailed(query, limit=limit)["items"]
+
+
+def _extract(chunks, encoding: str | None) -> dict[str, Any]:
+    return extract_from_chunks(
+        chunks,
+        encoding=encoding,
+        text_budget=int(getattr(settings, "CRAWL_TEXT_BUDGET", 50000)),
+        max_bytes=int(getattr(settings, "CRAWL_MAX_BYTES", 2_000_000)),
+        backend=getattr(settings, "CRAWL_HTML_PARSER", "auto"),
+    )
+
+
+def crawl_extract(url: str, timeout: int = 12, *, bypass_cache: bool = False) -> dict[str, Any]:
+    if crawl_cache.cache_enabled():
+        return crawl_cache.get_extraction(url, timeout=timeout, extract=_extract, bypass=bypass_cache)
+
+    resp = upstream_session().get(
+        url,
+        timeout=timeouts(timeout),
+        headers={"User-Agent": "Mozilla/5.0"},
+        stream=True,
+    )
+    with resp:
+        resp.raise_for_status()
+        data = _extract(resp.iter_content(chunk_size=16384), declared_charset(resp.headers))
+
+    return {"url": url, **data}
+
+
+def _crawl_one(url: str, timeout: float, bypass_cache: bool) -> dict[str, Any]:
+    try:
+        return crawl_extract(url, timeout=timeout, bypass_cache=bypass_cache)
+    finally:
+        # pool threads outlive requests; don't let them pin DB connections
+        close_old_connections()
+
+
+def crawl_many(urls: list[str], *, bypass_cache: bool = False) -> Iterator[dict[str, Any]]:
+    """
+    Crawl `urls` concurrently, yielding one result per URL as soon as it finishes.
+
+    At most CRAWL_BATCH_WORKERS fetches run at once (shared by all batches in
+    the process), and at most CRAWL_PER_HOST_LIMIT per host within a batch.
+    URLs queued behind a busy host let other hosts overtake them. Each URL
+    gets CRAWL_BATCH_URL_TIMEOUT seconds and the whole batch
+    CRAWL_BATCH_DEADLINE. Results are {"index", "url", "ok", "item" | "error",
+    "elapsed_ms"}, where index is the URL's position in `urls`.
+    """
+    per_url = float(getattr(settings, "CRAWL_BATCH_URL_TIMEOUT", 15))
+    per_host = max(1, int(getattr(settings, "CRAWL_PER_HOST_LIMIT", 2)))
+    concurrency = max(1, int(getattr(settings, "CRAWL_BATCH_WORKERS", 8)))
+    started = time.monotonic()
+    deadline = started + float(getattr(settings, "CRAWL_BATCH_DEADLINE", 60))
+
+    def result(idx: int, url: str, **fields: Any) -> dict[str, Any]:
+        return {"index": idx, "url": url, **fields, "elapsed_ms": int((time.monotonic() - started) * 1000)}
+
+    waiting: deque[tuple[int, str, str]] = deque()
+    for idx, url in enumerate(urls):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            yield result(idx, url, ok=False, error="invalid url")
+            continue
+        waiting.append((idx, url, parts.hostname.lower()))
+
+    # future -> (index, url, host, due); timed-out futures stay here (reported)
+    # until their thread finishes so they keep holding their host slot
+    running: dict[Future, tuple[int, str, str, float]] = {}
+    reported: set[Future] = set()
+    host_load: dict[str, int] = {}
+
+    while waiting or len(running) > len(reported):
+        blocked: deque[tuple[int, str, str]] = deque()
+        while waiting and len(running) - len(reported) < concurrency:
+            idx, url, host = waiting.popleft()
+            if host_load.get(host, 0) >= per_host:
+                blocked.append((idx, url, host))
+                continue
+            host_load[host] = host_load.get(host, 0) + 1
+            fut = _crawl_executor.submit(_crawl_one, url, per_url, bypass_cache)
+            running[fut] = (idx, url, host, time.monotonic() + per_url)
+        blocked.extend(waiting)
+        waiting = blocked
+
+        now = time.monotonic()
+        if now >= deadline:
+            for fut, (idx, url, _host, _due) in running.items():
+                if fut not in reported:
+                    fut.cancel()
+                    yield result(idx, url, ok=False, error="timeout")
+            for idx, url, _host in waiting:
+                yield result(idx, url, ok=False, error="batch deadline exceeded")
+            return
+
+        active = [f for f in running if f not in reported]
+        next_due = min([deadline] + [running[f][3] for f in active])
+        wait(list(running), timeout=max(0.0, next_due - now), return_when=FIRST_COMPLETED)
+
+        now = time.monotonic()
+        for fut in list(running):
+            idx, url, host, due = running[fut]
+            if fut.done():
+                if fut not in reported:
+                    try:
+                        yield result(idx, url, ok=True, item=fut.result())
+                    except Exception as exc:
+                        yield result(idx, url, ok=False, error=str(exc))
+                reported.discard(fut)
+                del running[fut]
+                host_load[host] -= 1
+            elif fut not in reported and now >= due:
+                yield result(idx, url, ok=False, error="timeout")
+                reported.add(fut)
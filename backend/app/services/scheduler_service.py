@@ -1,14 +1,391 @@
+"""
+In-process cron engine for Agent.schedule_cron.
+
+Each active agent with a cron expression is compiled once into an
+APScheduler CronTrigger. Its next fire time lives in a min-heap, so the
+loop only ever inspects the heap top. Due runs go to a bounded pool of
+SCHEDULER_WORKERS threads that call app.runs.execute_agent_run, the same
+code path as /api/agents/<id>/run-now.
+
+Misfire / coalescing policy:
+  - every missed fire time of one agent collapses into at most one run
+    (the next fire time is always computed from "now"),
+  - a run more than SCHEDULER_MISFIRE_GRACE seconds late is skipped,
+  - a run is skipped while the same agent's previous run is still going.
+
+Agent changes are picked up incrementally. agents_changed() wakes the
+loop in this process and bumps a marker in the shared cache for a
+scheduler in another process. That triggers a query for rows with a
+newer updated_at. A full resync every SCHEDULER_FULL_RESYNC seconds
+catches deletes and edits made outside the API. Only one process
+dispatches at a time: the holder of the "scheduler" lease (app.leases).
+
+Cron expressions use crontab's day-of-week numbering (0 and 7 are Sunday,
+1 is Monday). APScheduler counts from Monday, so compile_cron rewrites that
+field as day names before building the trigger.
+"""
 from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone as dt_timezone
 from typing import Any
+import heapq
+import logging
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+_CHANGED_KEY = "scheduler:agents-changed"
+_LEASE_NAME = "scheduler"
+_DOW_NAMES = ("sun", "mon", "tue", "wed", "thu", "fri", "sat")
+
+
+@dataclass
+class _Job:
+    agent_id: int
+    cron: str
+    trigger: Any
+    updated_at: datetime
+    gen: int
+    next_fire: float | None = None
+
+
+def _crontab_dow(field: str) -> str:
+    """Rewrite a crontab day-of-week field (0/7 = Sunday) as APScheduler day names."""
+    days: set[int] = set()
+    for item in field.lower().split(","):
+        rng, _, step_s = item.partition("/")
+        step = int(step_s) if step_s.isdigit() and int(step_s) > 0 else None
+        if step_s and step is None:
+            raise ValueError(f"invalid day-of-week step {item!r}")
+        if rng == "*":
+            lo, hi = 0, 6
+        else:
+            lo_s, dash, hi_s = rng.partition("-")
+            lo = _dow_value(lo_s)
+            # crontab's "N/step" means N through the end of the week
+            hi = _dow_value(hi_s) if dash else (6 if step else lo)
+            if hi < lo:
+                raise ValueError(f"invalid day-of-week range {item!r}")
+        days.update(d % 7 for d in range(lo, hi + 1, step or 1))
+    if days == set(range(7)):
+        return "*"
+    return ",".join(_DOW_NAMES[d] for d in sorted(days))
+
+
+def _dow_value(token: str) -> int:
+    if token in _DOW_NAMES:
+        return _DOW_NAMES.index(token)
+    if token.isdigit() and int(token) <= 7:
+        return int(token)
+    raise ValueError(f"invalid day-of-week value {token!r}")
+
+
+def compile_cron(expr: str) -> Any:
+    """Compile a 5-field crontab expression; raises ValueError when invalid."""
+    from apscheduler.triggers.cron import CronTrigger
+
+    fields = expr.split()
+    if len(fields) != 5:
+        raise ValueError(f"wrong number of fields; got {len(fields)}, expected 5")
+    minute, hour, day, month, dow = fields
+    return CronTrigger(
+        minute=minute,
+        hour=hour,
+        day=day,
+        month=month,
+        day_of_week=_crontab_dow(dow),
+        timezone=getattr(settings, "TIME_ZONE", "UTC"),
+    )
+
+
+class AgentScheduler:
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._jobs: dict[int, _Job] = {}
+        self._heap: list[tuple[float, int, int]] = []  # (fire_ts, agent_id, gen); stale gens are skipped
+        self._gen = 0
+        self._running: set[int] = set()
+        self._invalid: dict[int, str] = {}
+        self._watermark: datetime | None = None
+        self._dirty = True
+        self._last_full = 0.0
+        self._last_poll = 0.0
+        self._seen_marker: Any = None
+        self._token = uuid.uuid4().hex
+        self._leader = False
+        self._lease_checked = 0.0
+        self._thread: threading.Thread | None = None
+        self._pool: ThreadPoolExecutor | None = None
+        self._stop = threading.Event()
+        self._stats_lock = threading.Lock()
+        self.dispatched = 0
+        self.misfired = 0
+        self.coalesced = 0
+        self.failed = 0
+        self.resyncs = 0
+
+    def _bump(self, name: str, n: int = 1) -> None:
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    # -- lifecycle -------------------------------------------------------------
+    def start(self) -> None:
+        with self._cond:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._pool = ThreadPoolExecutor(
+                max_workers=int(getattr(settings, "SCHEDULER_WORKERS", 4)),
+                thread_name_prefix="agent-run",
+            )
+            self._thread = threading.Thread(target=self._loop, name="agent-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self, wait: bool = True) -> None:
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread and wait:
+            self._thread.join()
+        if self._pool:
+            self._pool.shutdown(wait=wait)
+        if self._leader:
+            from .. import leases
+
+            try:
+                leases.release(_LEASE_NAME, self._token)
+            except Exception:
+                pass
+            self._leader = False
+        self._lease_checked = 0.0
+
+    @property
+    def started(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    @property
+    def leader(self) -> bool:
+        """True while this process holds the dispatch lease."""
+        return self._leader
+
+    def notify(self) -> None:
+        with self._cond:
+            self._dirty = True
+            self._cond.notify_all()
+
+    # -- loop ------------------------------------------------------------------
+    def _loop(self) -> None:
+        tick = float(getattr(settings, "SCHEDULER_TICK_SECONDS", 1.0))
+        while not self._stop.is_set():
+            try:
+                if self._hold_lease():
+                    self._maybe_resync()
+                    self._dispatch_due(time.time())
+            except Exception:
+                logger.exception("scheduler iteration failed")
+            finally:
+                close_old_connections()
+
+            with self._cond:
+                if (self._dirty and self._leader) or self._stop.is_set():
+                    continue
+                timeout = tick
+                if self._heap and self._leader:
+                    timeout = min(tick, max(0.0, self._heap[0][0] - time.time()))
+                self._cond.wait(timeout)
+
+    def _hold_lease(self) -> bool:
+        lease = float(getattr(settings, "SCHEDULER_LEASE_SECONDS", 30))
+        now = time.monotonic()
+        # the leader renews, and the others retry, every lease/3 seconds; not every tick,
+        # since each attempt takes the database write lock
+        if now - self._lease_checked < lease / 3:
+            return self._leader
+        self._lease_checked = now
+        from .. import leases
+
+        try:
+            if leases.acquire(_LEASE_NAME, self._token, lease):
+                if not self._leader:
+                    self._dirty = True
+                    self._last_full = 0.0
+                self._leader = True
+            else:
+                self._leader = False
+        except Exception:
+            logger.exception("scheduler lease check failed")
+            self._leader = False
+        return self._leader
+
+    def _maybe_resync(self) -> None:
+        now = time.monotonic()
+        full_every = float(getattr(settings, "SCHEDULER_FULL_RESYNC", 600))
+        poll_every = float(getattr(settings, "SCHEDULER_POLL_SECONDS", 60))
+        marker = caches["shared"].get(_CHANGED_KEY)
+        with self._cond:
+            changed = self._dirty or marker != self._seen_marker or now - self._last_poll >= poll_every
+            self._dirty = False
+        self._seen_marker = marker
+        if not self._last_full or now - self._last_full >= full_every:
+            self.resync(full=True)
+        elif changed:
+            self.resync(full=False)
+
+    def resync(self, *, full: bool = False) -> int:
+        """Apply agent rows changed since the last resync (all rows when `full`)."""
+        from ..models import Agent
+
+        qs = Agent.objects.all()
+        if not full and self._watermark is not None:
+            # >= plus a small lookback: rows committed late with an older timestamp
+            qs = qs.filter(updated_at__gte=self._watermark - timedelta(seconds=2))
+        rows = list(qs.values_list("id", "active", "schedule_cron", "updated_at"))
+
+        now = datetime.now(dt_timezone.utc)
+        with self._cond:
+            seen: set[int] = set()
+            for agent_id, active, cron, updated_at in rows:
+                seen.add(agent_id)
+                self._apply(agent_id, active, cron or "", updated_at, now)
+                if self._watermark is None or updated_at > self._watermark:
+                    self._watermark = updated_at
+            if full:
+                for agent_id in [a for a in self._jobs if a not in seen]:
+                    del self._jobs[agent_id]
+                for agent_id in [a for a in self._invalid if a not in seen]:
+                    del self._invalid[agent_id]
+                self._last_full = time.monotonic()
+            if len(self._heap) > 2 * len(self._jobs) + 64:
+                # drop entries superseded by edits/toggles
+                self._heap = [(j.next_fire, j.agent_id, j.gen) for j in self._jobs.values() if j.next_fire is not None]
+                heapq.heapify(self._heap)
+            self._last_poll = time.monotonic()
+            self._bump("resyncs")
+            self._cond.notify_all()
+        return len(rows)
+
+    def _apply(self, agent_id: int, active: bool, cron: str, updated_at: datetime, now: datetime) -> None:
+        cron = cron.strip()
+        job = self._jobs.get(agent_id)
+        if not active or not cron:
+            self._jobs.pop(agent_id, None)
+            self._invalid.pop(agent_id, None)
+            return
+        if job is not None and job.cron == cron:
+            job.updated_at = updated_at
+            return
+        try:
+            trigger = compile_cron(cron)
+        except ValueError as exc:
+            self._jobs.pop(agent_id, None)
+            if self._invalid.get(agent_id) != cron:
+                logger.warning("agent %s has an invalid schedule_cron %r: %s", agent_id, cron, exc)
+            self._invalid[agent_id] = cron
+            return
+        self._invalid.pop(agent_id, None)
+        self._gen += 1
+        job = _Job(agent_id=agent_id, cron=cron, trigger=trigger, updated_at=updated_at, gen=self._gen)
+        self._jobs[agent_id] = job
+        self._schedule_next(job, now)
+
+    def _schedule_next(self, job: _Job, after: datetime) -> None:
+        nxt = job.trigger.get_next_fire_time(None, after)
+        job.next_fire = nxt.timestamp() if nxt else None
+        if job.next_fire is not None:
+            heapq.heappush(self._heap, (job.next_fire, job.agent_id, job.gen))
+
+    def _dispatch_due(self, now: float) -> None:
+        grace = float(getattr(settings, "SCHEDULER_MISFIRE_GRACE", 60))
+        due: list[int] = []
+        with self._cond:
+            while self._heap and self._heap[0][0] <= now:
+                fire_ts, agent_id, gen = heapq.heappop(self._heap)
+                job = self._jobs.get(agent_id)
+                if job is None or job.gen != gen or job.next_fire != fire_ts:
+                    continue  # superseded entry
+                if now - fire_ts > grace:
+                    self._bump("misfired")
+                elif agent_id in self._running:
+                    self._bump("coalesced")
+                else:
+                    self._running.add(agent_id)
+                    due.append(agent_id)
+                # computed from now, so any fire times missed meanwhile collapse into this one
+                self._schedule_next(job, datetime.fromtimestamp(max(now, fire_ts) + 0.001, dt_timezone.utc))
+
+        for agent_id in due:
+            self._bump("dispatched")
+            self._pool.submit(self._execute, agent_id)
+
+    def _execute(self, agent_id: int) -> None:
+        from ..models import Agent
+        from ..runs import execute_agent_run
+
+        try:
+            agent = Agent.objects.filter(id=agent_id, active=True).first()
+            if agent is not None:
+                execute_agent_run(agent, trigger="schedule")
+        except Exception:
+            self._bump("failed")
+            logger.exception("scheduled run of agent %s failed", agent_id)
+        finally:
+            close_old_connections()
+            with self._cond:
+                self._running.discard(agent_id)
+
+    # -- introspection ---------------------------------------------------------
+    def stats(self) -> dict[str, Any]:
+        with self._stats_lock:
+            counts = {
+                "dispatched": self.dispatched,
+                "misfired": self.misfired,
+                "coalesced": self.coalesced,
+                "failed": self.failed,
+                "resyncs": self.resyncs,
+            }
+        with self._cond:
+            next_fire = min((j.next_fire for j in self._jobs.values() if j.next_fire is not None), default=None)
+            return {
+                "started": self.started,
+                "leader": self._leader,
+                "jobs": len(self._jobs),
+                "invalid": len(self._invalid),
+                "heap": len(self._heap),
+                "running": len(self._running),
+                **counts,
+                "next_fire_in": round(next_fire - time.time(), 3) if next_fire is not None else None,
+            }
+
+
+scheduler = AgentScheduler()
+
+
+def agents_changed() -> None:
+    """Call after creating, editing or toggling agents."""
+    scheduler.notify()
+    try:
+        caches["shared"].set(_CHANGED_KEY, time.time(), timeout=None)
+    except Exception:
+        pass
+
 
+def sync_scheduler() -> dict[str, Any]:
+    """Force a full resync when the engine runs here; report the schedulable job count."""
+    if scheduler.started and scheduler.leader:
+        scheduler.resync(full=True)
+        jobs = scheduler.stats()["jobs"]
+        message = "Scheduler synced."
+    else:
+        agents_changed()
+        from ..models import Agent
 
-def sync_scheduler_stub() -> dict[str, Any]:
-    """
-    APScheduler-compatible placeholder.
-    You can later wire this to a BackgroundScheduler + job store.
-    """
-    return {
-        "status": "ok",
-        "message": "Scheduler stub synced.",
-        "jobs": 0,
-    }
+        jobs = Agent.objects.filter(active=True).exclude(schedule_cron="").count()
+        message = "Scheduler notified; runs are dispatched by the scheduler process."
+    return {"status": "ok", "message": message, "jobs": jobs}
@@ -1,35 +1,145 @@
+"""
+Groq Whisper transcription.
+
+Uploads are streamed straight from Django's temp file as a multipart body
+with a known length, so a recording is never held in memory. When ffmpeg
+is available, recordings longer than STT_SEGMENT_SECONDS are cut into
+segments that overlap by STT_SEGMENT_OVERLAP seconds. The segments are
+transcribed in parallel on a pool of STT_WORKERS threads, and the texts
+are stitched in order, with the words repeated in each overlap removed.
+
+Finished transcripts are cached in CACHES["transcripts"] under the
+sha256 of the audio bytes, the model and the language. A retried or
+re-sent recording then skips Whisper entirely.
+"""
 from __future__ import annotations
-import requests
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import IO, Any, Iterator
+import hashlib
+import io
+import mimetypes
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import uuid
 
-GROQ_API_BASE = "https://api.groq.com/openai/v1"
+from django.conf import settings
+from django.core.cache import caches
 
+from .groq_client import api_base
+from .http_transport import upstream_session, timeouts
 
-def transcribe_audio_bytes(
+_executor = ThreadPoolExecutor(
+    max_workers=int(getattr(settings, "STT_WORKERS", 4)),
+    thread_name_prefix="stt-segment",
+)
+
+_WORD_RE = re.compile(r"\w+")
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "bypassed": 0, "stores": 0}
+
+
+def _bump(name: str) -> None:
+    with _stats_lock:
+        _stats[name] += 1
+
+
+class _MultipartBody:
+    """
+    multipart/form-data body that reads the file part lazily.
+
+    requests sends any object with read() and __len__ as a streamed body with
+    a Content-Length header, one block at a time.
+    """
+
+    def __init__(self, fields: dict[str, str], filename: str, content_type: str, fileobj: IO[bytes], size: int) -> None:
+        self.boundary = uuid.uuid4().hex
+        head = b"".join(
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode("utf-8")
+            for name, value in fields.items()
+        )
+        safe_name = filename.replace('"', "").replace("\r", "").replace("\n", "")
+        head += (
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="file"; filename="{safe_name}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode("utf-8")
+        tail = f"\r\n--{self.boundary}--\r\n".encode("utf-8")
+        self._parts: list[IO[bytes]] = [io.BytesIO(head), fileobj, io.BytesIO(tail)]
+        self._length = len(head) + size + len(tail)
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self) -> int:
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        out = bytearray()
+        while self._parts and (size < 0 or len(out) < size):
+            chunk = self._parts[0].read(-1 if size < 0 else size - len(out))
+            if not chunk:
+                self._parts.pop(0)
+                continue
+            out += chunk
+        return bytes(out)
+
+
+def transcribe_file(
     *,
     api_key: str,
-    audio_bytes: bytes,
+    fileobj: IO[bytes],
+    size: int,
     filename: str = "audio.webm",
+    content_type: str | None = None,
     model: str = "whisper-large-v3-turbo",
     language: str | None = None,
 ) -> str:
-    headers = {"Authorization": f"Bearer {api_key}"}
-    files = {"file": (filename, audio_bytes, "audio/webm")}
-    data = {"model": model}
+    """Transcribe `size` bytes read from `fileobj` without loading them into memory."""
+    fields = {"model": model}
     if language:
-        data["language"] = language
-
-    r = requests.post(
-        f"{GROQ_API_BASE}/audio/transcriptions",
-        headers=headers,
-        data=data,
-        files=files,
-        timeout=120,
+        fields["language"] = language
+    body = _MultipartBody(
+        fields,
+        filename,
+        content_type or mimetypes.guess_type(filename)[0] or "audio/webm",
+        fileobj,
+        size,
+    )
+    r = upstream_session().post(
+        f"{api_base()}/audio/transcriptions",
+        headers={"Authorization": f"Bearer {api_key}", "Content-Type": body.content_type},
+        data=body,
+        timeout=timeouts(float(getattr(settings, "STT_UPLOAD_TIMEOUT", 120))),
     )
     r.raise_for_status()
     payload = r.json()
     return (payload.get("text") or "").strip()
 
 
+def transcribe_audio_bytes(
+    *,
+    api_key: str,
+    audio_bytes: bytes,
+    filename: str = "audio.webm",
+    model: str = "whisper-large-v3-turbo",
+    language: str | None = None,
+) -> str:
+    return transcribe_file(
+        api_key=api_key,
+        fileobj=io.BytesIO(audio_bytes),
+        size=len(audio_bytes),
+        filename=filename,
+        content_type="audio/webm",
+        model=model,
+        language=language,
+    )
+
+
 # Backward-compatible name used by views.py
 def transcribe_audio(
     *,
@@ -46,3 +156,237 @@ def transcribe_audio(
         model=model,
         language=language,
     )
+
+
+# -- long recordings -----------------------------------------------------------
+
+def _tool(name: str) -> str | None:
+    return shutil.which(getattr(settings, f"STT_{name.upper()}_BIN", name))
+
+
+def probe_duration(path: str) -> float | None:
+    """Duration in seconds via ffprobe, or None when it is unavailable or fails."""
+    ffprobe = _tool("ffprobe")
+    if not ffprobe:
+        return None
+    try:
+        out = subprocess.run(
+            [ffprobe, "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", path],
+            capture_output=True, text=True, timeout=30, check=True,
+        ).stdout.strip()
+        return float(out)
+    except (subprocess.SubprocessError, ValueError):
+        return None
+
+
+def plan_segments(duration: float, seconds: float, overlap: float) -> list[tuple[float, float]]:
+    """(start, length) windows covering `duration`, each overlapping the previous by `overlap`."""
+    if duration <= seconds:
+        return [(0.0, duration)]
+    step = max(seconds - overlap, 1.0)
+    windows: list[tuple[float, float]] = []
+    start = 0.0
+    while start < duration:
+        windows.append((start, min(seconds, duration - start)))
+        if start + seconds >= duration:
+            break
+        start += step
+    return windows
+
+
+def _cut_segment(src: str, start: float, length: float, dest: str) -> None:
+    # 16 kHz mono FLAC: what Whisper resamples to anyway, and lossless
+    subprocess.run(
+        [
+            _tool("ffmpeg") or "ffmpeg", "-nostdin", "-v", "error", "-y",
+            "-ss", f"{start:.3f}", "-t", f"{length:.3f}", "-i", src,
+            "-vn", "-ac", "1", "-ar", "16000", "-c:a", "flac", dest,
+        ],
+        check=True, capture_output=True, timeout=max(60.0, length),
+    )
+
+
+def _transcribe_segment(api_key: str, src: str, start: float, length: float, workdir: str, index: int, model: str, language: str | None) -> str:
+    dest = os.path.join(workdir, f"segment-{index:04d}.flac")
+    _cut_segment(src, start, length, dest)
+    try:
+        with open(dest, "rb") as fh:
+            return transcribe_file(
+                api_key=api_key, fileobj=fh, size=os.path.getsize(dest),
+                filename=os.path.basename(dest), content_type="audio/flac",
+                model=model, language=language,
+            )
+    finally:
+        os.unlink(dest)
+
+
+def _norm(word: str) -> str:
+    return "".join(_WORD_RE.findall(word.lower()))
+
+
+def stitch(previous: str, following: str, max_words: int = 40) -> str:
+    """
+    Return `following` minus the words that repeat the end of `previous`.
+
+    Overlapping audio is transcribed twice. The boundary word of the
+    following segment may be clipped, so the match may start up to two
+    words in.
+    """
+    prev = [_norm(w) for w in previous.split()[-max_words:]]
+    words = following.split()
+    head = [_norm(w) for w in words[:max_words]]
+    best_end = 0
+    for skip in range(0, 3):
+        for k in range(min(len(prev), len(head) - skip), 1, -1):
+            if prev[-k:] == head[skip:skip + k]:
+                best_end = max(best_end, skip + k)
+                break
+    return " ".join(words[best_end:])
+
+
+def cache_enabled() -> bool:
+    return bool(getattr(settings, "STT_CACHE_ENABLED", True))
+
+
+def audio_digest(upload: Any) -> str:
+    """sha256 of an UploadedFile, read in chunks; rewinds it afterwards."""
+    digest = hashlib.sha256()
+    for chunk in upload.chunks():
+        digest.update(chunk)
+    upload.seek(0)
+    return digest.hexdigest()
+
+
+def _cache_key(digest: str, model: str, language: str | None) -> str:
+    return f"stt:{digest}:{model}:{language or 'auto'}"
+
+
+def stt_cache_stats() -> dict[str, Any]:
+    with _stats_lock:
+        out: dict[str, Any] = dict(_stats)
+    lookups = out["hits"] + out["misses"]
+    out.update({
+        "enabled": cache_enabled(),
+        "hit_ratio": round(out["hits"] / lookups, 4) if lookups else 0.0,
+    })
+    return out
+
+
+def iter_transcript(
+    *,
+    api_key: str,
+    upload: Any,
+    model: str = "whisper-large-v3-turbo",
+    language: str | None = None,
+    bypass_cache: bool = False,
+) -> Iterator[dict[str, Any]]:
+    """
+    Transcribe a Django UploadedFile, yielding one event per segment in order:
+    {"index", "count", "start", "end", "text", "transcript", "cached"}, where
+    "transcript" is everything stitched so far.
+
+    Segments are transcribed in parallel. An event is yielded once its
+    segment and all earlier ones are done. A cache hit yields a single
+    event with cached=True.
+    """
+    cache_key = None
+    if cache_enabled():
+        cache_key = _cache_key(audio_digest(upload), model, language)
+        if bypass_cache:
+            _bump("bypassed")
+        else:
+            try:
+                cached = caches["transcripts"].get(cache_key)
+            except Exception:
+                cached = None
+            if cached is not None:
+                _bump("hits")
+                yield {"index": 0, "count": 1, "start": 0.0, "end": cached.get("duration"),
+                       "text": cached["text"], "transcript": cached["text"], "cached": True}
+                return
+            _bump("misses")
+
+    duration: float | None = None
+    transcript = ""
+    for event in _iter_segments(api_key=api_key, upload=upload, model=model, language=language):
+        duration = event["end"]
+        transcript = event["transcript"]
+        yield {**event, "cached": False}
+
+    if cache_key:
+        try:
+            caches["transcripts"].set(cache_key, {"text": transcript, "duration": duration})
+            _bump("stores")
+        except Exception:
+            pass
+
+
+def _iter_segments(
+    *,
+    api_key: str,
+    upload: Any,
+    model: str,
+    language: str | None,
+) -> Iterator[dict[str, Any]]:
+    filename = upload.name or "audio.webm"
+    path = upload.temporary_file_path() if hasattr(upload, "temporary_file_path") else None
+    duration = probe_duration(path) if path and _tool("ffmpeg") else None
+    seconds = float(getattr(settings, "STT_SEGMENT_SECONDS", 600))
+    overlap = float(getattr(settings, "STT_SEGMENT_OVERLAP", 3))
+
+    if duration is None or duration <= seconds:
+        # short, in-memory, or no ffmpeg: one streamed upload
+        upload.seek(0)
+        text = transcribe_file(
+            api_key=api_key, fileobj=upload.file, size=upload.size, filename=filename,
+            content_type=getattr(upload, "content_type", None), model=model, language=language,
+        )
+        yield {"index": 0, "count": 1, "start": 0.0, "end": duration, "text": text, "transcript": text}
+        return
+
+    windows = plan_segments(duration, seconds, overlap)
+    with tempfile.TemporaryDirectory(prefix="stt-") as workdir:
+        futures: list[Future] = [
+            _executor.submit(_transcribe_segment, api_key, path, start, length, workdir, i, model, language)
+            for i, (start, length) in enumerate(windows)
+        ]
+        try:
+            transcript = ""
+            for i, fut in enumerate(futures):
+                text = fut.result()
+                piece = stitch(transcript, text) if transcript else text
+                transcript = f"{transcript} {piece}".strip() if piece else transcript
+                start, length = windows[i]
+                yield {
+                    "index": i,
+                    "count": len(windows),
+                    "start": round(start, 3),
+                    "end": round(start + length, 3),
+                    "text": piece,
+                    "transcript": transcript,
+                }
+        finally:
+            for fut in futures:
+                fut.cancel()
+            # let running segments finish before their temp dir goes away
+            for fut in futures:
+                if not fut.cancelled():
+                    try:
+                        fut.exception()
+                    except Exception:
+                        pass
+
+
+def transcribe_upload(
+    *,
+    api_key: str,
+    upload: Any,
+    model: str = "whisper-large-v3-turbo",
+    language: str | None = None,
+    bypass_cache: bool = False,
+) -> tuple[str, bool]:
+    """Return (transcript, served_from_cache)."""
+    transcript, cached = "", False
+    for event in iter_transcript(api_key=api_key, upload=upload, model=model, language=language, bypass_cache=bypass_cache):
+        transcript, cached = event["transcript"], event["cached"]
+    return transcript, cached
@@ -0,0 +1,99 @@
+"""Local stand-ins for upstream services, served from a background thread."""
+from __future__ import annotations
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import time
+
+USAGE = {"prompt_tokens": 12, "completion_tokens": 40, "completion_time": 0.2}
+
+
+class StubServer:
+    """Start with `with StubServer(handler_cls) as base_url:`; requests are kept on `.calls`."""
+
+    def __init__(self, handler_cls: type[BaseHTTPRequestHandler]) -> None:
+        self.calls: list[dict] = []
+        stub = self
+
+        class Handler(handler_cls):
+            server_stub = stub
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def __enter__(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class GroqHandler(BaseHTTPRequestHandler):
+    """Chat completions: JSON replies, or chunked SSE with usage in x_groq on the last chunk."""
+
+    protocol_version = "HTTP/1.1"
+    server_stub: StubServer
+    deltas = ["Hel", "lo"]
+    first_delta_delay = 0.0
+
+    def _json(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _chunk(self, data: bytes) -> None:
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        self.server_stub.calls.append({"path": self.path, "body": body})
+        if not body.get("stream"):
+            reply = "".join(self.deltas)
+            return self._json(200, {"choices": [{"message": {"content": reply}}], "usage": USAGE})
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        time.sleep(self.first_delta_delay)
+        for text in self.deltas:
+            self._chunk(f"data: {json.dumps({'choices': [{'delta': {'content': text}}]})}\n\n".encode())
+        last = {"choices": [{"delta": {}}], "x_groq": {"usage": USAGE}}
+        self._chunk(f"data: {json.dumps(last)}\n\ndata: [DONE]\n\n".encode())
+        self._chunk(b"")
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    """Make webhook: answers each POST with the next code in `statuses` (200 once they run out)."""
+
+    protocol_version = "HTTP/1.1"
+    server_stub: StubServer
+    statuses: list[int] = []
+    delay = 0.0
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self.server_stub.calls.append({"path": self.path, "body": json.loads(body or b"null")})
+        status = self.statuses.pop(0) if self.statuses else 200
+        if self.delay:
+            time.sleep(self.delay)
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "text/plain")
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"ok")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client timed out first
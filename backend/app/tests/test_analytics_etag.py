@@ -0,0 +1,46 @@
+from unittest import mock
+import time
+
+from django.test import Client, TestCase, override_settings
+
+from app.services import llm_telemetry
+
+T0 = 1_800_000_000.0  # start of a 30 s slot
+
+
+@override_settings(SYSTEM_LOG_BUFFERED=False, ANALYTICS_LLM_ETAG_SECONDS=30)
+class AnalyticsEtagTests(TestCase):
+    def setUp(self):
+        self.client = Client(SERVER_NAME="localhost")
+        self.clock = mock.Mock(wraps=time)
+        self.clock.time = mock.Mock(return_value=T0)
+        patcher = mock.patch.object(llm_telemetry, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        llm_telemetry.reset()
+
+    def _at(self, ts):
+        self.clock.time.return_value = ts
+
+    def _get(self, etag=None):
+        headers = {"HTTP_IF_NONE_MATCH": etag} if etag else {}
+        return self.client.get("/api/analytics/summary", **headers)
+
+    def _chat_call(self):
+        llm_telemetry.record("m", "chat", outcome="ok", latency=0.2)
+
+    def test_chat_calls_within_a_slot_keep_the_etag(self):
+        etag = self._get()["ETag"]
+        self._at(T0 + 5)
+        self._chat_call()
+        self._at(T0 + 10)
+        self.assertEqual(self._get(etag).status_code, 304)
+
+    def test_etag_moves_once_per_slot_and_settles_when_idle(self):
+        self._chat_call()
+        etag = self._get()["ETag"]
+        self._at(T0 + 31)  # next slot: the earlier call's numbers are now served
+        fresh = self._get(etag)
+        self.assertEqual(fresh.status_code, 200)
+        self._at(T0 + 300)  # idle since: the marker has settled
+        self.assertEqual(self._get(fresh["ETag"]).status_code, 304)
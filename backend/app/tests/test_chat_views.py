@@ -0,0 +1,39 @@
+from django.test import Client, TestCase, override_settings
+
+from app import views
+from app.services import completion_cache
+
+from .stubs import GroqHandler, StubServer
+
+
+@override_settings(SYSTEM_LOG_BUFFERED=False, CHAT_CACHE_ENABLED=True, CHAT_CACHE_SHARED=False)
+class ChatCacheKeyTests(TestCase):
+    def setUp(self):
+        views._settings_cache.update(obj=None, checked_at=0.0)
+        completion_cache._lru._items.clear()
+        self.client = Client(SERVER_NAME="localhost")
+
+    def _post(self, path, stub, history):
+        # streams run lazily, so the body is read while the stub settings are still active
+        with override_settings(GROQ_API_BASE=stub.url, ENV_GROQ_API_KEY="k"):
+            resp = self.client.post(path, {"message": "next", "history": history}, content_type="application/json")
+            if resp.streaming:
+                return b"".join(resp.streaming_content).decode()
+            return resp.json()
+
+    def test_chat_reply_is_replayed_by_chat_stream(self):
+        history = [{"role": "user", "content": "  hello \n"}, {"role": "assistant", "content": "hi"}]
+        with StubServer(GroqHandler) as stub:
+            reply = self._post("/api/chat", stub, history)
+            stream = self._post("/api/chat/stream", stub, history)
+        self.assertEqual(reply, {"ok": True, "reply": "Hello", "cached": False})
+        self.assertIn("data: Hello\n\n", stream)
+        self.assertEqual(len(stub.calls), 1)
+
+    def test_chat_stream_reply_is_replayed_by_chat(self):
+        history = [{"role": "user", "content": "hello"}, {"role": "system", "content": "   "}]
+        with StubServer(GroqHandler) as stub:
+            self._post("/api/chat/stream", stub, history)
+            reply = self._post("/api/chat", stub, history)
+        self.assertTrue(reply["cached"])
+        self.assertEqual(len(stub.calls), 1)
@@ -0,0 +1,108 @@
+from http.server import BaseHTTPRequestHandler
+import threading
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from app.models import CrawlCacheEntry
+from app.services import crawl_cache
+from app.services.news_service import _extract
+
+from .stubs import StubServer
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    """Serves /<name> as chunked HTML; `pages` maps name -> list of body chunks."""
+
+    protocol_version = "HTTP/1.1"
+    pages: dict[str, list[bytes]] = {}
+    first_chunk_seen: threading.Event | None = None
+    seen_before_rest: list[bool] = []
+
+    def do_GET(self):
+        self.server_stub.calls.append({"path": self.path})
+        chunks = self.pages[self.path.lstrip("/")]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i, chunk in enumerate(chunks):
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            self.wfile.flush()
+            if i == 0 and self.first_chunk_seen is not None:
+                self.seen_before_rest.append(self.first_chunk_seen.wait(2))
+        self.wfile.write(b"0\r\n\r\n")
+
+
+def _page(text: str) -> list[bytes]:
+    return [b"<html><head><title>T</title></head><body>", f"<p>{text}</p>".encode(), b"</body></html>"]
+
+
+@override_settings(CRAWL_CACHE_FRESHNESS=0, CRAWL_CACHE_MAX_BYTES=10_000, CRAWL_CACHE_RESYNC_WRITES=100)
+class CrawlCacheTests(TestCase):
+    def setUp(self):
+        crawl_cache._size.update(bytes=None, writes=0)
+        PageHandler.pages = {}
+        PageHandler.first_chunk_seen = None
+        PageHandler.seen_before_rest = []
+
+    def _get(self, stub, name, extract=_extract):
+        return crawl_cache.get_extraction(f"{stub.url}/{name}", timeout=5, extract=extract)
+
+    def test_body_is_parsed_while_it_arrives(self):
+        PageHandler.pages = {"a": _page("hello")}
+        PageHandler.first_chunk_seen = threading.Event()
+
+        def extract(chunks, encoding):
+            def watched():
+                for chunk in chunks:
+                    PageHandler.first_chunk_seen.set()
+                    yield chunk
+            return _extract(watched(), encoding)
+
+        with StubServer(PageHandler) as stub:
+            data = self._get(stub, "a", extract)
+        self.assertEqual((data["text"], data["cache"]), ("hello", "miss"))
+        self.assertEqual(PageHandler.seen_before_rest, [True])
+
+    def test_unchanged_body_keeps_entry_and_changed_body_replaces_it(self):
+        with StubServer(PageHandler) as stub:
+            PageHandler.pages = {"a": _page("one")}
+            self.assertEqual(self._get(stub, "a")["cache"], "miss")
+            self.assertEqual(self._get(stub, "a")["cache"], "unchanged")
+            PageHandler.pages = {"a": _page("two")}
+            data = self._get(stub, "a")
+        self.assertEqual((data["text"], data["cache"]), ("two", "miss"))
+        self.assertEqual(CrawlCacheEntry.objects.get().text, "two")
+
+    def test_unchanged_body_is_not_parsed_again(self):
+        parsed = []
+
+        def extract(chunks, encoding):
+            parsed.append(1)
+            return _extract(chunks, encoding)
+
+        with StubServer(PageHandler) as stub:
+            PageHandler.pages = {"a": _page("one")}
+            self._get(stub, "a", extract)
+            self.assertEqual(self._get(stub, "a", extract)["cache"], "unchanged")
+            self.assertEqual(len(parsed), 1)
+            PageHandler.pages = {"a": _page("two")}
+            data = self._get(stub, "a", extract)
+        self.assertEqual((data["text"], data["cache"], len(parsed)), ("two", "miss", 2))
+
+    def test_misses_skip_the_size_aggregate_until_the_cap_is_passed(self):
+        with StubServer(PageHandler) as stub:
+            PageHandler.pages = {f"p{i}": _page(f"{i}" * 3000) for i in range(5)}
+            self._get(stub, "p0")  # first write reads the table total
+            with CaptureQueriesContext(connection) as ctx:
+                self._get(stub, "p1")
+                self._get(stub, "p2")
+            self.assertFalse([q for q in ctx.captured_queries if "SUM(" in q["sql"].upper()])
+
+            self._get(stub, "p3")  # 12 KB > 10 KB cap: evicts the least recently accessed
+        urls = set(CrawlCacheEntry.objects.values_list("url", flat=True))
+        self.assertEqual(len(urls), 3)
+        self.assertFalse(any(u.endswith("/p0") for u in urls))
+        self.assertEqual(crawl_cache._size["bytes"], sum(CrawlCacheEntry.objects.values_list("size", flat=True)))
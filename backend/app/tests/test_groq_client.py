@@ -0,0 +1,47 @@
+import asyncio
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from app.services import completion_cache
+from app.services.groq_client import ChatMessage, chat_completion, stream_completion
+
+from .stubs import GroqHandler, StubServer
+
+MESSAGES = [ChatMessage(role="user", content="hi")]
+
+
+class ApiBaseTests(SimpleTestCase):
+    def test_calls_go_to_configured_base(self):
+        with StubServer(GroqHandler) as stub, override_settings(GROQ_API_BASE=stub.url + "/"):
+            self.assertEqual(chat_completion(api_key="k", model="llama-3.1-8b-instant", messages=MESSAGES), "Hello")
+            self.assertEqual("".join(stream_completion(api_key="k", model="llama-3.1-8b-instant", messages=MESSAGES)), "Hello")
+        self.assertEqual([c["path"] for c in stub.calls], ["/chat/completions", "/chat/completions"])
+
+
+class AsyncCacheAccessTests(SimpleTestCase):
+    def _lookup_thread(self) -> tuple[int, int]:
+        seen = {}
+
+        def lookup(key, *, bypass=False):
+            seen["thread"] = threading.get_ident()
+            return None
+
+        async def run():
+            seen["loop"] = threading.get_ident()
+            await completion_cache.alookup("k")
+
+        with mock.patch.object(completion_cache, "lookup", side_effect=lookup):
+            asyncio.run(run())
+        return seen["loop"], seen["thread"]
+
+    @override_settings(CHAT_CACHE_SHARED=True)
+    def test_shared_tier_is_read_off_the_event_loop(self):
+        loop_thread, lookup_thread = self._lookup_thread()
+        self.assertNotEqual(loop_thread, lookup_thread)
+
+    @override_settings(CHAT_CACHE_SHARED=False)
+    def test_memory_only_lookup_stays_inline(self):
+        loop_thread, lookup_thread = self._lookup_thread()
+        self.assertEqual(loop_thread, lookup_thread)
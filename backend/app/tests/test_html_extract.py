@@ -0,0 +1,51 @@
+from bs4 import BeautifulSoup
+from django.test import SimpleTestCase
+
+from app.services.html_extract import available_backends, extract_from_chunks
+
+
+def legacy_extract(html: bytes, budget: int) -> dict:
+    """The BeautifulSoup path crawl_extract used before the streaming extractor."""
+    soup = BeautifulSoup(html.decode("utf-8"), "html.parser")
+    for tag in soup(["script", "style", "noscript", "header", "footer", "svg"]):
+        tag.decompose()
+    title = (soup.title.string.strip() if soup.title and soup.title.string else "")
+    text = "\n".join(p for p in (p.get_text(" ", strip=True) for p in soup.find_all("p")) if p)
+    return {"title": title, "text": text[:budget], "length": len(text)}
+
+
+PAGE = (
+    "<html><head><title> Page </title><script>var p = '<p>no</p>';</script></head><body>"
+    "<header><p>nav</p></header>"
+    + "".join(f"<div><p>paragraph {i} with <b>bold</b> words</p></div>" for i in range(200))
+    + "<footer><p>footer</p></footer></body></html>"
+).encode()
+
+
+class ExtractLengthTests(SimpleTestCase):
+    def _extract(self, backend, budget, max_bytes=2_000_000):
+        chunks = (PAGE[i:i + 512] for i in range(0, len(PAGE), 512))
+        return extract_from_chunks(chunks, encoding="utf-8", text_budget=budget, max_bytes=max_bytes, backend=backend)
+
+    def test_length_is_full_text_length_when_text_is_cut(self):
+        for backend in available_backends():
+            with self.subTest(backend=backend):
+                data = self._extract(backend, budget=300)
+                legacy = legacy_extract(PAGE, 300)
+                self.assertEqual(data["text"], legacy["text"])
+                self.assertEqual(data["length"], legacy["length"])
+                self.assertGreater(data["length"], len(data["text"]))
+                self.assertTrue(data["truncated"])
+
+    def test_untruncated_page_matches_legacy(self):
+        for backend in available_backends():
+            with self.subTest(backend=backend):
+                data = self._extract(backend, budget=50_000)
+                legacy = legacy_extract(PAGE, 50_000)
+                self.assertEqual((data["title"], data["text"], data["length"]), (legacy["title"], legacy["text"], legacy["length"]))
+                self.assertFalse(data["truncated"])
+
+    def test_reading_stops_at_max_bytes(self):
+        data = self._extract("html.parser", budget=50_000, max_bytes=2048)
+        self.assertEqual(data["bytes_read"], 2048)
+        self.assertTrue(data["truncated"])
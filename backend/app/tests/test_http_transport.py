@@ -0,0 +1,29 @@
+import socket
+
+import httpx
+import requests
+from django.test import SimpleTestCase
+
+from app.services.http_transport import async_timeouts, transport_stats, upstream_async_client, upstream_session
+
+
+def _closed_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TransportErrorCountTests(SimpleTestCase):
+    def test_sync_connect_error_is_counted(self):
+        before = transport_stats()["errors"]
+        with self.assertRaises(requests.ConnectionError):
+            upstream_session().get(f"http://127.0.0.1:{_closed_port()}/", timeout=2)
+        self.assertEqual(transport_stats()["errors"], before + 1)
+
+    async def test_async_connect_error_is_counted(self):
+        before = transport_stats()
+        with self.assertRaises(httpx.ConnectError):
+            await upstream_async_client().get(f"http://127.0.0.1:{_closed_port()}/", timeout=async_timeouts(2))
+        after = transport_stats()
+        self.assertEqual(after["errors"], before["errors"] + 1)
+        self.assertEqual(after["requests"], before["requests"] + 1)
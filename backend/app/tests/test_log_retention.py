@@ -0,0 +1,57 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from app import leases, log_retention
+from app.models import SystemLog
+
+
+@override_settings(SYSTEM_LOG_RETENTION_DAYS=5, SYSTEM_LOG_MAX_ROWS=0, SYSTEM_LOG_RETENTION_PAUSE=0)
+class PruneTests(TestCase):
+    def setUp(self):
+        old = timezone.now() - timedelta(days=10)
+        for source, level in (("chat", "info"), ("chat", "error"), ("run_now", "info")):
+            SystemLog.objects.create(source=source, level=level, message="m", created_at=old)
+
+    def _left(self):
+        return sorted(SystemLog.objects.values_list("source", "level"))
+
+    def test_catch_all_rule_takes_every_remaining_row(self):
+        rules = [{"source": "chat", "level": "info", "days": 1}, {"days": 365}]
+        with override_settings(SYSTEM_LOG_RETENTION_RULES=rules):
+            report = log_retention.prune(archive=False)
+        # the default rule (5 days) comes after the catch-all and must not touch the rest
+        self.assertEqual(self._left(), [("chat", "error"), ("run_now", "info")])
+        self.assertEqual([(e["rule"], e["deleted"]) for e in report["rules"]], [("chat:info", 1), ("*:*", 0), ("*:*", 0)])
+
+    def test_default_rule_applies_without_a_catch_all(self):
+        with override_settings(SYSTEM_LOG_RETENTION_RULES=[{"level": "error", "days": 365}]):
+            log_retention.prune(archive=False)
+        self.assertEqual(self._left(), [("chat", "error")])
+
+    def test_prune_skips_while_another_process_holds_the_lease(self):
+        self.assertTrue(leases.acquire("system-log-retention", "other-worker", 60))
+        report = log_retention.prune(archive=False)
+        self.assertEqual(report["skipped"], "another prune is running")
+        self.assertEqual(SystemLog.objects.count(), 3)
+
+        leases.release("system-log-retention", "other-worker")
+        log_retention.prune(archive=False)
+        self.assertEqual(SystemLog.objects.count(), 0)
+        self.assertIsNone(leases.holder("system-log-retention"))
+
+    @override_settings(SYSTEM_LOG_RETENTION_CHUNK=1)
+    def test_lease_is_renewed_per_chunk(self):
+        with mock.patch.object(log_retention.leases, "acquire", wraps=leases.acquire) as acquire:
+            log_retention.prune(archive=False)
+        self.assertEqual(SystemLog.objects.count(), 0)
+        self.assertEqual(acquire.call_count, 1 + 3)
+
+    @override_settings(SYSTEM_LOG_RETENTION_CHUNK=1)
+    def test_prune_stops_when_the_lease_is_lost(self):
+        with mock.patch.object(log_retention.leases, "acquire", side_effect=[True, False]):
+            report = log_retention.prune(archive=False)
+        self.assertEqual(report["stopped"], "lease lost to another process")
+        self.assertEqual(SystemLog.objects.count(), 2)
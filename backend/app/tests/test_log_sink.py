@@ -0,0 +1,30 @@
+import threading
+
+from django.test import TransactionTestCase, override_settings
+
+from app.log_sink import SystemLogSink
+from app.models import SystemLog
+
+
+class SinkCounterTests(TransactionTestCase):
+    @override_settings(SYSTEM_LOG_BUFFERED=True, SYSTEM_LOG_QUEUE_SIZE=50, SYSTEM_LOG_BLOCK_TIMEOUT=0.001,
+                       SYSTEM_LOG_BATCH_SIZE=25, SYSTEM_LOG_FLUSH_INTERVAL=0.01)
+    def test_counters_add_up_under_concurrent_emitters(self):
+        sink = SystemLogSink()
+        threads, per_thread = 8, 300
+
+        def produce(n):
+            for i in range(per_thread):
+                sink.emit("test", "info", f"{n}-{i}")
+
+        workers = [threading.Thread(target=produce, args=(n,)) for n in range(threads)]
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        self.assertTrue(sink.flush(timeout=10))
+
+        stats = sink.stats()
+        self.assertEqual(stats["enqueued"] + stats["dropped"], threads * per_thread)
+        self.assertEqual(stats["written"], stats["enqueued"])
+        self.assertEqual(SystemLog.objects.filter(source="test").count(), stats["written"])
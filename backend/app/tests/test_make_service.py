@@ -0,0 +1,77 @@
+import socket
+import time
+
+from django.test import SimpleTestCase, override_settings
+
+from app.services import make_service
+
+from .stubs import StubServer, WebhookHandler
+
+
+def _closed_port_url() -> str:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{s.getsockname()[1]}/hook"
+
+
+@override_settings(MAKE_WEBHOOK_RETRIES=2, MAKE_WEBHOOK_BACKOFF=0, MAKE_WEBHOOK_BATCH_WINDOW=0, MAKE_BREAKER_FAILURES=50)
+class DispatcherRetryTests(SimpleTestCase):
+    def setUp(self):
+        make_service._breakers.clear()
+        WebhookHandler.statuses = []
+        WebhookHandler.delay = 0.0
+
+    def _call(self, url, **kwargs):
+        return make_service.trigger_make_webhook(webhook_url=url, payload={"agent_id": 1}, **kwargs)
+
+    def test_unavailable_and_rate_limited_are_retried(self):
+        WebhookHandler.statuses = [503, 429]
+        with StubServer(WebhookHandler) as stub:
+            result = self._call(stub.url)
+        self.assertEqual((result["ok"], result["attempts"], len(stub.calls)), (True, 3, 3))
+
+    def test_other_errors_are_sent_once(self):
+        for status in (500, 502, 400):
+            WebhookHandler.statuses = [status]
+            with StubServer(WebhookHandler) as stub:
+                result = self._call(stub.url)
+            self.assertEqual((result["attempts"], result["retryable"], len(stub.calls)), (1, False, 1), status)
+
+    def test_read_timeout_is_never_resent(self):
+        WebhookHandler.delay = 0.5
+        with StubServer(WebhookHandler) as stub:
+            result = self._call(stub.url, timeout=0.1)
+        self.assertEqual((result["ok"], result["attempts"], result["retryable"]), (False, 1, False))
+        self.assertEqual(len(stub.calls), 1)
+
+    def test_connection_refused_is_retried(self):
+        result = self._call(_closed_port_url())
+        self.assertEqual((result["attempts"], result["retryable"]), (3, True))
+
+    def test_caller_can_own_the_retries(self):
+        WebhookHandler.statuses = [503, 503]
+        with StubServer(WebhookHandler) as stub:
+            result = self._call(stub.url, retries=0)
+        self.assertEqual((result["attempts"], result["retryable"], len(stub.calls)), (1, True, 1))
+
+
+@override_settings(MAKE_WEBHOOK_RETRIES=0, MAKE_WEBHOOK_BATCH_MAX=2)
+class BatcherTests(SimpleTestCase):
+    def setUp(self):
+        make_service._breakers.clear()
+        WebhookHandler.statuses = []
+        WebhookHandler.delay = 0.0
+
+    def test_full_batch_cancels_its_timer(self):
+        batcher = make_service._Batcher()
+        with StubServer(WebhookHandler) as stub:
+            futures = [batcher.submit(stub.url, {"n": i}, 5, 0.5) for i in range(2)]
+            self.assertEqual([f.result(2)["batched"] for f in futures], [2, 2])
+            time.sleep(0.3)
+            # the first batch's timer would fire 0.2 s into this batch's window
+            late = batcher.submit(stub.url, {"n": 2}, 5, 0.5)
+            time.sleep(0.35)
+            self.assertFalse(late.done())
+            self.assertEqual(late.result(2)["batched"], 1)
+        self.assertEqual(len(stub.calls), 2)
+        self.assertEqual(stub.calls[0]["body"], {"runs": [{"n": 0}, {"n": 1}]})
@@ -0,0 +1,67 @@
+from datetime import timedelta
+from importlib import import_module
+
+from django.apps import apps
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from django.utils import timezone
+
+from app.models import Agent, RunLog, RunRollup
+from app.rollups import rebuild_rollups, record_run
+
+backfill = import_module("app.migrations.0008_backfill_run_rollups").backfill
+
+
+class RollupTests(TestCase):
+    def setUp(self):
+        self.agent = Agent.objects.create(name="a", role="r", goal="g")
+        now = timezone.now()
+        self.runs = [
+            RunLog.objects.create(agent=self.agent, status="success", message="", started_at=now, ended_at=now),
+            RunLog.objects.create(agent=self.agent, status="success", message="", started_at=now, ended_at=now),
+            RunLog.objects.create(agent=None, status="failed", message="", started_at=now - timedelta(days=1), ended_at=now),
+        ]
+
+    def _counts(self):
+        return sorted(RunRollup.objects.values_list("agent_id", "status", "count"), key=str)
+
+    def test_migration_backfills_existing_history(self):
+        backfill(apps, None)
+        self.assertEqual(self._counts(), sorted([(self.agent.id, "success", 2), (None, "failed", 1)], key=str))
+
+    def test_migration_leaves_populated_table_alone(self):
+        record_run(self.runs[0])
+        backfill(apps, None)
+        self.assertEqual(self._counts(), [(self.agent.id, "success", 1)])
+
+    def test_record_run_matches_rebuild(self):
+        for run in self.runs:
+            record_run(run)
+        incremental = self._counts()
+        rebuild_rollups()
+        self.assertEqual(self._counts(), incremental)
+
+    def test_deleted_agents_share_one_agentless_bucket(self):
+        RunLog.objects.all().delete()
+        other = Agent.objects.create(name="b", role="r", goal="g")
+        now = timezone.now()
+        runs = [
+            RunLog.objects.create(agent=self.agent, status="success", message="", started_at=now, ended_at=now),
+            RunLog.objects.create(agent=self.agent, status="success", message="", started_at=now, ended_at=now),
+            RunLog.objects.create(agent=other, status="success", message="", started_at=now, ended_at=now),
+        ]
+        for run in runs:
+            record_run(run)
+        Agent.objects.filter(id__in=[self.agent.id, other.id]).delete()
+        record_run(RunLog.objects.create(agent=None, status="success", message="", started_at=now, ended_at=now))
+
+        self.assertEqual(self._counts(), [(None, "success", 4)])
+        self.assertEqual(sum(RunRollup.objects.values_list("count", flat=True)), 4)
+        rebuild_rollups()
+        self.assertEqual(self._counts(), [(None, "success", 4)])
+
+    def test_agentless_bucket_is_unique(self):
+        today = timezone.localdate()
+        RunRollup.objects.create(day=today, agent=None, status="failed", count=1)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            RunRollup.objects.create(day=today, agent=None, status="failed", count=1)
@@ -0,0 +1,69 @@
+from django.test import TestCase, override_settings
+
+from app.models import Agent, RunJob
+from app.run_queue import RunQueue
+from app.services import make_service
+
+from .stubs import StubServer, WebhookHandler
+
+
+@override_settings(
+    SYSTEM_LOG_BUFFERED=False,
+    RUN_QUEUE_AUTOSTART=False,
+    RUN_QUEUE_MAX_ATTEMPTS=3,
+    RUN_QUEUE_RETRY_BACKOFF=0,
+    MAKE_WEBHOOK_RETRIES=0,
+    MAKE_WEBHOOK_BATCH_WINDOW=0,
+)
+class RunQueueRetryTests(TestCase):
+    def setUp(self):
+        make_service._breakers.clear()
+        WebhookHandler.statuses = []
+        self.agent = Agent.objects.create(name="a", sandbox=False)
+        self.queue = RunQueue()
+        self.queue._token = "test-worker"
+
+    def _attempt(self) -> RunJob:
+        job = self.queue._claim()
+        self.assertIsNotNone(job)
+        self.queue._process(job)
+        job.refresh_from_db()
+        return job
+
+    def test_enqueue_does_not_start_workers_by_default(self):
+        self.queue.enqueue(self.agent)
+        self.assertFalse(self.queue.started)
+
+    def test_missing_webhook_url_fails_at_once(self):
+        self.queue.enqueue(self.agent)
+        with override_settings(MAKE_WEBHOOK_URL=""):
+            job = self._attempt()
+        self.assertEqual((job.status, job.attempts), ("failed", 1))
+        self.assertIn("not configured", job.last_error)
+        self.assertIsNotNone(job.run)
+
+    def test_client_error_fails_at_once(self):
+        WebhookHandler.statuses = [404]
+        self.queue.enqueue(self.agent)
+        with StubServer(WebhookHandler) as stub, override_settings(MAKE_WEBHOOK_URL=stub.url):
+            job = self._attempt()
+        self.assertEqual((job.status, job.attempts, len(stub.calls)), ("failed", 1, 1))
+
+    def test_open_circuit_fails_at_once(self):
+        self.queue.enqueue(self.agent)
+        with StubServer(WebhookHandler) as stub, override_settings(MAKE_WEBHOOK_URL=stub.url, MAKE_BREAKER_FAILURES=1):
+            make_service._breaker_for(stub.url).record(False)
+            job = self._attempt()
+        self.assertEqual((job.status, job.attempts, len(stub.calls)), ("failed", 1, 0))
+
+    def test_unavailable_is_retried_until_it_succeeds(self):
+        WebhookHandler.statuses = [503, 429]
+        self.queue.enqueue(self.agent)
+        with StubServer(WebhookHandler) as stub, override_settings(MAKE_WEBHOOK_URL=stub.url):
+            self.assertEqual(self._attempt().status, "queued")
+            self.assertEqual(self._attempt().status, "queued")
+            job = self._attempt()
+        self.assertEqual((job.status, job.attempts, len(stub.calls)), ("done", 3, 3))
+        self.assertEqual(job.run.status, "success")
+        stats = self.queue.stats()
+        self.assertEqual((stats["processed"], stats["retried"], stats["failed"]), (1, 2, 0))
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.test import TestCase, override_settings
+
+from app import leases
+from app.services.scheduler_service import AgentScheduler, compile_cron
+
+# Wednesday 2026-10-14 12:00 UTC
+WEDNESDAY = datetime(2026, 10, 14, 12, 0, tzinfo=dt_timezone.utc)
+
+
+@override_settings(TIME_ZONE="UTC")
+class CompileCronTests(TestCase):
+    def _next(self, expr, after=WEDNESDAY):
+        return compile_cron(expr).get_next_fire_time(None, after)
+
+    def test_crontab_weekday_numbers(self):
+        self.assertEqual(self._next("0 9 * * 1").strftime("%a %Y-%m-%d %H:%M"), "Mon 2026-10-19 09:00")
+        self.assertEqual(self._next("0 9 * * 0").strftime("%a %Y-%m-%d"), "Sun 2026-10-18")
+        self.assertEqual(self._next("0 9 * * 7").strftime("%a %Y-%m-%d"), "Sun 2026-10-18")
+
+    def test_weekday_ranges_lists_and_names(self):
+        fires = []
+        after = WEDNESDAY
+        for _ in range(4):
+            after = self._next("0 9 * * 5-7", after + timedelta(seconds=1))
+            fires.append(after.strftime("%a"))
+        self.assertEqual(fires, ["Fri", "Sat", "Sun", "Fri"])
+        self.assertEqual(self._next("0 9 * * sun,mon").strftime("%a"), "Sun")
+        self.assertEqual(self._next("0 9 * * */3").strftime("%a"), "Sat")  # 0,3,6 = Sun, Wed, Sat
+
+    def test_invalid_expressions(self):
+        for expr in ("0 9 * *", "0 9 * * 8", "0 9 * * 5-2", "0 9 * * fri/0"):
+            with self.assertRaises(ValueError, msg=expr):
+                compile_cron(expr)
+
+
+class LeaseTests(TestCase):
+    def test_one_holder_at_a_time(self):
+        self.assertTrue(leases.acquire("job", "a", 30))
+        self.assertFalse(leases.acquire("job", "b", 30))
+        self.assertTrue(leases.acquire("job", "a", 30))  # renew
+        leases.release("job", "a")
+        self.assertTrue(leases.acquire("job", "b", 30))
+        self.assertEqual(leases.holder("job"), "b")
+
+    def test_expired_lease_can_be_taken(self):
+        self.assertTrue(leases.acquire("job", "a", -1))
+        self.assertTrue(leases.acquire("job", "b", 30))
+
+    @override_settings(SCHEDULER_LEASE_SECONDS=30)
+    def test_only_one_scheduler_leads(self):
+        first, second = AgentScheduler(), AgentScheduler()
+        self.assertTrue(first._hold_lease())
+        self.assertFalse(second._hold_lease())
+        self.assertTrue(first.leader)
+        first.stop()
+        self.assertFalse(first.leader)
+        second._lease_checked -= 10  # a third of the lease has passed
+        self.assertTrue(second._hold_lease())
+
+    @override_settings(SCHEDULER_LEASE_SECONDS=30)
+    def test_followers_retry_at_the_renewal_rate(self):
+        first, second = AgentScheduler(), AgentScheduler()
+        first._hold_lease()
+        self.assertFalse(second._hold_lease())
+        with self.assertNumQueries(0):
+            self.assertFalse(second._hold_lease())  # next tick: no write attempt
+            self.assertTrue(first._hold_lease())
@@ -0,0 +1,60 @@
+from django.db import connection
+from django.db.models import F
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from app import views
+from app.models import AppSetting
+
+from .stubs import GroqHandler, StubServer
+
+
+def _appsetting_queries(ctx: CaptureQueriesContext) -> list[str]:
+    table = AppSetting._meta.db_table
+    return [q["sql"] for q in ctx.captured_queries if table in q["sql"]]
+
+
+@override_settings(SYSTEM_LOG_BUFFERED=False, CHAT_CACHE_ENABLED=False, APP_SETTINGS_RECHECK_SECONDS=60)
+class SettingsCacheQueryTests(TestCase):
+    def setUp(self):
+        views._settings_cache.update(obj=None, checked_at=0.0)
+        self.client = Client(SERVER_NAME="localhost")
+
+    def test_warm_cache_makes_no_queries(self):
+        views.get_or_create_settings()
+        with self.assertNumQueries(0):
+            views.get_or_create_settings()
+
+    def test_chat_paths_skip_appsetting_once_warm(self):
+        with StubServer(GroqHandler) as stub, override_settings(GROQ_API_BASE=stub.url, ENV_GROQ_API_KEY="k"):
+            views.get_or_create_settings()
+            with CaptureQueriesContext(connection) as ctx:
+                chat = self.client.post("/api/chat", {"message": "hi"}, content_type="application/json")
+                stream = self.client.post("/api/chat/stream", {"message": "hi"}, content_type="application/json")
+                body = b"".join(stream.streaming_content)
+        self.assertEqual(chat.json()["reply"], "Hello")
+        self.assertIn(b"data: Hel\n\ndata: lo\n\n", body)
+        self.assertTrue(ctx.captured_queries)  # the views did hit the DB (SystemLog writes)
+        self.assertEqual(_appsetting_queries(ctx), [])
+
+    def test_version_bump_from_another_worker_is_picked_up(self):
+        s = views.get_or_create_settings()
+        # another process saves: only the row (and its version) changes
+        AppSetting.objects.filter(id=s.id).update(groq_model="llama-3.1-8b-instant", version=F("version") + 1)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(views.get_or_create_settings().groq_model, s.groq_model)  # inside the recheck window
+
+        with override_settings(APP_SETTINGS_RECHECK_SECONDS=0):
+            with self.assertNumQueries(2):  # version probe + reload
+                fresh = views.get_or_create_settings()
+            self.assertEqual(fresh.groq_model, "llama-3.1-8b-instant")
+            with self.assertNumQueries(1):  # unchanged version: probe only
+                views.get_or_create_settings()
+
+    def test_local_save_bumps_version(self):
+        s = views.get_or_create_settings()
+        before = s.version
+        s.groq_model = "llama-3.1-8b-instant"
+        s.save()
+        self.assertEqual(s.version, before + 1)
@@ -0,0 +1,22 @@
+from unittest import mock
+
+from django.test import Client, TestCase, override_settings
+
+from app import live_events, views
+from app.models import Agent, RunLog
+
+
+@override_settings(SYSTEM_LOG_BUFFERED=False)
+class MakeRunStatusWebhookTests(TestCase):
+    def test_run_status_is_recorded_and_pushed_to_live_clients(self):
+        agent = Agent.objects.create(name="a")
+        # the SystemLog line nudges on its own once the sink writes it; the RunLog must not wait for that
+        with mock.patch.object(live_events.hub, "nudge") as nudge, mock.patch.object(views, "log_system"):
+            resp = Client(SERVER_NAME="localhost").post(
+                "/api/webhooks/make/run-status",
+                {"agent_id": agent.id, "status": "failed", "message": "boom"},
+                content_type="application/json",
+            )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(RunLog.objects.get().status, "failed")
+        nudge.assert_called_once_with()
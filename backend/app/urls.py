@@ -1,14 +1,23 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# Async chat views only stream properly under core.asgi.application.
+chat_view = views.chat_async if settings.ASYNC_CHAT_VIEWS else views.chat
+chat_stream_view = views.chat_stream_async if settings.ASYNC_CHAT_VIEWS else views.chat_stream
+events_view = views.events_stream_async if settings.ASYNC_EVENT_VIEWS else views.events_stream
+
 urlpatterns = [
     path("health", views.health, name="health"),
+    path("metrics", views.metrics, name="metrics"),
+    path("metrics/prometheus", views.metrics_prometheus, name="metrics_prometheus"),
     path("models/catalog", views.models_catalog, name="models_catalog"),
     path("settings", views.get_settings, name="get_settings"),
     path("settings/groq-key", views.save_groq_settings, name="save_groq_settings"),
-    path("chat", views.chat, name="chat"),
-    path("chat/stream", views.chat_stream, name="chat_stream"),
+    path("chat", chat_view, name="chat"),
+    path("chat/stream", chat_stream_view, name="chat_stream"),
     path("stt", views.stt, name="stt"),
+    path("stt/stream", views.stt_stream, name="stt_stream"),
     path("setup/openclaw", views.setup_openclaw_view, name="setup_openclaw_view"),
 
     path("agents", views.agents, name="agents"),
@@ -16,15 +25,22 @@ urlpatterns = [
     path("agents/create-from-template", views.create_agent_from_template, name="create_agent_from_template"),
     path("agents/create-from-chat", views.create_agent_from_chat, name="create_agent_from_chat"),
     path("agents/<int:agent_id>/run-now", views.run_agent_now, name="run_agent_now"),
+    path("run-jobs/<int:job_id>", views.run_job_status, name="run_job_status"),
     path("agents/<int:agent_id>/toggle-active", views.toggle_agent_active, name="toggle_agent_active"),
     path("agents/<int:agent_id>/toggle-sandbox", views.toggle_agent_sandbox, name="toggle_agent_sandbox"),
+    path("agents/bulk/create", views.bulk_create_agents, name="bulk_create_agents"),
+    path("agents/bulk/update", views.bulk_update_agents, name="bulk_update_agents"),
+    path("agents/bulk/toggle", views.bulk_toggle_agents, name="bulk_toggle_agents"),
+    path("agents/bulk/run-now", views.bulk_run_agents, name="bulk_run_agents"),
 
     path("runs", views.runs, name="runs"),
     path("system-logs", views.system_logs, name="system_logs"),
+    path("events", events_view, name="events_stream"),
     path("analytics/summary", views.analytics_summary, name="analytics_summary"),
 
     path("news/search", views.news_search, name="news_search"),
     path("crawl/extract", views.crawl_extract_view, name="crawl_extract_view"),
+    path("crawl/batch", views.crawl_batch_view, name="crawl_batch_view"),
 
     path("webhooks/make/run-status", views.webhook_make_run_status, name="webhook_make_run_status"),
 ]
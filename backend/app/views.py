@@ -1,39 +1,68 @@
 from __future__ import annotations
 from datetime import timedelta
-from typing import Any
+from typing import Any, Callable
+import hashlib
+import json
+import threading
+import time
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.db.models import Count
-from django.http import StreamingHttpResponse
+from django.db.models import Count, Max, Subquery, Sum
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
 
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
 
-from .models import AppSetting, Agent, RunLog, SystemLog
-from .serializers import AppSettingSerializer, AgentSerializer, RunLogSerializer, SystemLogSerializer
+from . import bulk_agents, fast_rows, live_events
+from .conditional import conditional_json, conditional_stats
+from .log_retention import retention_stats
+from .log_sink import sink as log_sink
+from .models import AppSetting, Agent, RunJob, RunLog, RunRollup, SystemLog
+from .pagination import keyset_page
+from .rollups import record_run
+from .run_queue import queue as run_queue
+from .runs import execute_agent_run
+from .serializers import AppSettingSerializer, AgentSerializer, RunJobSerializer, RunLogSerializer, SystemLogSerializer
 from .services.groq_client import (
     MODEL_CATALOG,
     ChatMessage,
-    chat_completion,
+    astream_completion,
     stream_completion,
     validate_model,
 )
-from .services.stt_service import transcribe_audio_bytes as transcribe_audio
+from .services import completion_cache, llm_telemetry
+from .services.completion_cache import acached_chat_completion, cached_chat_completion
+from .services.stt_service import iter_transcript, stt_cache_stats, transcribe_upload
 
-from .services.news_service import fetch_news, crawl_extract
-from .services.make_service import trigger_make_webhook
-from .services.scheduler_service import sync_scheduler_stub
+from .services.news_service import fetch_news_detailed, crawl_extract, crawl_many
+from .services.scheduler_service import agents_changed, scheduler, sync_scheduler
 from .services.openclaw_bridge import setup_openclaw
 from .services.agent_translator import prompt_to_agent_payload
+from .services.crawl_cache import crawl_cache_stats
+from .services.feed_cache import feed_cache_stats
+from .services.http_transport import transport_stats
+from .services.make_service import dispatcher_stats
+from .services.news_index import index as news_index
+from .services.model_capabilities import capability_snapshot
 
 
 def log_system(source: str, level: str, message: str) -> None:
-    SystemLog.objects.create(source=source, level=level, message=message[:5000])
+    log_sink.emit(source, level, message[:5000])
 
 
-def get_or_create_settings() -> AppSetting:
+# Per-process AppSetting cache. Writes in this process replace the cached
+# row immediately; writes from other workers are noticed by a one-column
+# version probe at most every APP_SETTINGS_RECHECK_SECONDS.
+_settings_cache: dict[str, Any] = {"obj": None, "checked_at": 0.0}
+_settings_lock = threading.Lock()
+
+
+def _load_settings() -> AppSetting:
     obj = AppSetting.objects.first()
     if not obj:
         obj = AppSetting.objects.create(
@@ -44,6 +73,27 @@ def get_or_create_settings() -> AppSetting:
     return obj
 
 
+def _cache_settings(obj: AppSetting) -> None:
+    with _settings_lock:
+        _settings_cache["obj"] = obj
+        _settings_cache["checked_at"] = time.monotonic()
+
+
+def get_or_create_settings() -> AppSetting:
+    cached = _settings_cache["obj"]
+    if cached is not None:
+        if time.monotonic() - _settings_cache["checked_at"] < settings.APP_SETTINGS_RECHECK_SECONDS:
+            return cached
+        current = AppSetting.objects.filter(id=cached.id).values_list("version", flat=True).first()
+        if current == cached.version:
+            _cache_settings(cached)
+            return cached
+
+    obj = _load_settings()
+    _cache_settings(obj)
+    return obj
+
+
 def resolve_api_key(app_setting: AppSetting) -> str:
     return (app_setting.groq_api_key or settings.ENV_GROQ_API_KEY or "").strip()
 
@@ -84,16 +134,79 @@ AGENT_TEMPLATES: list[dict[str, Any]] = [
 ]
 
 
+# Validators for @conditional_json: cheap strings that change whenever the
+# endpoint's payload would, computed without building the payload.
+def _static_validator(name: str, payload: Any) -> Callable[[Any], str]:
+    digest = hashlib.blake2b(json.dumps(payload, sort_keys=True).encode("utf-8"), digest_size=8).hexdigest()
+    return lambda _request: f"{name}:{digest}"
+
+
+def _settings_validator(_request) -> str:
+    s = get_or_create_settings()  # per-process cache; at most one version probe
+    return f"settings:{s.id}:{s.version}"
+
+
+def _agents_validator(_request) -> str:
+    # updated_at is bumped by every write path, bulk ones included; the count catches deletes
+    agg = Agent.objects.aggregate(m=Max("updated_at"), n=Count("id"))
+    return f"agents:{agg['m'] and agg['m'].isoformat()}:{agg['n']}"
+
+
+def _analytics_validator(request) -> str:
+    days, start, now = _analytics_window(request)
+    newest_agent = Agent.objects.order_by("-updated_at").values("updated_at")[:1]
+    agg = RunRollup.objects.filter(day__gte=start.date(), day__lte=now.date()).aggregate(
+        m=Max("updated_at"), s=Sum("count"), n=Count("id"),
+        # top_agents shows names, so renames count too; folded into the same query
+        a=Max(Subquery(newest_agent)),
+    )
+    # the llm block changes with every chat call; follow it in coarse slots instead
+    llm = llm_telemetry.changed_slot(float(getattr(settings, "ANALYTICS_LLM_ETAG_SECONDS", 30)))
+    return (
+        f"analytics:{days}:{now.date()}:{agg['m'] and agg['m'].isoformat()}:{agg['s']}:{agg['n']}:{agg['a']}"
+        f":{llm}"
+    )
+
+
 @api_view(["GET"])
 def health(_request):
     return Response({"ok": True, "service": "personaliz-backend", "time": timezone.now().isoformat()})
 
 
+@api_view(["GET"])
+def metrics(_request):
+    return Response({
+        "upstream": transport_stats(),
+        "model_capabilities": capability_snapshot(),
+        "chat_cache": completion_cache.cache_stats(),
+        "system_log_sink": log_sink.stats(),
+        "system_log_retention": retention_stats(),
+        "live_events": live_events.hub.stats(),
+        "feed_cache": feed_cache_stats(),
+        "news_index": news_index.stats(),
+        "crawl_cache": crawl_cache_stats(),
+        "stt_cache": stt_cache_stats(),
+        "scheduler": scheduler.stats(),
+        "run_queue": run_queue.stats(),
+        "make_webhook": dispatcher_stats(),
+        "conditional_get": conditional_stats(),
+        "llm_telemetry": llm_telemetry.telemetry_stats(),
+    })
+
+
+@require_GET
+def metrics_prometheus(_request):
+    # plain Django view: scrapers send Accept headers DRF's content negotiation would 406
+    return HttpResponse(llm_telemetry.render_prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@conditional_json(_static_validator("catalog", MODEL_CATALOG))
 @api_view(["GET"])
 def models_catalog(_request):
     return Response({"catalog": MODEL_CATALOG})
 
 
+@conditional_json(_settings_validator)
 @api_view(["GET"])
 def get_settings(_request):
     s = get_or_create_settings()
@@ -102,7 +215,8 @@ def get_settings(_request):
 
 @api_view(["POST"])
 def save_groq_settings(request):
-    s = get_or_create_settings()
+    # edit a fresh copy; the cached instance is shared across request threads
+    s = _load_settings()
     body = request.data or {}
 
     incoming_key = (
@@ -126,6 +240,7 @@ def save_groq_settings(request):
     s.groq_model = incoming_model
     s.sandbox_default = bool(sandbox_default)
     s.save()
+    _cache_settings(s)
 
     log_system("settings", "info", "Groq settings updated.")
     return Response({"ok": True, "settings": AppSettingSerializer(s).data})
@@ -150,17 +265,17 @@ def chat(request):
         return Response({"ok": False, "error": "message is required"}, status=status.HTTP_400_BAD_REQUEST)
 
     try:
-        messages: list[ChatMessage] = []
-        for h in history:
-            role = str(h.get("role", "user"))
-            content = str(h.get("content", ""))
-            if content:
-                messages.append(ChatMessage(role=role, content=content))
-        messages.append(ChatMessage(role="user", content=user_message))
-
-        answer = chat_completion(api_key=api_key, model=s.groq_model, messages=messages)
-        log_system("chat", "info", "Chat completion success.")
-        return Response({"ok": True, "reply": answer})
+        # same builder as every other chat path, so all of them share completion_cache keys
+        messages = _history_messages(history, user_message)
+
+        answer, cached = cached_chat_completion(
+            api_key=api_key,
+            model=s.groq_model,
+            messages=messages,
+            bypass=_cache_bypass(request, body),
+        )
+        log_system("chat", "info", "Chat completion served from cache." if cached else "Chat completion success.")
+        return Response({"ok": True, "reply": answer, "cached": cached})
     except Exception as exc:
         log_system("chat", "error", f"Chat completion failed: {exc}")
         return Response({"ok": False, "error": f"Chat failed: {exc}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -206,28 +321,26 @@ def chat_stream(request):
         # don't hard-fail if validator import/logic differs
         pass
 
-    def _sanitize_sse_data(value: str) -> str:
-        # keep one SSE event per line payload
-        return value.replace("\r", " ").replace("\n", " ")
+    bypass_cache = _cache_bypass(request, body)
 
     def generate():
         # Optional: initial ping event to reduce perceived blank delay
         yield "event: ready\ndata: stream-started\n\n"
 
         try:
-            messages: list[ChatMessage] = []
-            if isinstance(history, list):
-                for h in history:
-                    if not isinstance(h, dict):
-                        continue
-                    role = str(h.get("role", "user")).strip() or "user"
-                    content = str(h.get("content", "")).strip()
-                    if content:
-                        messages.append(ChatMessage(role=role, content=content))
-
-            messages.append(ChatMessage(role="user", content=user_message))
-
-            token_count = 0
+            messages = _history_messages(history, user_message)
+
+            cache_key = completion_cache.make_key(model=model, messages=messages) if completion_cache.cache_enabled() else None
+            if cache_key:
+                cached = completion_cache.lookup(cache_key, bypass=bypass_cache)
+                if cached is not None:
+                    yield f"data: {_sanitize_sse_data(cached)}\n\n"
+                    yield "data: [DONE]\n\n"
+                    log_system("chat_stream", "info", "Stream served from cache.")
+                    return
+
+            chunk_count = 0
+            parts: list[str] = []
             for token in stream_completion(
                 api_key=api_key,
                 model=model,
@@ -237,10 +350,13 @@ def chat_stream(request):
                     continue
                 safe = _sanitize_sse_data(token)
                 yield f"data: {safe}\n\n"
-                token_count += 1
+                chunk_count += 1
+                parts.append(token)
 
             yield "data: [DONE]\n\n"
-            log_system("chat_stream", "info", f"Stream completed. tokens={token_count}")
+            if cache_key:
+                completion_cache.store(cache_key, "".join(parts).strip())
+            log_system("chat_stream", "info", f"Stream completed. chunks={chunk_count}")
 
         except Exception as exc:
             err = _sanitize_sse_data(str(exc))
@@ -248,13 +364,151 @@ def chat_stream(request):
             yield f"data: [ERROR] {err}\n\n"
             yield "data: [DONE]\n\n"
 
-    response = StreamingHttpResponse(generate(), content_type="text/event-stream; charset=utf-8")
+    return _sse_response(generate())
+
+
+def _sse_response(stream) -> StreamingHttpResponse:
+    response = StreamingHttpResponse(stream, content_type="text/event-stream; charset=utf-8")
     response["Cache-Control"] = "no-cache, no-transform"
     response["Connection"] = "keep-alive"
     response["X-Accel-Buffering"] = "no"
     return response
 
 
+def _sanitize_sse_data(value: str) -> str:
+    # keep one SSE event per line payload
+    return value.replace("\r", " ").replace("\n", " ")
+
+
+def _cache_bypass(request, body: dict[str, Any]) -> bool:
+    if str(body.get("cache", "")).strip().lower() in {"0", "false", "no", "off"}:
+        return True
+    return "no-cache" in request.headers.get("Cache-Control", "").lower()
+
+
+def _json_body(request) -> dict[str, Any]:
+    try:
+        body = json.loads(request.body or b"{}")
+    except ValueError:
+        return {}
+    return body if isinstance(body, dict) else {}
+
+
+def _history_messages(history: Any, user_message: str) -> list[ChatMessage]:
+    messages: list[ChatMessage] = []
+    if isinstance(history, list):
+        for h in history:
+            if not isinstance(h, dict):
+                continue
+            role = str(h.get("role", "user")).strip() or "user"
+            content = str(h.get("content", "")).strip()
+            if content:
+                messages.append(ChatMessage(role=role, content=content))
+    messages.append(ChatMessage(role="user", content=user_message))
+    return messages
+
+
+alog_system = sync_to_async(log_system)
+aget_or_create_settings = sync_to_async(get_or_create_settings)
+
+
+# ------------------------------------------------------------------------------
+# Async chat views (served by core.asgi.application when ASYNC_CHAT_VIEWS=1)
+# ------------------------------------------------------------------------------
+@csrf_exempt
+@require_POST
+async def chat_async(request):
+    s = await aget_or_create_settings()
+    api_key = resolve_api_key(s)
+    if not api_key:
+        await alog_system("chat", "warning", "Chat attempted without API key.")
+        return JsonResponse(
+            {"ok": False, "error": "Groq API key missing. Please save it in Settings."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    body = _json_body(request)
+    user_message = str(body.get("message", "")).strip()
+    if not user_message:
+        return JsonResponse({"ok": False, "error": "message is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        messages = _history_messages(body.get("history", []), user_message)
+        answer, cached = await acached_chat_completion(
+            api_key=api_key,
+            model=s.groq_model,
+            messages=messages,
+            bypass=_cache_bypass(request, body),
+        )
+        await alog_system("chat", "info", "Chat completion served from cache." if cached else "Chat completion success.")
+        return JsonResponse({"ok": True, "reply": answer, "cached": cached})
+    except Exception as exc:
+        await alog_system("chat", "error", f"Chat completion failed: {exc}")
+        return JsonResponse(
+            {"ok": False, "error": f"Chat failed: {exc}"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@csrf_exempt
+@require_POST
+async def chat_stream_async(request):
+    s = await aget_or_create_settings()
+    api_key = resolve_api_key(s)
+    body = _json_body(request)
+    user_message = str(body.get("message", "")).strip()
+
+    if not api_key:
+        return JsonResponse(
+            {"ok": False, "error": "Groq API key missing. Please save it in Settings."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if not user_message:
+        return JsonResponse({"ok": False, "error": "message is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+    model = (s.groq_model or "").strip()
+    if not model:
+        return JsonResponse({"ok": False, "error": "No model configured in settings."}, status=status.HTTP_400_BAD_REQUEST)
+    if not validate_model(model):
+        return JsonResponse({"ok": False, "error": f"Invalid model selected: {model}"}, status=status.HTTP_400_BAD_REQUEST)
+
+    messages = _history_messages(body.get("history", []), user_message)
+    bypass_cache = _cache_bypass(request, body)
+
+    async def generate():
+        yield "event: ready\ndata: stream-started\n\n"
+        try:
+            cache_key = completion_cache.make_key(model=model, messages=messages) if completion_cache.cache_enabled() else None
+            if cache_key:
+                cached = await completion_cache.alookup(cache_key, bypass=bypass_cache)
+                if cached is not None:
+                    yield f"data: {_sanitize_sse_data(cached)}\n\n"
+                    yield "data: [DONE]\n\n"
+                    await alog_system("chat_stream", "info", "Stream served from cache.")
+                    return
+
+            chunk_count = 0
+            parts: list[str] = []
+            async for token in astream_completion(api_key=api_key, model=model, messages=messages):
+                if not token:
+                    continue
+                yield f"data: {_sanitize_sse_data(token)}\n\n"
+                chunk_count += 1
+                parts.append(token)
+
+            yield "data: [DONE]\n\n"
+            if cache_key:
+                await completion_cache.astore(cache_key, "".join(parts).strip())
+            await alog_system("chat_stream", "info", f"Stream completed. chunks={chunk_count}")
+        except Exception as exc:
+            err = _sanitize_sse_data(str(exc))
+            await alog_system("chat_stream", "error", f"Stream failed: {err}")
+            yield f"data: [ERROR] {err}\n\n"
+            yield "data: [DONE]\n\n"
+
+    return _sse_response(generate())
+
+
 @api_view(["POST"])
 def stt(request):
     s = get_or_create_settings()
@@ -270,20 +524,60 @@ def stt(request):
     if not audio:
         return Response({"ok": False, "error": "Missing multipart file field: audio"}, status=status.HTTP_400_BAD_REQUEST)
 
+    language = str(request.data.get("language", "")).strip() or None
     try:
-        text = transcribe_audio(api_key=api_key, audio_file=audio.file, filename=audio.name or "audio.webm")
-        log_system("stt", "info", "STT success.")
-        return Response({"ok": True, "text": text})
+        text, cached = transcribe_upload(
+            api_key=api_key, upload=audio, language=language,
+            bypass_cache=_cache_bypass(request, request.data),
+        )
+        log_system("stt", "info", "STT served from cache." if cached else "STT success.")
+        return Response({"ok": True, "text": text, "cached": cached})
     except Exception as exc:
         log_system("stt", "error", f"STT failed: {exc}")
         return Response({"ok": False, "error": f"STT failed: {exc}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(["POST"])
+def stt_stream(request):
+    """Like /api/stt, but sends each stitched segment as an SSE "segment" event, then "done"."""
+    s = get_or_create_settings()
+    api_key = resolve_api_key(s)
+    if not api_key:
+        log_system("stt", "warning", "STT attempted without API key.")
+        return Response(
+            {"ok": False, "error": "Groq API key missing. Please save it in Settings."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    audio = request.FILES.get("audio")
+    if not audio:
+        return Response({"ok": False, "error": "Missing multipart file field: audio"}, status=status.HTTP_400_BAD_REQUEST)
+    language = str(request.data.get("language", "")).strip() or None
+    bypass_cache = _cache_bypass(request, request.data)
+
+    def generate():
+        transcript = ""
+        segments = 0
+        try:
+            for event in iter_transcript(api_key=api_key, upload=audio, language=language, bypass_cache=bypass_cache):
+                transcript = event["transcript"]
+                segments += 1
+                yield f"event: segment\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+            yield f"event: done\ndata: {json.dumps({'ok': True, 'text': transcript}, ensure_ascii=False)}\n\n"
+            log_system("stt", "info", f"STT stream success. segments={segments}")
+        except Exception as exc:
+            log_system("stt", "error", f"STT stream failed after {segments} segments: {exc}")
+            payload = {"ok": False, "error": f"STT failed: {exc}", "text": transcript}
+            yield f"event: done\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+    return _sse_response(generate())
+
+
 @api_view(["POST"])
 def setup_openclaw_view(_request):
     try:
         result = setup_openclaw(settings.OPENCLAW_BIN)
-        sched = sync_scheduler_stub()
+        sched = sync_scheduler()
         level = "info" if result.get("ok") else "warning"
         log_system("setup_openclaw", level, result.get("message", "setup executed"))
         return Response({"ok": bool(result.get("ok")), "openclaw": result, "scheduler": sched})
@@ -292,20 +586,25 @@ def setup_openclaw_view(_request):
         return Response({"ok": False, "error": str(exc)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@conditional_json(_agents_validator)
 @api_view(["GET", "POST"])
 def agents(request):
     if request.method == "GET":
         qs = Agent.objects.all().order_by("-updated_at")
+        if getattr(settings, "LIST_FAST_PATH", True):
+            return fast_rows.json_response({"items": fast_rows.agent_rows(qs.values(*fast_rows.AGENT_COLUMNS))})
         return Response({"items": AgentSerializer(qs, many=True).data})
 
     serializer = AgentSerializer(data=request.data)
     if serializer.is_valid():
         agent = serializer.save()
+        agents_changed()
         log_system("agents", "info", f"Agent created: {agent.name}")
         return Response({"ok": True, "item": AgentSerializer(agent).data}, status=status.HTTP_201_CREATED)
     return Response({"ok": False, "errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
 
 
+@conditional_json(_static_validator("templates", AGENT_TEMPLATES))
 @api_view(["GET"])
 def agent_templates(_request):
     return Response({"items": AGENT_TEMPLATES})
@@ -328,6 +627,7 @@ def create_agent_from_template(request):
         active=True,
         sandbox=s.sandbox_default,
     )
+    agents_changed()
     log_system("agents", "info", f"Agent created from template: {key}")
     return Response({"ok": True, "item": AgentSerializer(agent).data}, status=status.HTTP_201_CREATED)
 
@@ -345,6 +645,7 @@ def create_agent_from_chat(request):
     serializer = AgentSerializer(data=payload)
     if serializer.is_valid():
         agent = serializer.save()
+        agents_changed()
         log_system("agents", "info", f"Agent created from chat: {agent.id}")
         return Response({"ok": True, "item": AgentSerializer(agent).data}, status=status.HTTP_201_CREATED)
     return Response({"ok": False, "errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
@@ -357,47 +658,26 @@ def run_agent_now(request, agent_id: int):
     except Agent.DoesNotExist:
         return Response({"ok": False, "error": "Agent not found"}, status=status.HTTP_404_NOT_FOUND)
 
-    start = timezone.now()
-    run_status = "sandboxed" if agent.sandbox else "success"
-    msg = "Sandbox run (no external action)." if agent.sandbox else "Triggered."
-
-    result_payload: dict[str, Any] = {}
-    if not agent.sandbox:
-        payload = {
-            "agent_id": agent.id,
-            "name": agent.name,
-            "role": agent.role,
-            "goal": agent.goal,
-            "action_type": agent.action_type,
-            "schedule_cron": agent.schedule_cron,
-        }
-        result_payload = trigger_make_webhook(
-            webhook_url=settings.MAKE_WEBHOOK_URL,
-            payload=payload,
-        )
-        if not result_payload.get("ok"):
-            run_status = "failed"
-            msg = result_payload.get("error") or "Webhook failed"
-        else:
-            msg = f"Webhook status {result_payload.get('status_code')}"
+    if str(request.query_params.get("wait", "")).lower() in {"1", "true", "yes"}:
+        # legacy synchronous behaviour: run inline and return the RunLog
+        run, result_payload = execute_agent_run(agent)
+        return Response({
+            "ok": True,
+            "run": RunLogSerializer(run).data,
+            "webhook": result_payload,
+        })
 
-    end = timezone.now()
-    run = RunLog.objects.create(
-        agent=agent,
-        status=run_status,
-        message=msg,
-        started_at=start,
-        ended_at=end,
-    )
+    job = run_queue.enqueue(agent)
+    log_system("run_now", "info", f"Agent {agent.id} run queued as job {job.id}")
+    return Response({"ok": True, "job": RunJobSerializer(job).data}, status=status.HTTP_202_ACCEPTED)
 
-    level = "info" if run_status in ("success", "sandboxed") else "error"
-    log_system("run_now", level, f"Agent {agent.id} run -> {run_status}: {msg}")
 
-    return Response({
-        "ok": True,
-        "run": RunLogSerializer(run).data,
-        "webhook": result_payload,
-    })
+@api_view(["GET"])
+def run_job_status(_request, job_id: int):
+    job = RunJob.objects.select_related("run__agent").filter(id=job_id).first()
+    if job is None:
+        return Response({"ok": False, "error": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
+    return Response({"ok": True, "item": RunJobSerializer(job).data})
 
 
 @api_view(["POST"])
@@ -409,6 +689,7 @@ def toggle_agent_active(_request, agent_id: int):
 
     agent.active = not agent.active
     agent.save(update_fields=["active", "updated_at"])
+    agents_changed()
     log_system("agents", "info", f"Agent {agent.id} active={agent.active}")
     return Response({"ok": True, "item": AgentSerializer(agent).data})
 
@@ -426,35 +707,203 @@ def toggle_agent_sandbox(_request, agent_id: int):
     return Response({"ok": True, "item": AgentSerializer(agent).data})
 
 
-@api_view(["GET"])
-def runs(_request):
-    qs = RunLog.objects.select_related("agent").all().order_by("-started_at")[:200]
-    return Response({"items": RunLogSerializer(qs, many=True).data})
+def _bulk_list(request, key: str):
+    """Return the request's `key` list, or an error Response when missing or too long."""
+    items = (request.data or {}).get(key)
+    limit = int(getattr(settings, "AGENT_BULK_MAX_ITEMS", 1000))
+    if not isinstance(items, list) or not items:
+        return Response({"ok": False, "error": f"{key} must be a non-empty list"}, status=status.HTTP_400_BAD_REQUEST)
+    if len(items) > limit:
+        return Response({"ok": False, "error": f"At most {limit} {key} per request"}, status=status.HTTP_400_BAD_REQUEST)
+    return items
+
+
+def _bulk_response(results: list[dict[str, Any]], http_status: int = status.HTTP_200_OK) -> Response:
+    succeeded = sum(1 for r in results if r["ok"])
+    return Response({
+        "ok": succeeded == len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results,
+    }, status=http_status)
+
+
+@api_view(["POST"])
+def bulk_create_agents(request):
+    items = _bulk_list(request, "items")
+    if isinstance(items, Response):
+        return items
+    atomic = bool((request.data or {}).get("atomic", False))
+    results = bulk_agents.bulk_create_agents(items, atomic=atomic)
+    created = sum(1 for r in results if r["ok"])
+    if created:
+        agents_changed()
+    log_system("agents", "info", f"Bulk create: {created} of {len(items)} agents created")
+    return _bulk_response(results, status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(["POST"])
+def bulk_update_agents(request):
+    items = _bulk_list(request, "items")
+    if isinstance(items, Response):
+        return items
+    results = bulk_agents.bulk_update_agents(items)
+    updated = sorted({r["id"] for r in results if r["ok"]})
+    if updated:
+        agents_changed()
+    log_system("agents", "info", f"Bulk update: {len(updated)} agents updated {updated[:50]}")
+    return _bulk_response(results)
+
+
+@api_view(["POST"])
+def bulk_toggle_agents(request):
+    ids = _bulk_list(request, "ids")
+    if isinstance(ids, Response):
+        return ids
+    field = str((request.data or {}).get("field", "active"))
+    value = (request.data or {}).get("value")
+    if value is not None and not isinstance(value, bool):
+        return Response({"ok": False, "error": "value must be true, false or omitted"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        results = bulk_agents.bulk_toggle_agents(ids, field, value)
+    except ValueError as exc:
+        return Response({"ok": False, "error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    changed = [r["id"] for r in results if r["ok"]]
+    if changed and field == "active":
+        agents_changed()
+    action = "toggled" if value is None else f"set to {value}"
+    log_system("agents", "info", f"Bulk {field} {action} on {len(changed)} agents {changed[:50]}")
+    return _bulk_response(results)
+
+
+@api_view(["POST"])
+def bulk_run_agents(request):
+    ids = _bulk_list(request, "ids")
+    if isinstance(ids, Response):
+        return ids
+    results = bulk_agents.bulk_enqueue_runs(ids)
+    queued = [r["job"] for r in results if r["ok"]]
+    log_system("run_now", "info", f"Bulk run: {len(queued)} runs queued as jobs {queued[:50]}")
+    return _bulk_response(results, status.HTTP_202_ACCEPTED if queued else status.HTTP_404_NOT_FOUND)
+
+
+def _page_limit(request, default: int) -> int:
+    try:
+        limit = int(request.query_params.get("limit", default))
+    except ValueError:
+        limit = default
+    return max(1, min(limit, 500))
+
+
+def _page_response(page, serializer_cls=None, build_rows=None):
+    """Serialize a keyset page; `build_rows` is the fast_rows builder for .values() pages."""
+    body = {
+        "items": build_rows(page.rows) if build_rows else serializer_cls(page.rows, many=True).data,
+        "next_cursor": page.next_cursor,
+        "latest_cursor": page.latest_cursor,
+        "has_more": page.has_more,
+    }
+    return fast_rows.json_response(body) if build_rows else Response(body)
 
 
 @api_view(["GET"])
-def system_logs(_request):
-    qs = SystemLog.objects.all().order_by("-created_at")[:300]
-    return Response({"items": SystemLogSerializer(qs, many=True).data})
+def runs(request):
+    fast = getattr(settings, "LIST_FAST_PATH", True)
+    qs = RunLog.objects.values(*fast_rows.RUN_COLUMNS) if fast else RunLog.objects.select_related("agent").all()
+    params = request.query_params
+    if params.get("agent"):
+        try:
+            qs = qs.filter(agent_id=int(params["agent"]))
+        except ValueError:
+            return Response({"ok": False, "error": "agent must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+    if params.get("status"):
+        qs = qs.filter(status=params["status"])
+
+    try:
+        page = keyset_page(
+            qs,
+            ts_field="started_at",
+            limit=_page_limit(request, 200),
+            cursor=params.get("cursor"),
+            since=params.get("since"),
+        )
+    except ValueError as exc:
+        return Response({"ok": False, "error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    if fast:
+        return _page_response(page, build_rows=fast_rows.run_rows)
+    return _page_response(page, RunLogSerializer)
 
 
 @api_view(["GET"])
-def analytics_summary(request):
+def system_logs(request):
+    fast = getattr(settings, "LIST_FAST_PATH", True)
+    qs = SystemLog.objects.values(*fast_rows.SYSTEM_LOG_COLUMNS) if fast else SystemLog.objects.all()
+    params = request.query_params
+    if params.get("source"):
+        qs = qs.filter(source=params["source"])
+    if params.get("level"):
+        qs = qs.filter(level=params["level"])
+
     try:
-        days = int(request.query_params.get("days", 14))
+        page = keyset_page(
+            qs,
+            ts_field="created_at",
+            limit=_page_limit(request, 300),
+            cursor=params.get("cursor"),
+            since=params.get("since"),
+        )
+    except ValueError as exc:
+        return Response({"ok": False, "error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    if fast:
+        return _page_response(page, build_rows=fast_rows.system_log_rows)
+    return _page_response(page, SystemLogSerializer)
+
+
+def _live_event_args(request):
+    """(filter, resume position) from the query string and Last-Event-ID, or an error JsonResponse."""
+    try:
+        accept = live_events.event_filter(request.GET)
+    except ValueError:
+        return JsonResponse({"ok": False, "error": "agent must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+    # EventSource sends Last-Event-ID on reconnects; ?last_event_id= resumes after a page reload
+    resume = live_events.parse_position(request.headers.get("Last-Event-ID") or request.GET.get("last_event_id"))
+    return accept, resume
+
+
+@require_GET
+def events_stream(request):
+    args = _live_event_args(request)
+    if isinstance(args, JsonResponse):
+        return args
+    return _sse_response(live_events.stream(*args))
+
+
+@require_GET
+async def events_stream_async(request):
+    args = _live_event_args(request)
+    if isinstance(args, JsonResponse):
+        return args
+    return _sse_response(live_events.astream(*args))
+
+
+def _analytics_window(request):
+    try:
+        days = int(request.GET.get("days", 14))
     except ValueError:
         days = 14
     days = 14 if days <= 0 else min(days, 90)
-
     now = timezone.now()
-    start = now - timedelta(days=days - 1)
-
-    qs = RunLog.objects.filter(started_at__date__gte=start.date(), started_at__date__lte=now.date())
-    # Preload by date/status
-    rows = (
-        qs.values("started_at__date", "status")
-        .annotate(c=Count("id"))
-        .order_by("started_at__date")
+    return days, now - timedelta(days=days - 1), now
+
+
+@conditional_json(_analytics_validator)
+@api_view(["GET"])
+def analytics_summary(request):
+    days, start, now = _analytics_window(request)
+
+    # one query over the rollup table; its size depends on days x agents, not run history
+    rows = RunRollup.objects.filter(day__gte=start.date(), day__lte=now.date()).values_list(
+        "day", "status", "agent_id", "agent__name", "count"
     )
 
     date_map: dict[str, dict[str, int]] = {}
@@ -462,39 +911,33 @@ def analytics_summary(request):
         d = (start + timedelta(days=i)).date().isoformat()
         date_map[d] = {"date": d, "success": 0, "failed": 0, "sandboxed": 0, "total": 0}
 
-    for r in rows:
-        d = r["started_at__date"].isoformat()
-        st = r["status"]
-        c = int(r["c"])
-        if d in date_map and st in ("success", "failed", "sandboxed"):
-            date_map[d][st] += c
-            date_map[d]["total"] += c
+    status_totals = {"success": 0, "failed": 0, "sandboxed": 0}
+    agent_totals: dict[int, dict[str, Any]] = {}
+    total_runs = 0
+
+    for day, st, agent_id, agent_name, c in rows:
+        total_runs += c
+        d = day.isoformat()
+        if st in status_totals:
+            status_totals[st] += c
+            if d in date_map:
+                date_map[d][st] += c
+                date_map[d]["total"] += c
+        if agent_id is not None:
+            entry = agent_totals.setdefault(agent_id, {"agent_id": agent_id, "name": agent_name, "total": 0})
+            entry["total"] += c
 
     trend = [date_map[k] for k in sorted(date_map.keys())]
-
-    status_totals = {
-        "success": qs.filter(status="success").count(),
-        "failed": qs.filter(status="failed").count(),
-        "sandboxed": qs.filter(status="sandboxed").count(),
-    }
-
-    top_agents_qs = (
-        qs.exclude(agent__isnull=True)
-        .values("agent__id", "agent__name")
-        .annotate(total=Count("id"))
-        .order_by("-total")[:5]
-    )
-    top_agents = [
-        {"agent_id": a["agent__id"], "name": a["agent__name"], "total": a["total"]}
-        for a in top_agents_qs
-    ]
+    top_agents = sorted(agent_totals.values(), key=lambda a: (-a["total"], a["agent_id"]))[:5]
 
     return Response({
         "days": days,
         "trend": trend,
         "status_totals": status_totals,
         "top_agents": top_agents,
-        "total_runs": qs.count(),
+        "total_runs": total_runs,
+        # upstream chat performance since this worker started (not limited to `days`)
+        "llm": llm_telemetry.summary(),
     })
 
 
@@ -511,9 +954,13 @@ def news_search(request):
         return Response({"ok": False, "error": "q is required"}, status=status.HTTP_400_BAD_REQUEST)
 
     try:
-        items = fetch_news(q, limit=limit)
-        log_system("news_search", "info", f"News search ok for query='{q}'")
-        return Response({"ok": True, "items": items})
+        result = fetch_news_detailed(q, limit=limit)
+        degraded = [st["source"] for st in result["sources"] if st["status"] in ("timeout", "error")]
+        if degraded:
+            log_system("news_search", "warning", f"News search partial for query='{q}': {', '.join(degraded)}")
+        else:
+            log_system("news_search", "info", f"News search ok for query='{q}'")
+        return Response({"ok": True, "items": result["items"], "sources": result["sources"]})
     except Exception as exc:
         log_system("news_search", "error", str(exc))
         return Response({"ok": False, "error": str(exc)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -521,19 +968,72 @@ def news_search(request):
 
 @api_view(["POST"])
 def crawl_extract_view(request):
-    url = str((request.data or {}).get("url", "")).strip()
+    body = request.data or {}
+    url = str(body.get("url", "")).strip()
     if not url:
         return Response({"ok": False, "error": "url is required"}, status=status.HTTP_400_BAD_REQUEST)
 
     try:
-        data = crawl_extract(url)
-        log_system("crawl_extract", "info", f"Extracted: {url}")
+        data = crawl_extract(url, bypass_cache=_cache_bypass(request, body))
+        log_system("crawl_extract", "info", f"Extracted ({data.get('cache', 'off')}): {url}")
         return Response({"ok": True, "item": data})
     except Exception as exc:
         log_system("crawl_extract", "error", f"{url}: {exc}")
         return Response({"ok": False, "error": str(exc)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(["POST"])
+def crawl_batch_view(request):
+    """
+    Crawl several URLs at once. Each result is streamed as soon as its page
+    finishes: NDJSON by default, SSE with "format": "sse" or
+    Accept: text/event-stream. A final {"done": true, ...} record closes the stream.
+    """
+    body = request.data or {}
+    urls = body.get("urls")
+    if not isinstance(urls, list) or not urls:
+        return Response({"ok": False, "error": "urls must be a non-empty list"}, status=status.HTTP_400_BAD_REQUEST)
+    urls = [str(u).strip() for u in urls]
+    max_urls = int(getattr(settings, "CRAWL_BATCH_MAX_URLS", 50))
+    if len(urls) > max_urls:
+        return Response({"ok": False, "error": f"at most {max_urls} urls per batch"}, status=status.HTTP_400_BAD_REQUEST)
+
+    use_sse = str(body.get("format", "")).lower() == "sse" or "text/event-stream" in request.headers.get("Accept", "")
+    bypass_cache = _cache_bypass(request, body)
+
+    def frame(record: dict[str, Any]) -> str:
+        payload = json.dumps(record, ensure_ascii=False)
+        if use_sse:
+            return f"event: {'done' if record.get('done') else 'result'}\ndata: {payload}\n\n"
+        return payload + "\n"
+
+    def generate():
+        started = time.monotonic()
+        ok = failed = 0
+        try:
+            for record in crawl_many(urls, bypass_cache=bypass_cache):
+                if record["ok"]:
+                    ok += 1
+                else:
+                    failed += 1
+                yield frame(record)
+            yield frame({"done": True, "ok": ok, "failed": failed, "elapsed_ms": int((time.monotonic() - started) * 1000)})
+        finally:
+            # one line per batch, also when the client disconnects mid-stream
+            log_system(
+                "crawl_batch",
+                "warning" if failed or ok + failed < len(urls) else "info",
+                f"Batch crawl: urls={len(urls)} ok={ok} failed={failed} elapsed_ms={int((time.monotonic() - started) * 1000)}",
+            )
+
+    if use_sse:
+        return _sse_response(generate())
+    response = StreamingHttpResponse(generate(), content_type="application/x-ndjson; charset=utf-8")
+    response["Cache-Control"] = "no-cache, no-transform"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 @api_view(["POST"])
 def webhook_make_run_status(request):
     body = request.data or {}
@@ -559,5 +1059,7 @@ def webhook_make_run_status(request):
         started_at=now,
         ended_at=now,
     )
+    record_run(run)
+    live_events.hub.nudge()
     log_system("webhook_make", "info", f"Webhook run status: {status_value} agent={agent_id}")
     return Response({"ok": True, "run": RunLogSerializer(run).data})
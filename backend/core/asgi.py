@@ -3,3 +3,25 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
 application = get_asgi_application()
+
+# Opt-in in-process agent scheduler (see app/services/scheduler_service.py).
+# Safe with several workers: only the holder of the DB lease dispatches.
+from django.conf import settings  # noqa: E402
+
+if settings.SCHEDULER_AUTOSTART:
+    from app.services.scheduler_service import scheduler  # noqa: E402
+
+    scheduler.start()
+
+# Opt-in run-queue worker threads (the default is `manage.py run_worker`);
+# claims are atomic, so every process may run some.
+if settings.RUN_QUEUE_AUTOSTART:
+    from app.run_queue import queue as run_queue  # noqa: E402
+
+    run_queue.start()
+
+# Opt-in periodic SystemLog retention; a DB lease keeps it to one process per run.
+if settings.SYSTEM_LOG_RETENTION_AUTOSTART:
+    from app.log_retention import start_retention  # noqa: E402
+
+    start_retention()
@@ -1,4 +1,5 @@
 from pathlib import Path
+import json
 import os
 from dotenv import load_dotenv
 
@@ -82,6 +83,30 @@ DATABASES = {
     }
 }
 
+# ------------------------------------------------------------------------------
+# Caches
+# ------------------------------------------------------------------------------
+# "shared" is on disk so entries survive restarts and are visible to every
+# gunicorn worker on the host.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "shared": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("SHARED_CACHE_DIR", str(BASE_DIR / ".cache")),
+        "TIMEOUT": None,
+        "OPTIONS": {"MAX_ENTRIES": int(os.getenv("SHARED_CACHE_MAX_ENTRIES", "5000"))},
+    },
+    # Whisper transcripts keyed by audio hash; kept apart so they don't crowd out "shared".
+    "transcripts": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("STT_CACHE_DIR", str(BASE_DIR / ".cache" / "stt")),
+        "TIMEOUT": int(os.getenv("STT_CACHE_TTL", str(30 * 86400))),
+        "OPTIONS": {"MAX_ENTRIES": int(os.getenv("STT_CACHE_MAX_ENTRIES", "2000"))},
+    },
+}
+
 # ------------------------------------------------------------------------------
 # Internationalization
 # ------------------------------------------------------------------------------
@@ -154,7 +179,179 @@ CSRF_COOKIE_SECURE = env_bool("CSRF_COOKIE_SECURE", not DEBUG)
 # App defaults
 # ------------------------------------------------------------------------------
 DEFAULT_GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
+# Seconds before a learned model capability (e.g. reasoning_effort support) is re-probed.
+MODEL_CAPABILITY_TTL = int(os.getenv("MODEL_CAPABILITY_TTL", "86400"))
+
+# Opt-in reply cache for identical chat requests (see services/completion_cache.py).
+CHAT_CACHE_ENABLED = env_bool("CHAT_CACHE_ENABLED", False)
+CHAT_CACHE_TTL = int(os.getenv("CHAT_CACHE_TTL", "300"))
+CHAT_CACHE_MAX_ENTRIES = int(os.getenv("CHAT_CACHE_MAX_ENTRIES", "512"))
+# Also store replies in the on-disk "shared" cache so all workers see them.
+CHAT_CACHE_SHARED = env_bool("CHAT_CACHE_SHARED", False)
+
+# In-process latency/TTFT/throughput histograms for Groq calls (services/llm_telemetry.py),
+# served at /api/metrics/prometheus. MAX_SERIES caps distinct (model, endpoint) label pairs.
+LLM_TELEMETRY = env_bool("LLM_TELEMETRY", True)
+LLM_TELEMETRY_MAX_SERIES = int(os.getenv("LLM_TELEMETRY_MAX_SERIES", "64"))
+# The analytics summary ETag follows telemetry in slots this long, so chat traffic
+# does not defeat its 304s; the `llm` numbers in a 304 are at most this stale.
+ANALYTICS_LLM_ETAG_SECONDS = float(os.getenv("ANALYTICS_LLM_ETAG_SECONDS", "30"))
+
+# How often a worker re-checks AppSetting.version for writes made by other workers.
+APP_SETTINGS_RECHECK_SECONDS = float(os.getenv("APP_SETTINGS_RECHECK_SECONDS", "5"))
 
 ENV_GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
+# OpenAI-compatible base URL for chat and transcription calls.
+GROQ_API_BASE = os.getenv("GROQ_API_BASE", "https://api.groq.com/openai/v1")
 MAKE_WEBHOOK_URL = os.getenv("MAKE_WEBHOOK_URL", "")
+# Make dispatcher (app/services/make_service.py): jittered retries of POSTs that
+# never reached Make (connection errors, 429, 503) for runs outside the queue, a
+# per-URL circuit breaker, and optional batching of runs that fall in the same
+# MAKE_WEBHOOK_BATCH_WINDOW seconds (0 = one call per run).
+MAKE_WEBHOOK_RETRIES = int(os.getenv("MAKE_WEBHOOK_RETRIES", "2"))
+MAKE_WEBHOOK_BACKOFF = float(os.getenv("MAKE_WEBHOOK_BACKOFF", "0.5"))
+MAKE_BREAKER_FAILURES = int(os.getenv("MAKE_BREAKER_FAILURES", "5"))
+MAKE_BREAKER_COOLDOWN = float(os.getenv("MAKE_BREAKER_COOLDOWN", "30"))
+MAKE_WEBHOOK_BATCH_WINDOW = float(os.getenv("MAKE_WEBHOOK_BATCH_WINDOW", "0"))
+MAKE_WEBHOOK_BATCH_MAX = int(os.getenv("MAKE_WEBHOOK_BATCH_MAX", "25"))
 OPENCLAW_BIN = os.getenv("OPENCLAW_BIN", "openclaw")
+
+# ------------------------------------------------------------------------------
+# News search
+# ------------------------------------------------------------------------------
+NEWS_FETCH_WORKERS = int(os.getenv("NEWS_FETCH_WORKERS", "8"))
+# Per-feed budget and overall budget (seconds) for one /api/news/search call.
+NEWS_SOURCE_TIMEOUT = float(os.getenv("NEWS_SOURCE_TIMEOUT", "4"))
+NEWS_FETCH_DEADLINE = float(os.getenv("NEWS_FETCH_DEADLINE", "6"))
+# Seconds a cached query-independent feed (BBC, NYT) is served before a conditional GET.
+NEWS_FEED_FRESHNESS = float(os.getenv("NEWS_FEED_FRESHNESS", "120"))
+# Bounds for the in-memory BM25 index over cached feed entries.
+NEWS_INDEX_MAX_DOCS = int(os.getenv("NEWS_INDEX_MAX_DOCS", "5000"))
+NEWS_INDEX_MAX_AGE = float(os.getenv("NEWS_INDEX_MAX_AGE", "172800"))
+
+# /api/crawl/extract: stop reading after CRAWL_MAX_BYTES of HTML; return at most
+# CRAWL_TEXT_BUDGET characters of text ("length" is still the full extracted length).
+# CRAWL_HTML_PARSER is "auto" (lxml if installed), "lxml" or "html.parser".
+CRAWL_MAX_BYTES = int(os.getenv("CRAWL_MAX_BYTES", "2000000"))
+CRAWL_TEXT_BUDGET = int(os.getenv("CRAWL_TEXT_BUDGET", "50000"))
+CRAWL_HTML_PARSER = os.getenv("CRAWL_HTML_PARSER", "auto")
+# Persistent crawl cache (CrawlCacheEntry): served without a request for
+# CRAWL_CACHE_FRESHNESS seconds, then revalidated; LRU-evicted past CRAWL_CACHE_MAX_BYTES.
+CRAWL_CACHE_ENABLED = env_bool("CRAWL_CACHE_ENABLED", True)
+CRAWL_CACHE_FRESHNESS = float(os.getenv("CRAWL_CACHE_FRESHNESS", "900"))
+CRAWL_CACHE_MAX_BYTES = int(os.getenv("CRAWL_CACHE_MAX_BYTES", "50000000"))
+# Re-read the cache size from the table every N writes (picks up other workers' writes).
+CRAWL_CACHE_RESYNC_WRITES = int(os.getenv("CRAWL_CACHE_RESYNC_WRITES", "100"))
+# /api/crawl/batch: CRAWL_BATCH_WORKERS concurrent fetches per process, at most
+# CRAWL_PER_HOST_LIMIT per host in a batch; per-URL and whole-batch budgets in seconds.
+CRAWL_BATCH_WORKERS = int(os.getenv("CRAWL_BATCH_WORKERS", "8"))
+CRAWL_PER_HOST_LIMIT = int(os.getenv("CRAWL_PER_HOST_LIMIT", "2"))
+CRAWL_BATCH_URL_TIMEOUT = float(os.getenv("CRAWL_BATCH_URL_TIMEOUT", "15"))
+CRAWL_BATCH_DEADLINE = float(os.getenv("CRAWL_BATCH_DEADLINE", "60"))
+CRAWL_BATCH_MAX_URLS = int(os.getenv("CRAWL_BATCH_MAX_URLS", "50"))
+
+# ------------------------------------------------------------------------------
+# Speech-to-text (see app/services/stt_service.py)
+# ------------------------------------------------------------------------------
+# Recordings longer than STT_SEGMENT_SECONDS are cut with ffmpeg into segments
+# overlapping by STT_SEGMENT_OVERLAP seconds and transcribed STT_WORKERS at a time.
+STT_SEGMENT_SECONDS = float(os.getenv("STT_SEGMENT_SECONDS", "600"))
+STT_SEGMENT_OVERLAP = float(os.getenv("STT_SEGMENT_OVERLAP", "3"))
+STT_WORKERS = int(os.getenv("STT_WORKERS", "4"))
+STT_UPLOAD_TIMEOUT = float(os.getenv("STT_UPLOAD_TIMEOUT", "120"))
+STT_FFMPEG_BIN = os.getenv("STT_FFMPEG_BIN", "ffmpeg")
+STT_FFPROBE_BIN = os.getenv("STT_FFPROBE_BIN", "ffprobe")
+# Reuse transcripts of byte-identical audio (see CACHES["transcripts"] for size/TTL).
+STT_CACHE_ENABLED = env_bool("STT_CACHE_ENABLED", True)
+
+# ------------------------------------------------------------------------------
+# Agent scheduler (see app/services/scheduler_service.py)
+# ------------------------------------------------------------------------------
+# Run it with `python manage.py run_scheduler`, or set SCHEDULER_AUTOSTART=1 to
+# start it inside the web workers (one of them wins the lease and dispatches).
+SCHEDULER_AUTOSTART = env_bool("SCHEDULER_AUTOSTART", False)
+SCHEDULER_WORKERS = int(os.getenv("SCHEDULER_WORKERS", "4"))
+# A scheduled run later than this many seconds is skipped instead of run late.
+SCHEDULER_MISFIRE_GRACE = float(os.getenv("SCHEDULER_MISFIRE_GRACE", "60"))
+SCHEDULER_TICK_SECONDS = float(os.getenv("SCHEDULER_TICK_SECONDS", "1"))
+SCHEDULER_POLL_SECONDS = float(os.getenv("SCHEDULER_POLL_SECONDS", "60"))
+SCHEDULER_FULL_RESYNC = float(os.getenv("SCHEDULER_FULL_RESYNC", "600"))
+SCHEDULER_LEASE_SECONDS = float(os.getenv("SCHEDULER_LEASE_SECONDS", "30"))
+
+# ------------------------------------------------------------------------------
+# Run queue (see app/run_queue.py)
+# ------------------------------------------------------------------------------
+# run-now enqueues a RunJob; `python manage.py run_worker` executes it, retrying
+# failed webhooks with backoff. Opt in to also run workers in every web process.
+RUN_QUEUE_AUTOSTART = env_bool("RUN_QUEUE_AUTOSTART", False)
+RUN_QUEUE_CONCURRENCY = int(os.getenv("RUN_QUEUE_CONCURRENCY", "4"))
+RUN_QUEUE_MAX_ATTEMPTS = int(os.getenv("RUN_QUEUE_MAX_ATTEMPTS", "3"))
+RUN_QUEUE_RETRY_BACKOFF = float(os.getenv("RUN_QUEUE_RETRY_BACKOFF", "5"))
+RUN_QUEUE_POLL_SECONDS = float(os.getenv("RUN_QUEUE_POLL_SECONDS", "2"))
+RUN_QUEUE_LEASE_SECONDS = float(os.getenv("RUN_QUEUE_LEASE_SECONDS", "300"))
+
+# Build agents/runs/system-logs list responses from .values() rows instead of
+# DRF serializers (see app/fast_rows.py); output is byte-identical.
+LIST_FAST_PATH = env_bool("LIST_FAST_PATH", True)
+
+# ETag/304 endpoints (app/conditional.py) gzip 200 bodies at least this large.
+JSON_GZIP_MIN_BYTES = int(os.getenv("JSON_GZIP_MIN_BYTES", "1024"))
+
+# Upper bound on items/ids accepted by one /api/agents/bulk/* request.
+AGENT_BULK_MAX_ITEMS = int(os.getenv("AGENT_BULK_MAX_ITEMS", "1000"))
+
+# ------------------------------------------------------------------------------
+# SystemLog writer (see app/log_sink.py)
+# ------------------------------------------------------------------------------
+SYSTEM_LOG_BUFFERED = env_bool("SYSTEM_LOG_BUFFERED", True)
+SYSTEM_LOG_BATCH_SIZE = int(os.getenv("SYSTEM_LOG_BATCH_SIZE", "100"))
+SYSTEM_LOG_FLUSH_INTERVAL = float(os.getenv("SYSTEM_LOG_FLUSH_INTERVAL", "1.0"))
+SYSTEM_LOG_QUEUE_SIZE = int(os.getenv("SYSTEM_LOG_QUEUE_SIZE", "10000"))
+# How long log_system() may block on a full queue before dropping the record.
+SYSTEM_LOG_BLOCK_TIMEOUT = float(os.getenv("SYSTEM_LOG_BLOCK_TIMEOUT", "0.05"))
+
+# Live RunLog/SystemLog events on GET /api/events (see app/live_events.py).
+# Resume via Last-Event-ID is served from a ring buffer of LIVE_EVENTS_BUFFER events.
+LIVE_EVENTS_BUFFER = int(os.getenv("LIVE_EVENTS_BUFFER", "2000"))
+# Older resume points are read back from the database, up to this many rows per
+# table; further behind, the client gets a "reset" event and reloads the lists.
+LIVE_EVENTS_BACKFILL_MAX = int(os.getenv("LIVE_EVENTS_BACKFILL_MAX", "5000"))
+# Cross-process tail poll; only runs while this process has subscribers.
+LIVE_EVENTS_POLL_SECONDS = float(os.getenv("LIVE_EVENTS_POLL_SECONDS", "1.0"))
+LIVE_EVENTS_HEARTBEAT = float(os.getenv("LIVE_EVENTS_HEARTBEAT", "15"))
+# Streams end after this long (clients reconnect and resume) so WSGI threads recycle.
+LIVE_EVENTS_MAX_SECONDS = float(os.getenv("LIVE_EVENTS_MAX_SECONDS", "3600"))
+
+# Retention (see app/log_retention.py). Rows older than SYSTEM_LOG_RETENTION_DAYS,
+# or beyond the newest SYSTEM_LOG_MAX_ROWS, are archived and deleted (0 = no limit).
+# Per source/level overrides, first match wins, e.g.
+#   SYSTEM_LOG_RETENTION_RULES='[{"source": "chat", "level": "info", "days": 7},
+#                                {"level": "error", "days": 180, "max_rows": 50000}]'
+SYSTEM_LOG_RETENTION_DAYS = float(os.getenv("SYSTEM_LOG_RETENTION_DAYS", "30"))
+SYSTEM_LOG_MAX_ROWS = int(os.getenv("SYSTEM_LOG_MAX_ROWS", "200000"))
+SYSTEM_LOG_RETENTION_RULES = json.loads(os.getenv("SYSTEM_LOG_RETENTION_RULES", "[]"))
+# Run `python manage.py system_logs prune` from cron, or opt in to pruning inside
+# the web process every SYSTEM_LOG_RETENTION_INTERVAL seconds (one process at a time).
+SYSTEM_LOG_RETENTION_AUTOSTART = env_bool("SYSTEM_LOG_RETENTION_AUTOSTART", False)
+SYSTEM_LOG_RETENTION_INTERVAL = float(os.getenv("SYSTEM_LOG_RETENTION_INTERVAL", "3600"))
+# Rows per DELETE, and the sleep between chunks that lets other writers in.
+SYSTEM_LOG_RETENTION_CHUNK = int(os.getenv("SYSTEM_LOG_RETENTION_CHUNK", "500"))
+SYSTEM_LOG_RETENTION_PAUSE = float(os.getenv("SYSTEM_LOG_RETENTION_PAUSE", "0.05"))
+SYSTEM_LOG_ARCHIVE = env_bool("SYSTEM_LOG_ARCHIVE", True)
+SYSTEM_LOG_ARCHIVE_DIR = os.getenv("SYSTEM_LOG_ARCHIVE_DIR", str(BASE_DIR / "archive" / "system_logs"))
+
+# ------------------------------------------------------------------------------
+# Upstream HTTP transport (Groq / Make)
+# ------------------------------------------------------------------------------
+# Keep-alive connections per host, per worker process.
+UPSTREAM_POOL_SIZE = int(os.getenv("UPSTREAM_POOL_SIZE", "10"))
+UPSTREAM_CONNECT_TIMEOUT = float(os.getenv("UPSTREAM_CONNECT_TIMEOUT", "5"))
+UPSTREAM_READ_TIMEOUT = float(os.getenv("UPSTREAM_READ_TIMEOUT", "60"))
+# Upper bound on concurrent upstream connections held by async views.
+UPSTREAM_ASYNC_MAX_CONNECTIONS = int(os.getenv("UPSTREAM_ASYNC_MAX_CONNECTIONS", "200"))
+
+# Serve /api/chat and /api/chat/stream from native async views.
+# Enable only when running core.asgi:application (see docs/ARCHITECTURE.md).
+ASYNC_CHAT_VIEWS = env_bool("ASYNC_CHAT_VIEWS", False)
+# Same for GET /api/events; under ASGI an idle subscriber then holds no thread.
+ASYNC_EVENT_VIEWS = env_bool("ASYNC_EVENT_VIEWS", ASYNC_CHAT_VIEWS)
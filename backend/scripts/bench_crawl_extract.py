@@ -0,0 +1,108 @@
+"""
+Benchmark crawl_extract's streaming extractor against the previous
+BeautifulSoup(html.parser) path over a corpus of saved pages.
+
+    python scripts/bench_crawl_extract.py --corpus ./saved_pages      # *.html files
+    python scripts/bench_crawl_extract.py --synthetic 20              # generated pages
+
+Pages are fed in 16 KiB chunks to mimic `iter_content`. Reported per path:
+mean wall time per page, mean peak traced memory, and how many pages
+produce the same (title, text, length) as the legacy path.
+"""
+from __future__ import annotations
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from app.services.html_extract import available_backends, extract_from_chunks  # noqa: E402
+
+CHUNK = 16384
+TEXT_BUDGET = 50000
+MAX_BYTES = 2_000_000
+
+
+def legacy_extract(html: bytes) -> dict[str, object]:
+    soup = BeautifulSoup(html.decode("utf-8", errors="replace"), "html.parser")
+    for tag in soup(["script", "style", "noscript", "header", "footer", "svg"]):
+        tag.decompose()
+    title = (soup.title.string.strip() if soup.title and soup.title.string else "")
+    paragraphs = [p.get_text(" ", strip=True) for p in soup.find_all("p")]
+    text = "\n".join([p for p in paragraphs if p])
+    return {"title": title, "text": text[:TEXT_BUDGET], "length": len(text)}
+
+
+def streaming_extract(html: bytes, backend: str) -> dict[str, object]:
+    chunks = (html[i:i + CHUNK] for i in range(0, len(html), CHUNK))
+    return extract_from_chunks(chunks, encoding="utf-8", text_budget=TEXT_BUDGET, max_bytes=MAX_BYTES, backend=backend)
+
+
+def synthetic_page(rng: random.Random, paragraphs: int) -> bytes:
+    words = ["news", "market", "policy", "update", "river", "team", "city", "report", "data", "<b>bold</b>"]
+    parts = ["<html><head><title>Synthetic page</title><style>p{color:red}</style>"]
+    parts.append("<script>" + "var x=1;" * 2000 + "</script></head><body>")
+    parts.append("<header><p>Site header nav</p></header><nav>" + "<a href='#'>link</a>" * 200 + "</nav>")
+    for _ in range(paragraphs):
+        parts.append("<div class='wrap'><p>" + " ".join(rng.choice(words) for _ in range(60)) + "</p></div>")
+        if rng.random() < 0.1:
+            parts.append("<svg><text>chart</text></svg><script>track()</script>")
+    parts.append("<footer><p>Footer text</p></footer></body></html>")
+    return "".join(parts).encode("utf-8")
+
+
+def measure(fn, pages: list[bytes]) -> tuple[float, float, list[dict]]:
+    times, peaks, outputs = [], [], []
+    for html in pages:
+        tracemalloc.start()
+        t = time.perf_counter()
+        outputs.append(fn(html))
+        times.append(time.perf_counter() - t)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return statistics.mean(times), statistics.mean(peaks), outputs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=Path, help="directory of saved *.html pages")
+    parser.add_argument("--synthetic", type=int, default=0, help="number of generated pages")
+    args = parser.parse_args()
+
+    pages: list[bytes] = []
+    if args.corpus:
+        pages += [p.read_bytes() for p in sorted(args.corpus.glob("*.html"))]
+    if args.synthetic:
+        rng = random.Random(7)
+        pages += [synthetic_page(rng, rng.choice([50, 400, 3000])) for _ in range(args.synthetic)]
+    if not pages:
+        parser.error("give --corpus and/or --synthetic")
+
+    size = statistics.mean(len(p) for p in pages)
+    print(f"{len(pages)} pages, mean size {size / 1024:.0f} KiB")
+    base_t, base_m, base_out = measure(legacy_extract, pages)
+    print(f"{'path':<28}{'ms/page':>10}{'peak KiB':>12}{'same output':>14}")
+    print(f"{'legacy bs4 html.parser':<28}{base_t * 1000:>10.2f}{base_m / 1024:>12.0f}{'-':>14}")
+    for backend in available_backends():
+        t, m, out = measure(lambda h: streaming_extract(h, backend), pages)
+        same = sum(
+            1 for a, b in zip(base_out, out)
+            if a["title"] == b["title"] and a["text"] == b["text"] and a["length"] == b["length"]
+        )
+        print(f"{'streaming ' + backend:<28}{t * 1000:>10.2f}{m / 1024:>12.0f}{f'{same}/{len(pages)}':>14}")
+
+
+if __name__ == "__main__":
+    main()
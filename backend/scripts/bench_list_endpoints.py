@@ -0,0 +1,107 @@
+"""
+Benchmark the serializer path against the .values() fast path (app/fast_rows.py)
+for GET /api/agents, /api/runs and /api/system-logs.
+
+    python scripts/bench_list_endpoints.py                  # 500 rows per table
+    python scripts/bench_list_endpoints.py --rows 2000 --repeat 30
+
+Runs against a throwaway test database seeded with synthetic rows: unicode,
+U+2028, NULL agents, and whole-second timestamps. It first checks that both
+paths return byte-identical bodies for every endpoint. It then reports the
+median request time and the per-row cost of each path.
+"""
+from __future__ import annotations
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from app import fast_rows  # noqa: E402
+
+ENDPOINTS = ("/api/agents", "/api/runs?limit={n}", "/api/system-logs?limit={n}")
+
+
+def seed(n: int) -> None:
+    from app.models import Agent, RunLog, SystemLog
+
+    now = timezone.now().replace(microsecond=0)
+    agents = Agent.objects.bulk_create([
+        Agent(name=f"agent {i} — ünïcødé", role="Researcher", goal="Summarise feeds daily",
+              schedule_cron="*/15 * * * *", active=i % 3 != 0, sandbox=i % 2 == 0)
+        for i in range(n)
+    ])
+    RunLog.objects.bulk_create([
+        RunLog(agent=None if i % 10 == 0 else agents[i % len(agents)],
+               status=("success", "failed", "sandboxed")[i % 3],
+               message=f"Webhook status {200 + i % 3}",
+               started_at=now - timedelta(seconds=i, microseconds=(i * 7919) % 1_000_000 if i % 4 else 0),
+               ended_at=now - timedelta(seconds=i) + timedelta(milliseconds=250))
+        for i in range(n)
+    ])
+    SystemLog.objects.bulk_create([
+        SystemLog(source="agents", level=("info", "error")[i % 2],
+                  message=f"Agent {i} run -> ok: \"quoted\" ✓" + ("\u2028next line" if i % 5 == 0 else ""),
+                  created_at=now - timedelta(seconds=i, microseconds=i % 1000))
+        for i in range(n)
+    ])
+
+
+def fetch(client: Client, url: str, fast: bool) -> bytes:
+    settings.LIST_FAST_PATH = fast
+    resp = client.get(url)
+    assert resp.status_code == 200, (url, resp.status_code)
+    return resp.content
+
+
+def timed(client: Client, url: str, fast: bool, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fetch(client, url, fast)
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=500, help="rows per table (runs/system-logs cap at 500 per page)")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    connection.creation.create_test_db(verbosity=0)
+    seed(args.rows)
+    client = Client(SERVER_NAME="localhost")
+    page = min(args.rows, 500)
+
+    print(f"encoder: {'orjson' if fast_rows._orjson is not None else 'json (stdlib)'}; rows/page: agents={args.rows}, others={page}")
+    print(f"{'endpoint':<28}{'identical':>10}{'serializer':>14}{'fast path':>12}{'per row':>22}{'speedup':>9}")
+    for pattern in ENDPOINTS:
+        url = pattern.format(n=page)
+        rows = args.rows if url == "/api/agents" else page
+        identical = fetch(client, url, False) == fetch(client, url, True)
+        slow = timed(client, url, False, args.repeat)
+        fast = timed(client, url, True, args.repeat)
+        per_row = f"{slow / rows * 1e6:.1f} -> {fast / rows * 1e6:.1f} µs"
+        print(f"{url.split('?')[0]:<28}{str(identical):>10}{slow * 1000:>11.2f} ms{fast * 1000:>9.2f} ms{per_row:>22}{slow / fast:>8.1f}x")
+        if not identical:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
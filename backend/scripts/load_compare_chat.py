@@ -0,0 +1,137 @@
+"""
+Concurrent /api/chat/stream load driver.
+
+Compare the WSGI path (gunicorn + sync views) against the ASGI path
+(uvicorn + ASYNC_CHAT_VIEWS=1) with the same client load:
+
+    # 1. fake Groq upstream that streams slowly (no API key or quota used)
+    python scripts/load_compare_chat.py stub --port 9100 --chunks 40 --delay 0.05
+
+    # 2. start the backend against it, e.g.
+    GROQ_API_BASE=http://127.0.0.1:9100 GROQ_API_KEY=x gunicorn core.wsgi:application -w 2 --threads 8
+    GROQ_API_BASE=http://127.0.0.1:9100 GROQ_API_KEY=x ASYNC_CHAT_VIEWS=1 \\
+        gunicorn core.asgi:application -w 2 -k uvicorn.workers.UvicornWorker
+
+    # 3. drive it
+    python scripts/load_compare_chat.py run --target http://127.0.0.1:8000/api --concurrency 200
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+
+async def _stub_handler(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, chunks: int, delay: float) -> None:
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+        length = 0
+        for line in head.decode("latin-1").split("\r\n"):
+            if line.lower().startswith("content-length:"):
+                length = int(line.split(":", 1)[1])
+        body = json.loads(await reader.readexactly(length) or b"{}")
+
+        if not body.get("stream"):
+            await asyncio.sleep(delay * chunks)
+            payload = json.dumps({"choices": [{"message": {"content": "stub " * chunks}}]}).encode()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                + f"Content-Length: {len(payload)}\r\n\r\n".encode()
+                + payload
+            )
+            await writer.drain()
+            return
+
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nTransfer-Encoding: chunked\r\n\r\n")
+        for _ in range(chunks):
+            await asyncio.sleep(delay)
+            event = b'data: {"choices":[{"delta":{"content":"tok "}}]}\n\n'
+            writer.write(f"{len(event):x}\r\n".encode() + event + b"\r\n")
+            await writer.drain()
+        done = b"data: [DONE]\n\n"
+        writer.write(f"{len(done):x}\r\n".encode() + done + b"\r\n0\r\n\r\n")
+        await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def run_stub(port: int, chunks: int, delay: float) -> None:
+    server = await asyncio.start_server(
+        lambda r, w: _stub_handler(r, w, chunks, delay), "127.0.0.1", port, backlog=4096
+    )
+    print(f"stub upstream on http://127.0.0.1:{port} ({chunks} chunks x {delay}s)")
+    async with server:
+        await server.serve_forever()
+
+
+async def _one_stream(client: httpx.AsyncClient, url: str) -> dict[str, float | bool]:
+    start = time.perf_counter()
+    first = None
+    try:
+        async with client.stream("POST", url, json={"message": "hello"}) as r:
+            async for line in r.aiter_lines():
+                if line.startswith("data:") and "stream-started" not in line:
+                    if first is None:
+                        first = time.perf_counter() - start
+                    if "[ERROR]" in line:
+                        return {"ok": False}
+                    if "[DONE]" in line:
+                        break
+        return {"ok": r.status_code == 200, "ttft": first or 0.0, "total": time.perf_counter() - start}
+    except httpx.HTTPError:
+        return {"ok": False}
+
+
+def _pct(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+async def run_load(target: str, concurrency: int, timeout: float) -> None:
+    url = f"{target.rstrip('/')}/chat/stream"
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+        wall = time.perf_counter()
+        results = await asyncio.gather(*[_one_stream(client, url) for _ in range(concurrency)])
+        wall = time.perf_counter() - wall
+
+    ok = [r for r in results if r.get("ok")]
+    ttft = [float(r["ttft"]) for r in ok]
+    total = [float(r["total"]) for r in ok]
+    print(f"target={url} concurrency={concurrency}")
+    print(f"  completed={len(ok)}/{len(results)} wall={wall:.2f}s")
+    if ok:
+        print(f"  ttft   p50={statistics.median(ttft):.3f}s p95={_pct(ttft, 0.95):.3f}s max={max(ttft):.3f}s")
+        print(f"  stream p50={statistics.median(total):.3f}s p95={_pct(total, 0.95):.3f}s max={max(total):.3f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    stub = sub.add_parser("stub", help="run a fake Groq streaming upstream")
+    stub.add_argument("--port", type=int, default=9100)
+    stub.add_argument("--chunks", type=int, default=40)
+    stub.add_argument("--delay", type=float, default=0.05)
+
+    run = sub.add_parser("run", help="open N concurrent chat streams")
+    run.add_argument("--target", default="http://127.0.0.1:8000/api")
+    run.add_argument("--concurrency", type=int, default=100)
+    run.add_argument("--timeout", type=float, default=120.0)
+
+    args = parser.parse_args()
+    if args.cmd == "stub":
+        asyncio.run(run_stub(args.port, args.chunks, args.delay))
+    else:
+        asyncio.run(run_load(args.target, args.concurrency, args.timeout))
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,7 @@ import {
   getSettings,
   listAgentTemplates,
   runAgentNow,
+  waitForRunJob,
   searchNews,
   setupOpenClaw,
   sttAudio
@@ -144,7 +145,8 @@ export default function AssistantPanel({ onClose, embedded = false }: Props) {
       } else {
         const created = await createAgentFromTemplate("daily_calendar_brief");
         if (created.item?.id) {
-          const r = await runAgentNow(created.item.id);
+          const { job } = await runAgentNow(created.item.id);
+          const r = await waitForRunJob(job.id);
           setMessages((m) => [...m, { role: "system", content: JSON.stringify(r, null, 2) }]);
         } else {
           setMessages((m) => [...m, { role: "system", content: "Could not create bootstrap agent." }]);
@@ -93,6 +93,60 @@ export async function sttAudio(blob: Blob) {
   return data;
 }
 
+export type SttSegment = {
+  index: number;
+  count: number;
+  start: number;
+  end: number | null;
+  text: string;
+  transcript: string;
+};
+
+export async function sttStream(
+  blob: Blob,
+  onSegment: (segment: SttSegment) => void,
+  filename = "voice.webm"
+): Promise<string> {
+  const form = new FormData();
+  form.append("audio", blob, filename);
+  const res = await fetch(`${API_BASE}/stt/stream`, { method: "POST", body: form });
+
+  if (!res.ok || !res.body) {
+    const txt = await res.text().catch(() => "");
+    throw new Error(`STT stream failed: ${res.status} ${txt}`);
+  }
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder("utf-8");
+  let buffer = "";
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+
+    buffer += decoder.decode(value, { stream: true });
+    const frames = buffer.split("\n\n");
+    buffer = frames.pop() ?? "";
+
+    for (const frame of frames) {
+      let event = "message";
+      let data = "";
+      for (const line of frame.split("\n")) {
+        if (line.startsWith("event:")) event = line.slice(6).trim();
+        else if (line.startsWith("data:")) data += line.slice(5).trim();
+      }
+      if (!data) continue;
+      const payload = JSON.parse(data);
+      if (event === "segment") onSegment(payload as SttSegment);
+      if (event === "done") {
+        if (!payload.ok) throw new Error(payload.error);
+        return payload.text as string;
+      }
+    }
+  }
+  throw new Error("STT stream ended early");
+}
+
 export async function setupOpenClaw() {
   const { data } = await http.post("/setup/openclaw");
   return data;
@@ -123,11 +177,40 @@ export async function createAgentFromTemplate(template_key: string) {
   return data;
 }
 
-export async function runAgentNow(id: number) {
+export type RunJob = {
+  id: number;
+  agent: number | null;
+  trigger: string;
+  status: "queued" | "running" | "done" | "failed";
+  attempts: number;
+  max_attempts: number;
+  last_error: string;
+  run: RunLog | null;
+  created_at: string;
+  started_at: string | null;
+  finished_at: string | null;
+};
+
+// Queues a run and returns { ok, job } right away (HTTP 202).
+export async function runAgentNow(id: number): Promise<{ ok: boolean; job: RunJob }> {
   const { data } = await http.post(`/agents/${id}/run-now`);
   return data;
 }
 
+export async function getRunJob(id: number): Promise<RunJob> {
+  const { data } = await http.get(`/run-jobs/${id}`);
+  return data.item;
+}
+
+export async function waitForRunJob(id: number, intervalMs = 1000, timeoutMs = 120000): Promise<RunJob> {
+  const deadline = Date.now() + timeoutMs;
+  while (true) {
+    const job = await getRunJob(id);
+    if (job.status === "done" || job.status === "failed" || Date.now() > deadline) return job;
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+}
+
 export async function toggleAgentActive(id: number) {
   const { data } = await http.post(`/agents/${id}/toggle-active`);
   return data;
@@ -138,17 +221,142 @@ export async function toggleAgentSandbox(id: number) {
   return data;
 }
 
-export async function listRuns() {
-  const { data } = await http.get("/runs");
+export type BulkResult = {
+  ok: boolean;
+  succeeded: number;
+  failed: number;
+  results: Array<{ id?: number; index?: number; ok: boolean; error?: string; errors?: Record<string, string[]> } & Record<string, unknown>>;
+};
+
+// Bulk endpoints accept up to AGENT_BULK_MAX_ITEMS entries and report one result per entry.
+// Partial failures come back with ok=false in the body, so non-2xx statuses are not thrown.
+const bulkOptions = { validateStatus: (s: number) => s < 500 };
+
+export async function bulkCreateAgents(items: Record<string, unknown>[], atomic = false): Promise<BulkResult> {
+  const { data } = await http.post("/agents/bulk/create", { items, atomic }, bulkOptions);
+  return data;
+}
+
+export async function bulkUpdateAgents(items: Array<{ id: number } & Record<string, unknown>>): Promise<BulkResult> {
+  const { data } = await http.post("/agents/bulk/update", { items }, bulkOptions);
+  return data;
+}
+
+// Omit `value` to flip the flag on each agent.
+export async function bulkToggleAgents(ids: number[], field: "active" | "sandbox", value?: boolean): Promise<BulkResult> {
+  const { data } = await http.post("/agents/bulk/toggle", { ids, field, value }, bulkOptions);
+  return data;
+}
+
+// Queues one RunJob per agent; each result carries its `job` id for getRunJob().
+export async function bulkRunAgents(ids: number[]): Promise<BulkResult> {
+  const { data } = await http.post("/agents/bulk/run-now", { ids }, bulkOptions);
+  return data;
+}
+
+export type RunLog = {
+  id: number;
+  agent: number | null;
+  agent_name: string | null;
+  status: string;
+  message: string;
+  started_at: string;
+  ended_at: string;
+};
+
+export type SystemLog = {
+  id: number;
+  source: string;
+  level: string;
+  message: string;
+  created_at: string;
+};
+
+export type Page<T> = {
+  items: T[];
+  next_cursor: string | null;
+  latest_cursor: string | null;
+  has_more: boolean;
+};
+
+export type PageParams = {
+  cursor?: string;
+  since?: string;
+  limit?: number;
+  [filter: string]: string | number | undefined;
+};
+
+export async function listRuns(params: PageParams = {}): Promise<Page<RunLog>> {
+  const { data } = await http.get("/runs", { params });
   return data;
 }
 
-export async function listSystemLogs() {
-  const { data } = await http.get("/system-logs");
+export async function listSystemLogs(params: PageParams = {}): Promise<Page<SystemLog>> {
+  const { data } = await http.get("/system-logs", { params });
   return data;
 }
 
-export async function getAnalyticsSummary(days = 14) {
+export type LiveEventFilters = {
+  kinds?: Array<"run" | "log">;
+  agent?: number;
+  status?: string;
+  source?: string;
+  level?: string;
+};
+
+export type LiveEventHandlers = {
+  onRun?: (run: RunLog) => void;
+  onLog?: (log: SystemLog) => void;
+  // the server could not replay everything since our last event; reload the lists
+  onReset?: () => void;
+  onError?: () => void;
+};
+
+// Server-pushed RunLog/SystemLog rows (same shape as listRuns/listSystemLogs items).
+// EventSource reconnects by itself and resumes from Last-Event-ID. Returns an unsubscribe function.
+export function subscribeEvents(filters: LiveEventFilters, handlers: LiveEventHandlers): () => void {
+  const params = new URLSearchParams();
+  if (filters.kinds?.length) params.set("kinds", filters.kinds.join(","));
+  if (filters.agent != null) params.set("agent", String(filters.agent));
+  if (filters.status) params.set("status", filters.status);
+  if (filters.source) params.set("source", filters.source);
+  if (filters.level) params.set("level", filters.level);
+  const query = params.toString();
+
+  const source = new EventSource(`${API_BASE}/events${query ? `?${query}` : ""}`);
+  source.addEventListener("run", (e) => handlers.onRun?.(JSON.parse((e as MessageEvent).data)));
+  source.addEventListener("log", (e) => handlers.onLog?.(JSON.parse((e as MessageEvent).data)));
+  source.addEventListener("reset", () => handlers.onReset?.());
+  source.onerror = () => handlers.onError?.();
+  return () => source.close();
+}
+
+export type LlmModelStats = {
+  model: string;
+  endpoint: "chat" | "chat_stream" | string;
+  requests: number;
+  errors: number;
+  cancelled: number;
+  latency_p50_s: number | null;
+  latency_p95_s: number | null;
+  ttft_p50_s: number | null;
+  ttft_p95_s: number | null;
+  chunks_per_s: number | null;
+  completion_tokens_per_s: number | null;
+  prompt_tokens: number;
+  completion_tokens: number;
+};
+
+export type AnalyticsSummary = {
+  days: number;
+  trend: Array<{ date: string; success: number; failed: number; sandboxed: number; total: number }>;
+  status_totals: { success: number; failed: number; sandboxed: number };
+  top_agents: Array<{ agent_id: number; name: string; total: number }>;
+  total_runs: number;
+  llm: LlmModelStats[];
+};
+
+export async function getAnalyticsSummary(days = 14): Promise<AnalyticsSummary> {
   const { data } = await http.get(`/analytics/summary?days=${days}`);
   return data;
 }
@@ -162,3 +370,49 @@ export async function crawlExtract(url: string) {
   const { data } = await http.post("/crawl/extract", { url });
   return data;
 }
+
+export type CrawlBatchResult = {
+  index: number;
+  url: string;
+  ok: boolean;
+  item?: { url: string; title: string; text: string; length: number; truncated: boolean };
+  error?: string;
+  elapsed_ms: number;
+};
+
+export async function crawlBatch(
+  urls: string[],
+  onResult: (result: CrawlBatchResult) => void
+): Promise<{ ok: number; failed: number; elapsed_ms: number }> {
+  const res = await fetch(`${API_BASE}/crawl/batch`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ urls }),
+  });
+
+  if (!res.ok || !res.body) {
+    const txt = await res.text().catch(() => "");
+    throw new Error(`Batch crawl failed: ${res.status} ${txt}`);
+  }
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder("utf-8");
+  let buffer = "";
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split("\n");
+    buffer = lines.pop() ?? "";
+
+    for (const line of lines) {
+      if (!line.trim()) continue;
+      const record = JSON.parse(line);
+      if (record.done) return record;
+      onResult(record as CrawlBatchResult);
+    }
+  }
+  throw new Error("Batch crawl stream ended early");
+}
@@ -7,6 +7,7 @@ import {
   listAgentTemplates,
   listAgents,
   runAgentNow,
+  waitForRunJob,
   toggleAgentActive,
   toggleAgentSandbox
 } from "../lib/api";
@@ -74,9 +75,17 @@ export default function AgentsPage() {
 
   const runNow = async (id: number) => {
     try {
-      setMsg("Running...");
-      await runAgentNow(id);
-      setMsg("Run triggered.");
+      setMsg("Queueing run...");
+      const { job } = await runAgentNow(id);
+      setMsg(`Run queued (job #${job.id})...`);
+      const done = await waitForRunJob(job.id);
+      setMsg(
+        done.status === "done"
+          ? `Run finished: ${done.run?.status ?? "ok"}.`
+          : done.status === "failed"
+            ? `Run failed after ${done.attempts} attempt(s): ${done.last_error}`
+            : `Run still ${done.status} (job #${job.id}).`
+      );
     } catch (e: any) {
       setMsg(e?.message || "Run failed");
     }
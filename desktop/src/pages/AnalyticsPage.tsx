@@ -91,6 +91,28 @@ export default function AnalyticsPage() {
           ))}
         </ul>
       </div>
+
+      <div className="card">
+        <div className="muted">Model performance (this backend process)</div>
+        {(data?.llm || []).length === 0 ? (
+          <div className="muted">No upstream chat calls yet.</div>
+        ) : (
+          <ul>
+            {(data?.llm || []).map((m) => (
+              <li key={`${m.model}:${m.endpoint}`}>
+                {m.model} / {m.endpoint}: {m.requests} calls, p50 {fmtSeconds(m.latency_p50_s)}
+                {m.endpoint === "chat_stream" && <>, TTFT p50 {fmtSeconds(m.ttft_p50_s)}</>}
+                {m.completion_tokens_per_s != null && <>, {m.completion_tokens_per_s} tok/s</>}
+                {m.errors > 0 && <>, {m.errors} errors</>}
+              </li>
+            ))}
+          </ul>
+        )}
+      </div>
     </div>
   );
 }
+
+function fmtSeconds(v: number | null) {
+  return v == null ? "-" : `${v.toFixed(2)}s`;
+}
@@ -1,5 +1,5 @@
 import { useEffect, useState } from "react";
-import { health, listAgents, listRuns } from "../lib/api";
+import { health, listAgents, listRuns, subscribeEvents } from "../lib/api";
 
 export default function DashboardPage() {
   const [h, setH] = useState<any>(null);
@@ -17,6 +17,8 @@ export default function DashboardPage() {
         // ignore noisy failures in dashboard overview
       }
     })();
+    if (typeof EventSource === "undefined") return;
+    return subscribeEvents({ kinds: ["run"] }, { onRun: () => setRuns((n) => n + 1) });
   }, []);
 
   return (
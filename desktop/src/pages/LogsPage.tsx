@@ -1,21 +1,79 @@
-import { useEffect, useState } from "react";
-import { listRuns, listSystemLogs, type RunLog, type SystemLog } from "../lib/api";
+import { useEffect, useRef, useState } from "react";
+import { listRuns, listSystemLogs, subscribeEvents, type RunLog, type SystemLog } from "../lib/api";
+
+// only used when the live event stream is unavailable
+const POLL_MS = 5000;
+const MAX_ROWS = 500;
+
+function mergeNewest<T extends { id: number }>(incoming: T[], current: T[]): T[] {
+  if (incoming.length === 0) return current;
+  const seen = new Set(incoming.map((x) => x.id));
+  return [...incoming, ...current.filter((x) => !seen.has(x.id))].slice(0, MAX_ROWS);
+}
 
 export default function LogsPage() {
   const [runs, setRuns] = useState<RunLog[]>([]);
   const [sys, setSys] = useState<SystemLog[]>([]);
   const [err, setErr] = useState("");
+  const runsCursor = useRef<string | null>(null);
+  const sysCursor = useRef<string | null>(null);
 
   useEffect(() => {
-    (async () => {
+    let cancelled = false;
+
+    const load = async () => {
       try {
-        const [r, s] = await Promise.all([listRuns(), listSystemLogs()]);
-        setRuns(r.items || []);
-        setSys(s.items || []);
+        // after the first page, only ask for rows newer than what we already have
+        const [r, s] = await Promise.all([
+          listRuns(runsCursor.current ? { since: runsCursor.current } : {}),
+          listSystemLogs(sysCursor.current ? { since: sysCursor.current } : {}),
+        ]);
+        if (cancelled) return;
+        runsCursor.current = r.latest_cursor ?? runsCursor.current;
+        sysCursor.current = s.latest_cursor ?? sysCursor.current;
+        setRuns((prev) => mergeNewest(r.items || [], prev));
+        setSys((prev) => mergeNewest(s.items || [], prev));
+        setErr("");
       } catch (e: any) {
-        setErr(e?.message || "Failed loading logs");
+        if (!cancelled) setErr(e?.message || "Failed loading logs");
       }
-    })();
+    };
+
+    let timer: number | undefined;
+    let unsubscribe = () => {};
+    if (typeof EventSource === "undefined") {
+      timer = window.setInterval(load, POLL_MS);
+    } else {
+      // subscribe before the first load; rows seen by both are merged by id
+      unsubscribe = subscribeEvents(
+        {},
+        {
+          onRun: (run) => {
+            if (cancelled) return;
+            setRuns((prev) => mergeNewest([run], prev));
+            setErr("");
+          },
+          onLog: (log) => {
+            if (cancelled) return;
+            setSys((prev) => mergeNewest([log], prev));
+            setErr("");
+          },
+          onReset: () => {
+            // too far behind to catch up incrementally: reload the newest page
+            runsCursor.current = null;
+            sysCursor.current = null;
+            load();
+          },
+          onError: () => !cancelled && setErr("Live updates interrupted; reconnecting..."),
+        },
+      );
+    }
+    load();
+    return () => {
+      cancelled = true;
+      window.clearInterval(timer);
+      unsubscribe();
+    };
   }, []);
 
   return (